@@ -0,0 +1,177 @@
+"""
+Event density of the processed event table: how many events every main character
+takes part in per time bucket (day, year or decade), broken down by world, deaths
+and important triggers.
+
+Participation is resolved once per table, buckets are integer keys computed from
+the precomputed date columns (see Dates.py), and the counts are one groupby per
+bucket size, cached on the EventDensity object:
+
+    density = Aggregation.EventDensity(events_df, main_characters)
+    density.matrix('decade')          # characters x decades, event counts
+    density.counts('year')            # long table with the breakdown columns
+"""
+import numpy as np
+import pandas as pd
+
+BUCKETS = ('day', 'year', 'decade')
+
+# Worlds counted separately; "Jonas/Martha" events count for both
+WORLDS = ('Jonas', 'Martha', 'Origin')
+
+def _normalize(name):
+    # Same rule as Visualization.normalize_character_name
+    return name.split('(')[0].strip()
+
+def bucket_key(date_keys, bucket):
+    """Integer bucket of YYYYMMDD date keys (scalar or array)."""
+    date_keys = np.asarray(date_keys, dtype=np.int64)
+    if bucket == 'day':
+        return date_keys
+    if bucket == 'year':
+        return date_keys // 10000
+    if bucket == 'decade':
+        return date_keys // 100000 * 10
+    raise ValueError(f"Unknown bucket size '{bucket}', expected one of {', '.join(BUCKETS)}")
+
+def bucket_label(key, bucket):
+    key = int(key)
+    if bucket == 'day':
+        return f"{key // 10000:04d}-{key // 100 % 100:02d}-{key % 100:02d}"
+    if bucket == 'decade':
+        return f"{key}s"
+    return str(key)
+
+def participation(events_df, main_characters):
+    """
+    One row per (event, main character) taking part in it: the event's FirstMainCharacter
+    and every main character matching a name of its Characters column. Columns: event
+    (row position in events_df), character, DateKey, world flags, death, important.
+    """
+    normalized_main = [(char, _normalize(char)) for char in main_characters]
+
+    def match(name):
+        normalized = _normalize(name)
+        for char, main_normalized in normalized_main:
+            if normalized in main_normalized or main_normalized in normalized:
+                return char
+        return None
+
+    events = events_df.reset_index(drop=True)
+    names = events['Characters'].where(events['Characters'].apply(lambda value: isinstance(value, str)), '')
+    participants = names.str.split(',').explode().str.strip()
+    participants = participants[participants != '']
+    # Every distinct name is matched once
+    unique_names = participants.unique()
+    matched = participants.map(dict(zip(unique_names, map(match, unique_names))))
+
+    first = events['FirstMainCharacter'].where(events['FirstMainCharacter'].isin(main_characters))
+    pairs = pd.DataFrame({
+        'event': list(matched.index) + list(first.index),
+        'character': list(matched) + list(first)
+    }).dropna().drop_duplicates(ignore_index=True)  # An event counts once per character
+
+    rows = pairs['event'].to_numpy(dtype=np.int64)
+    pairs['DateKey'] = events['DateKey'].to_numpy()[rows]
+
+    worlds = events['World'].fillna('').astype(str) if 'World' in events.columns else pd.Series('', index=events.index)
+    for world in WORLDS:
+        pairs[world] = worlds.str.contains(world, regex=False).to_numpy()[rows]
+
+    def flag(column):
+        if column not in events.columns:
+            return np.zeros(len(rows), dtype=bool)
+        values = events[column]
+        return ((values == True) | (values == 'True')).to_numpy()[rows]
+
+    pairs['death'] = flag('Death')
+    pairs['important'] = flag('Important Trigger')
+    return pairs
+
+class EventDensity:
+    """Character x time-bucket event counts of one event table, cached per bucket size."""
+
+    def __init__(self, events_df, main_characters):
+        self.main_characters = list(main_characters)
+        self.pairs = participation(events_df, self.main_characters)
+        self._counts = {}
+
+    def counts(self, bucket='year'):
+        """
+        Long table indexed by (character, bucket key) with the columns events, deaths,
+        important and one per world. Events without a date are left out.
+        """
+        if bucket not in self._counts:
+            pairs = self.pairs[self.pairs['DateKey'] > 0]
+            grouped = pairs.assign(
+                bucket=bucket_key(pairs['DateKey'], bucket),
+                events=1,
+                deaths=pairs['death'].astype(np.int64),
+                important=pairs['important'].astype(np.int64),
+                **{world: pairs[world].astype(np.int64) for world in WORLDS}
+            ).groupby(['character', 'bucket'])[['events', 'deaths', 'important', *WORLDS]].sum()
+            self._counts[bucket] = grouped
+        return self._counts[bucket]
+
+    def matrix(self, bucket='year', column='events', buckets=None):
+        """Characters (rows, in main_characters order) x bucket keys (columns) of one count column."""
+        table = self.counts(bucket)[column].unstack(fill_value=0)
+        table = table.reindex(index=self.main_characters, fill_value=0)
+        if buckets is not None:
+            table = table.reindex(columns=buckets, fill_value=0)
+        return table.fillna(0).astype(np.int64)
+
+def bucket_edges(date_index, bucket, event_spacing, max_x):
+    """
+    Buckets in x order and their x edges on the timeline figure, from its date index
+    (sorted [ISO date, x] pairs): a bucket spans from its left-most column to the next
+    bucket's, and the last one to the end of the grid at max_x.
+    """
+    starts = {}
+    for date, x in date_index:
+        if not date:
+            # Undated events, like the DateKey 0 rows EventDensity.counts drops
+            continue
+        key = int(bucket_key(int(date.replace('-', '')), bucket))
+        starts[key] = min(x, starts.get(key, x))
+    buckets = sorted(starts, key=starts.get)
+    edges = [starts[key] - event_spacing / 2 for key in buckets] + [max_x - event_spacing / 2]
+    return buckets, edges
+
+def heatmap_trace(density, bucket, buckets, x_edges, y_positions, name='overview_density', visible=True):
+    """
+    Lightweight heatmap of density.matrix(bucket): one cell per character and bucket,
+    with the death/important/world breakdown in the hover label.
+    """
+    import plotly.graph_objects as go
+
+    z = density.matrix(bucket, buckets=buckets).to_numpy()
+
+    breakdown_columns = ['deaths', 'important', *WORLDS]
+    breakdown = {column: density.matrix(bucket, column, buckets).to_numpy() for column in breakdown_columns}
+    labels = [bucket_label(key, bucket) for key in buckets]
+    customdata = np.empty(z.shape + (2 + len(breakdown_columns),), dtype=object)
+    customdata[:, :, 0] = np.array(labels, dtype=object)[np.newaxis, :]
+    customdata[:, :, 1] = np.array(density.main_characters, dtype=object)[:, np.newaxis]
+    for i, column in enumerate(breakdown_columns):
+        customdata[:, :, 2 + i] = breakdown[column].astype(object)
+
+    worlds_hover = '<br>'.join(f'{world}: %{{customdata[{4 + i}]}}' for i, world in enumerate(WORLDS))
+    return go.Heatmap(
+        x=x_edges,
+        y=y_positions,
+        z=z,
+        customdata=customdata.tolist(),
+        hovertemplate=('%{customdata[1]}<br>%{customdata[0]}: %{z} events<br>'
+                       'Deaths: %{customdata[2]}<br>Important: %{customdata[3]}<br>'
+                       + worlds_hover + '<extra></extra>'),
+        colorscale=[[0, '#111111'], [1, '#d9c9a3']],
+        zmin=0,
+        zmax=max(int(z.max()) if z.size else 0, 1),
+        showscale=False,
+        xgap=1,
+        ygap=4,
+        visible=visible,
+        name=name,
+        meta=dict(bucket=bucket)
+    )
@@ -0,0 +1,160 @@
+"""
+Non-participant backgrounds as one raster layer.
+
+Every event column draws a rounded rectangle in the date band colour for each
+character not taking part in it - most of the figure's shapes. In image mode they
+are collected as a column x character occupancy matrix (band index per cell, -1
+where the character takes part) and rasterized into a single palette PNG, placed
+as a layout image on the "below" layer, so the participation rectangles and the
+traces still draw on top of it:
+
+    grid = BackgroundGrid.BackgroundGrid()
+    grid.add(x_position, row, band)              # per non-participant cell
+    fig.add_layout_image(grid.layout_image(...))
+
+The raster has the pixel density the figure is drawn at (figure_resolution), so
+the browser shows it about 1:1 whatever the number of columns, capped at
+MAX_PIXELS a side. Columns are painted in order, as the shapes were: a rectangle
+is wider than the column spacing, so each column covers the right edge of the one
+before it.
+"""
+import base64
+import struct
+import zlib
+
+# Largest raster side in pixels: wider images are not decoded by every browser
+MAX_PIXELS = 16384
+
+IMAGE_NAME = 'background_grid'
+
+def occupancy_matrix(cells, rows):
+    """
+    (x values, matrix) of the cells [(x, row, band), ...]: x values are the sorted
+    column positions and matrix[row][column] the band of the cell, -1 when empty.
+    """
+    import numpy as np
+
+    x_values = sorted({x for x, _, _ in cells})
+    column = {x: i for i, x in enumerate(x_values)}
+    matrix = np.full((rows, len(x_values)), -1, dtype=np.int8)
+    for x, row, band in cells:
+        matrix[row, column[x]] = band
+    return x_values, matrix
+
+def figure_resolution(fig):
+    """(x, y) screen pixels per data unit of a figure with a fixed width, height and axis ranges."""
+    layout = fig.layout
+    margin = layout.margin
+    plot_width = layout.width - (margin.l or 0) - (margin.r or 0)
+    plot_height = layout.height - (margin.t or 0) - (margin.b or 0)
+    x_min, x_max = layout.xaxis.range
+    y_min, y_max = layout.yaxis.range
+    return plot_width / abs(x_max - x_min), plot_height / abs(y_max - y_min)
+
+def _cover(centres, starts, half_size, radius, back=0):
+    """
+    Index of the last interval [start, start + 2 * half_size] (starts ascending)
+    covering every pixel centre (-1 for none), or of the one before it with back=1,
+    and how far the centre reaches into the rounding of that interval's corners.
+    """
+    import numpy as np
+
+    index = np.searchsorted(starts, centres, side='right') - 1 - back
+    start = starts[np.maximum(index, 0)]
+    inside = (index >= 0) & (centres <= start + 2 * half_size)
+    edge = np.minimum(centres - start, start + 2 * half_size - centres)
+    return np.where(inside, index, -1), np.maximum(radius - edge, 0)
+
+def png(pixels, colors):
+    """8-bit palette PNG of pixels (palette indices, 0 transparent) with colors for indices 1.."""
+    import numpy as np
+
+    height, width = pixels.shape
+    palette = b'\x00\x00\x00' + b''.join(bytes.fromhex(color.lstrip('#')[:6]) for color in colors)
+    alpha = b'\x00' + b'\xff' * len(colors)
+    # Filter type 0 (none) in front of every row
+    rows = np.hstack([np.zeros((height, 1), dtype=np.uint8), pixels]).tobytes()
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0))
+            + chunk(b'PLTE', palette)
+            + chunk(b'tRNS', alpha)
+            + chunk(b'IDAT', zlib.compress(rows))
+            + chunk(b'IEND', b''))
+
+class BackgroundGrid:
+    """Collects the non-participant cells of a render; layout_image() rasterizes them."""
+
+    def __init__(self):
+        self.cells = []
+
+    def add(self, x, row, band):
+        """Background of the character in row (index into the y positions) at column x, in band."""
+        self.cells.append((x, row, band))
+
+    @property
+    def count(self):
+        return len(self.cells)
+
+    def rasterize(self, y_positions, half_width, half_height, corner_radius, resolution):
+        """
+        (pixels, (x0, y0, width, height)): palette indices (band + 1, 0 transparent) of
+        the cells at resolution ((x, y) pixels per data unit, see figure_resolution;
+        lowered to keep both sides within MAX_PIXELS) and the data extent they cover,
+        y growing downwards.
+        """
+        import numpy as np
+
+        x_values, matrix = occupancy_matrix(self.cells, len(y_positions))
+        x_values = np.asarray(x_values, dtype=float)
+        order = np.argsort(y_positions, kind='stable')
+        y_sorted = np.asarray(y_positions, dtype=float)[order]
+
+        x0 = x_values[0] - half_width
+        y0 = y_sorted[0] - half_height
+        extent_x = x_values[-1] + half_width - x0
+        extent_y = y_sorted[-1] + half_height - y0
+        width = min(max(int(round(extent_x * resolution[0])), 1), MAX_PIXELS)
+        height = min(max(int(round(extent_y * resolution[1])), 1), MAX_PIXELS)
+
+        # Cell row under every pixel centre and how far it reaches into a rounded corner
+        row, corner_y = _cover(y0 + (np.arange(height) + 0.5) * extent_y / height,
+                               y_sorted - half_height, half_height, corner_radius)
+        row = np.where(row >= 0, order[np.maximum(row, 0)], -1)
+        x_centres = x0 + (np.arange(width) + 0.5) * extent_x / width
+
+        def layer(back):
+            column, corner_x = _cover(x_centres, x_values - half_width, half_width, corner_radius, back)
+            bands = matrix[np.maximum(row, 0)][:, np.maximum(column, 0)]
+            paint = ((row >= 0)[:, None] & (column >= 0)[None, :] & (bands >= 0)
+                     & (corner_x[None, :] ** 2 + corner_y[:, None] ** 2 <= corner_radius ** 2))
+            return np.where(paint, bands + 1, 0).astype(np.uint8)
+
+        # Where a column leaves a pixel empty (a participant or its rounded corner), the
+        # previous column it overlaps shows through
+        pixels = layer(0)
+        pixels = np.where(pixels > 0, pixels, layer(1))
+        return pixels, (float(x0), float(y0), float(extent_x), float(extent_y))
+
+    def layout_image(self, y_positions, half_width, half_height, corner_radius, band_colors, resolution):
+        """Layout image (dict for fig.add_layout_image) drawing all cells in band_colors."""
+        pixels, (x0, y0, sizex, sizey) = self.rasterize(y_positions, half_width, half_height, corner_radius, resolution)
+        encoded = base64.b64encode(png(pixels, band_colors)).decode('ascii')
+        return dict(
+            source=f"data:image/png;base64,{encoded}",
+            name=IMAGE_NAME,
+            xref="x",
+            yref="y",
+            x=x0,
+            y=y0,  # Top edge: the y axis is reversed
+            sizex=sizex,
+            sizey=sizey,
+            sizing="stretch",
+            xanchor="left",
+            yanchor="top",
+            opacity=1.0,
+            layer="below"
+        )
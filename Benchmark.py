@@ -0,0 +1,313 @@
+"""
+Benchmark suite for the timeline pipeline.
+
+Generates synthetic event and edge tables with the schemas of Data/evPLUSPlusPlus.csv
+and Data/edges.csv at multiples of the real Dark dataset size, runs every pipeline
+stage on them and records the timings as JSON so that runs can be compared.
+
+Usage:
+    python Benchmark.py --scales 1 10 100 --output Results/benchmark.json
+    python Benchmark.py --scales 1 --compare Results/benchmark_baseline.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+import DataManipulation
+import Instrumentation
+import Visualization
+
+# Approximate size of the real dataset (events after merging/filtering and edges.csv rows)
+DARK_EVENT_COUNT = 250
+DARK_EDGE_COUNT = 300
+
+# Same parameters as the production render in Visualization.py
+RENDER_PARAMS = Visualization.DEFAULT_GRID_PARAMS
+
+# Stages reported for every run, in pipeline order
+STAGES = [
+    'csv_load', 'nlp', 'initials', 'grouping', 'layout', 'shape_emission',
+    'figure_assembly', 'html_export', 'png_export'
+]
+
+WORLDS = ["Jonas", "Martha", "Origin", "Jonas/Martha", "Martha/Jonas", "Origin (End)"]
+WORLD_WEIGHTS = [0.4, 0.3, 0.15, 0.06, 0.04, 0.05]
+
+PLACES = ["the caves", "the power plant", "the bunker", "the school", "the police station",
+          "Tannhaus's shop", "the hotel", "the forest", "the Nielsen house", "the Kahnwald house"]
+ACTIONS = ["meets", "argues with", "follows", "confronts", "warns", "searches for",
+           "travels back with", "hides from", "talks to", "finds a letter from"]
+
+def generate_events(n_events, n_characters=16, events_per_date=1.5, start_year=1888, end_year=2053, seed=0):
+    """
+    Create a synthetic event table with the columns of Data/evPLUSPlusPlus.csv (plus ID).
+
+    - n_characters: how many of the main characters appear in the events (max 16)
+    - events_per_date: average number of events sharing a date, which controls how
+      many events end up merged into one timeline column
+    """
+    main_characters = DataManipulation.main_characters
+    if not 1 <= n_characters <= len(main_characters):
+        raise ValueError(f"n_characters must be between 1 and {len(main_characters)}")
+
+    rng = np.random.default_rng(seed)
+    characters = main_characters[:n_characters]
+    first_names = [char.split('/')[0].strip() for char in characters]
+
+    # Pick the distinct dates first, then spread the events over them
+    start = datetime.date(start_year, 1, 1)
+    total_days = (datetime.date(end_year, 12, 31) - start).days
+    n_dates = max(1, min(total_days, int(round(n_events / events_per_date))))
+    day_offsets = np.sort(rng.choice(total_days, size=n_dates, replace=False))
+    event_days = np.sort(rng.choice(day_offsets, size=n_events))
+
+    # Paired event types so the time travel / world swap buttons have matches
+    types = np.full(n_events, "Normal", dtype=object)
+    special = rng.permutation(n_events)[:int(n_events * 0.2)]
+    for pair_idx, offset in enumerate(range(0, len(special) - 1, 2)):
+        number = pair_idx // 2 + 1
+        label = "Successful Time Travel" if pair_idx % 2 == 0 else "World Swap"
+        types[special[offset]] = f"{label} ({number})"
+        types[special[offset + 1]] = f"{label} ({number})"
+
+    rows = []
+    for i in range(n_events):
+        k = int(rng.integers(1, min(4, n_characters) + 1))
+        picked = rng.choice(n_characters, size=k, replace=False)
+        names = [first_names[j] for j in picked]
+
+        action = ACTIONS[rng.integers(len(ACTIONS))]
+        place = PLACES[rng.integers(len(PLACES))]
+        other = names[1] if k > 1 else "a stranger"
+        description = f"{names[0]} {action} {other} at {place}."
+        if rng.random() < 0.5:
+            description += f" {names[-1]} learns the truth about {place}."
+        is_death = bool(rng.random() < 0.04)
+        if is_death:
+            description = f"{names[0]} dies at {place}."
+
+        main_chars = [characters[j] for j in picked] + [None] * (4 - k)
+        date = start + datetime.timedelta(days=int(event_days[i]))
+
+        rows.append({
+            'ID': i + 1,
+            'Date': date.strftime('%d/%m/%Y'),
+            'Description': description,
+            'Full_Description': description + " " + " ".join(
+                f"{name} remembers what happened at {PLACES[rng.integers(len(PLACES))]}." for name in names),
+            'Characters': ", ".join(names),
+            'World': WORLDS[rng.choice(len(WORLDS), p=WORLD_WEIGHTS)],
+            'Death': is_death,
+            'Important Trigger': bool(rng.random() < 0.08),
+            'Type': types[i],
+            'FirstMainCharacter': main_chars[0],
+            'SecondMainCharacter': main_chars[1],
+            'ThirdMainCharacter': main_chars[2],
+            'FourthMainCharacter': main_chars[3],
+            'FormattedDescription': description
+        })
+
+    return pd.DataFrame(rows)
+
+def generate_edges(events_df, n_edges, seed=0):
+    """Create a synthetic edge table with the columns of Data/edges.csv (Source, Target, Type)."""
+    rng = np.random.default_rng(seed + 1)
+    ids = events_df['ID'].to_numpy()
+    sources = rng.choice(ids, size=n_edges)
+    targets = rng.choice(ids, size=n_edges)
+    edge_types = rng.choice(["Normal", "Successful Time Travel", "World Swap"], size=n_edges, p=[0.8, 0.15, 0.05])
+    return pd.DataFrame({'Source': sources, 'Target': targets, 'Type': edge_types})
+
+def write_dataset(directory, events_df, edges_df):
+    os.makedirs(os.path.join(directory, 'Data'), exist_ok=True)
+    events_path = os.path.join(directory, 'Data', 'evPLUSPlusPlus.csv')
+    edges_path = os.path.join(directory, 'Data', 'edges.csv')
+    events_df.to_csv(events_path, index=False)
+    edges_df.to_csv(edges_path, index=False)
+    return events_path, edges_path
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_scale(scale, workspace, args):
+    """Run every stage once on a dataset of `scale` times the real size; returns the run record."""
+    n_events = max(1, int(DARK_EVENT_COUNT * scale))
+    events_df = generate_events(n_events, n_characters=args.characters,
+                                events_per_date=args.events_per_date, seed=args.seed)
+    edges_df = generate_edges(events_df, max(1, int(DARK_EDGE_COUNT * scale)), seed=args.seed)
+    scale_dir = os.path.join(workspace, f"scale_{scale:g}")
+    events_path, edges_path = write_dataset(scale_dir, events_df, edges_df)
+
+    stages = {}
+
+    Instrumentation.reset()
+
+    # CSV load - same parsing as the render script
+    with Instrumentation.span('csv_load'):
+        loaded_events = Visualization.load_events(events_path)
+        pd.read_csv(edges_path)
+
+    # NLP character extraction (needs the spaCy English model), timed inside DataManipulation
+    if args.skip_nlp:
+        stages['nlp'] = {'skipped': 'disabled with --skip-nlp'}
+    else:
+        try:
+            DataManipulation.get_nlp()
+        except (OSError, ImportError) as e:
+            stages['nlp'] = {'skipped': f'spaCy model unavailable: {e}'}
+        else:
+            DataManipulation.assign_main_characters(events_df.copy())
+
+    # Replacing character names with initials
+    DataManipulation.format_descriptions(events_df.copy())
+
+    # Render - grouping, layout, shape emission and figure assembly are timed inside
+    fig = Visualization.create_dark_timeline_grid(events_df=loaded_events, **RENDER_PARAMS)
+
+    html_path = os.path.join(scale_dir, 'timeline.html')
+    with Instrumentation.span('html_export'):
+        Visualization.export_timeline_html(fig, html_path, loaded_events)
+
+    if args.skip_png:
+        stages['png_export'] = {'skipped': 'disabled with --skip-png'}
+    else:
+        try:
+            with Instrumentation.span('png_export'):
+                pio.write_image(fig, os.path.join(scale_dir, 'timeline.png'),
+                                width=12288, height=1200, scale=1)
+        except Exception as e:  # Kaleido missing or failing is reported, not fatal
+            stages['png_export'] = {'skipped': f'PNG export failed: {e}'}
+
+    stages.update(Instrumentation.stage_totals())
+
+    return {
+        'scale': scale,
+        'events': n_events,
+        'edges': len(edges_df),
+        'dates': int(loaded_events['Date'].nunique()),
+        'characters': args.characters,
+        'shapes': len(fig.layout.shapes),
+        'traces': len(fig.data),
+        'html_bytes': os.path.getsize(html_path),
+        'stages': {name: stages[name] for name in STAGES if name in stages},
+        'counters': Instrumentation.counters()
+    }
+
+def merge_repeats(runs):
+    """Keep the fastest time of each stage over repeated runs of the same scale."""
+    best = dict(runs[0])
+    best['stages'] = {}
+    for name in runs[0]['stages']:
+        timings = [run['stages'][name] for run in runs]
+        if all('seconds' in t for t in timings):
+            best['stages'][name] = min(timings, key=lambda t: t['seconds'])
+        else:
+            best['stages'][name] = timings[0]
+    best['repeats'] = len(runs)
+    return best
+
+def compare_results(baseline, current, tolerance=0.2):
+    """
+    Compare two benchmark reports stage by stage.
+    Returns a list of (scale, stage, baseline seconds, current seconds, ratio) for
+    every stage that got slower by more than `tolerance` (0.2 = 20%).
+    """
+    baseline_runs = {run['scale']: run for run in baseline['runs']}
+    regressions = []
+    for run in current['runs']:
+        base_run = baseline_runs.get(run['scale'])
+        if base_run is None:
+            continue
+        for name, timing in run['stages'].items():
+            base_timing = base_run['stages'].get(name, {})
+            if 'seconds' not in timing or 'seconds' not in base_timing or base_timing['seconds'] <= 0:
+                continue
+            ratio = timing['seconds'] / base_timing['seconds']
+            if ratio > 1 + tolerance:
+                regressions.append((run['scale'], name, base_timing['seconds'], timing['seconds'], ratio))
+    return regressions
+
+def print_report(report):
+    for run in report['runs']:
+        print(f"\nScale {run['scale']:g}x: {run['events']} events, {run['dates']} dates, "
+              f"{run['shapes']} shapes, {run['traces']} traces, {run['html_bytes'] / 1e6:.1f} MB HTML")
+        for name, timing in run['stages'].items():
+            if 'seconds' in timing:
+                print(f"  {name:<16} {timing['seconds']:10.3f} s")
+            else:
+                print(f"  {name:<16} {'skipped':>10}   ({timing['skipped']})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Dark timeline pipeline on synthetic data.")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100],
+                        help="dataset sizes as multiples of the real dataset (default: 1 10 100)")
+    parser.add_argument('--characters', type=int, default=16, help="number of main characters used (max 16)")
+    parser.add_argument('--events-per-date', type=float, default=1.5,
+                        help="average number of events sharing a date")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per scale, the fastest time is kept")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-nlp', action='store_true', help="do not time the spaCy stage")
+    parser.add_argument('--skip-png', action='store_true', help="do not time the Kaleido PNG export")
+    parser.add_argument('--output', default='Results/benchmark.json', help="where to write the JSON report")
+    parser.add_argument('--compare', help="baseline JSON report to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed slowdown per stage before --compare fails (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    Instrumentation.enable()
+
+    with tempfile.TemporaryDirectory(prefix='dark_timeline_bench_') as workspace:
+        runs = []
+        for scale in args.scales:
+            repeats = [run_scale(scale, workspace, args) for _ in range(args.repeat)]
+            runs.append(merge_repeats(repeats))
+
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'characters': args.characters,
+            'events_per_date': args.events_per_date,
+            'seed': args.seed,
+            'render': RENDER_PARAMS
+        },
+        'runs': runs
+    }
+
+    print_report(report)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nBenchmark results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.tolerance)
+        for scale, name, before, after, ratio in regressions:
+            print(f"REGRESSION scale {scale:g}x {name}: {before:.3f} s -> {after:.3f} s ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print("No stage regressed beyond the tolerance.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
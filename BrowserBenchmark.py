@@ -0,0 +1,223 @@
+"""
+Browser-side benchmark for the exported timeline HTML.
+
+Serves the Results folder with a local static file server, opens each timeline in
+headless Chromium (Playwright), and records paint/load timings, the JS heap size,
+and how long the existing plotly_click / plotly_doubleclick handlers take to
+highlight the events of a button and to reset the highlight.
+
+Requires Playwright:
+    pip install playwright && playwright install chromium
+
+Usage:
+    python BrowserBenchmark.py Results/Visualization.html --clicks 10 --runs 3
+"""
+import argparse
+import datetime
+import functools
+import http.server
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+
+# Collects load timings and heap size once the Plotly graph has rendered
+LOAD_METRICS_JS = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const paints = {};
+    for (const entry of performance.getEntriesByType('paint')) {
+        paints[entry.name] = entry.startTime;
+    }
+    const graphDiv = document.getElementsByClassName('plotly-graph-div')[0];
+    return {
+        first_paint_ms: paints['first-paint'] ?? null,
+        first_contentful_paint_ms: paints['first-contentful-paint'] ?? null,
+        dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd : null,
+        load_ms: nav ? nav.loadEventEnd : null,
+        graph_ready_ms: window.__graphReadyAt ?? performance.now(),
+        transfer_bytes: nav ? nav.transferSize : null,
+        shapes: graphDiv.layout.shapes ? graphDiv.layout.shapes.length : 0,
+        traces: graphDiv.data.length,
+        js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null
+    };
+}
+"""
+
+# The time travel / world swap buttons the click handler reacts to
+BUTTONS_JS = """
+() => {
+    const graphDiv = document.getElementsByClassName('plotly-graph-div')[0];
+    const buttons = [];
+    graphDiv.data.forEach((trace, curveNumber) => {
+        if (trace.name && trace.name.startsWith('btn_') && trace.customdata) {
+            buttons.push({curveNumber: curveNumber, name: trace.name});
+        }
+    });
+    return buttons;
+}
+"""
+
+# Fires a Plotly event through the page's own handlers and times it up to the next
+# rendered frame. The handlers look traces up by index, so buttons are found by name
+EMIT_JS = """
+async ([eventName, buttonName]) => {
+    const graphDiv = document.getElementsByClassName('plotly-graph-div')[0];
+    let payload = {};
+    if (buttonName !== null) {
+        const curveNumber = graphDiv.data.findIndex(trace => trace.name === buttonName);
+        if (curveNumber < 0) return null;
+        payload = {points: [{curveNumber: curveNumber, pointNumber: 0}]};
+    }
+    const started = performance.now();
+    graphDiv.emit(eventName, payload);
+    const handled = performance.now();
+    await new Promise(resolve => requestAnimationFrame(() => setTimeout(resolve, 0)));
+    return {
+        handler_ms: handled - started,
+        frame_ms: performance.now() - started,
+        js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null
+    };
+}
+"""
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def start_server(directory):
+    """Serve `directory` on a free localhost port; returns (server, base url)."""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        'min': min(values),
+        'median': statistics.median(values),
+        'max': max(values),
+        'count': len(values)
+    }
+
+def measure_page(browser, url, clicks, timeout_ms):
+    """Load one timeline page, then click through up to `clicks` buttons, resetting after each."""
+    page = browser.new_page()
+    try:
+        # Mark the moment Plotly has drawn the figure
+        page.add_init_script("""
+            new MutationObserver((mutations, observer) => {
+                if (document.querySelector('.plotly-graph-div .main-svg')) {
+                    window.__graphReadyAt = performance.now();
+                    observer.disconnect();
+                }
+            }).observe(document, {childList: true, subtree: true});
+        """)
+        page.goto(url, wait_until='load', timeout=timeout_ms)
+        page.wait_for_selector('.plotly-graph-div .main-svg', timeout=timeout_ms)
+
+        result = page.evaluate(LOAD_METRICS_JS)
+        buttons = page.evaluate(BUTTONS_JS)
+        result['buttons'] = len(buttons)
+
+        highlights = []
+        resets = []
+        for button in buttons[:clicks]:
+            highlight = page.evaluate(EMIT_JS, ['plotly_click', button['name']])
+            if highlight is None:
+                continue
+            highlight['button'] = button['name']
+            highlights.append(highlight)
+            resets.append(page.evaluate(EMIT_JS, ['plotly_doubleclick', None]))
+
+        result['highlight'] = highlights
+        result['reset'] = resets
+        result['js_heap_after_bytes'] = page.evaluate(
+            "() => performance.memory ? performance.memory.usedJSHeapSize : null")
+        return result
+    finally:
+        page.close()
+
+def run_benchmark(html_paths, clicks=10, runs=3, timeout_ms=120000):
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        sys.exit("Playwright is required: pip install playwright && playwright install chromium")
+
+    report_files = []
+    with sync_playwright() as playwright:
+        # precise-memory-info makes performance.memory report exact heap sizes
+        browser = playwright.chromium.launch(args=['--enable-precise-memory-info'])
+        try:
+            for html_path in html_paths:
+                directory, filename = os.path.split(os.path.abspath(html_path))
+                server, base_url = start_server(directory)
+                try:
+                    page_runs = [measure_page(browser, f"{base_url}/{filename}", clicks, timeout_ms)
+                                 for _ in range(runs)]
+                finally:
+                    server.shutdown()
+
+                report_files.append({
+                    'file': html_path,
+                    'bytes': os.path.getsize(html_path),
+                    'summary': {
+                        'first_contentful_paint_ms': summarize([r['first_contentful_paint_ms'] for r in page_runs]),
+                        'graph_ready_ms': summarize([r['graph_ready_ms'] for r in page_runs]),
+                        'load_ms': summarize([r['load_ms'] for r in page_runs]),
+                        'js_heap_bytes': summarize([r['js_heap_bytes'] for r in page_runs]),
+                        'highlight_frame_ms': summarize([h['frame_ms'] for r in page_runs for h in r['highlight']]),
+                        'reset_frame_ms': summarize([h['frame_ms'] for r in page_runs for h in r['reset']])
+                    },
+                    'runs': page_runs
+                })
+            browser_version = browser.version
+        finally:
+            browser.close()
+
+    return {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'browser': f"chromium {browser_version}",
+        'platform': platform.platform(),
+        'clicks': clicks,
+        'runs': runs,
+        'files': report_files
+    }
+
+def print_report(report):
+    for entry in report['files']:
+        print(f"\n{entry['file']} ({entry['bytes'] / 1e6:.1f} MB)")
+        for name, summary in entry['summary'].items():
+            if summary is None:
+                print(f"  {name:<28} n/a")
+            elif name.endswith('bytes'):
+                print(f"  {name:<28} {summary['median'] / 1e6:10.1f} MB")
+            else:
+                print(f"  {name:<28} {summary['median']:10.1f} ms (min {summary['min']:.1f}, max {summary['max']:.1f})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure load and highlight performance of exported timelines.")
+    parser.add_argument('html', nargs='+', help="exported timeline HTML files to compare")
+    parser.add_argument('--clicks', type=int, default=10, help="buttons clicked (and reset) per page load")
+    parser.add_argument('--runs', type=int, default=3, help="page loads per file")
+    parser.add_argument('--timeout', type=int, default=120, help="page load timeout in seconds")
+    parser.add_argument('--output', default='Results/browser_benchmark.json', help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.html, clicks=args.clicks, runs=args.runs, timeout_ms=args.timeout * 1000)
+    print_report(report)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nBrowser benchmark written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -9,57 +9,67 @@ import plotly.io as pio
 import os
 import spacy
 from collections import Counter
+import Dates
+import Instrumentation
 
-# Parse CSV data
-events_df = pd.read_csv('Data/Dark_GD_Contest_Events')
-edges_df = pd.read_csv('ed.csv')
+# Load the raw event and edge tables
+def load_data(events_path='Data/Dark_GD_Contest_Events', edges_path='ed.csv'):
+    with Instrumentation.span('load_data'):
+        events_df = pd.read_csv(events_path)
+        edges_df = pd.read_csv(edges_path)
 
-# Convert dates to datetime objects for sorting and processing
-events_df['Date'] = pd.to_datetime(events_df['Date'], format='mixed', dayfirst=True)
+    # Convert dates to datetime objects for sorting and processing
+    events_df['Date'] = Dates.parse_dates(events_df['Date'])
 
-# Sort events by date
-events_df = events_df.sort_values('Date')
+    # Sort events by date
+    events_df = events_df.sort_values('Date')
 
-# Reset the index after sorting
-events_df = events_df.reset_index(drop=True)
+    # Reset the index after sorting
+    events_df = events_df.reset_index(drop=True)
 
-# Convert to integers for edge processing
-edges_df['Source'] = edges_df['Source'].astype(int)
-edges_df['Target'] = edges_df['Target'].astype(int)
+    # Convert to integers for edge processing
+    edges_df['Source'] = edges_df['Source'].astype(int)
+    edges_df['Target'] = edges_df['Target'].astype(int)
 
-# Create a dictionary to store all unique edge types for each event
-event_edge_types = {}
+    return events_df, edges_df
 
-# Initialize counters for non-normal edge types
-type_counters = {}
+# Collect all unique (numbered) edge types for each event
+def collect_event_edge_types(edges_df):
+    # Create a dictionary to store all unique edge types for each event
+    event_edge_types = {}
 
-# Process edges to collect type information
-for _, row in edges_df.iterrows():
-    source_id = row['Source']
-    target_id = row['Target']
-    edge_type = row['Type']
-    
-    # If edge type is not "Normal", assign a number to it
-    if edge_type != "Normal":
-        if edge_type not in type_counters:
-            type_counters[edge_type] = 0
-        type_counters[edge_type] += 1
-        numbered_edge_type = f"{edge_type} ({type_counters[edge_type]})"
-    else:
-        numbered_edge_type = edge_type
-    
-    # Store edge type for source event
-    if source_id not in event_edge_types:
-        event_edge_types[source_id] = set()
-    event_edge_types[source_id].add(numbered_edge_type)
-    
-    # Store edge type for target event
-    if target_id not in event_edge_types:
-        event_edge_types[target_id] = set()
-    event_edge_types[target_id].add(numbered_edge_type)
+    # Initialize counters for non-normal edge types
+    type_counters = {}
+
+    # Process edges to collect type information
+    for _, row in edges_df.iterrows():
+        source_id = row['Source']
+        target_id = row['Target']
+        edge_type = row['Type']
+        
+        # If edge type is not "Normal", assign a number to it
+        if edge_type != "Normal":
+            if edge_type not in type_counters:
+                type_counters[edge_type] = 0
+            type_counters[edge_type] += 1
+            numbered_edge_type = f"{edge_type} ({type_counters[edge_type]})"
+        else:
+            numbered_edge_type = edge_type
+        
+        # Store edge type for source event
+        if source_id not in event_edge_types:
+            event_edge_types[source_id] = set()
+        event_edge_types[source_id].add(numbered_edge_type)
+        
+        # Store edge type for target event
+        if target_id not in event_edge_types:
+            event_edge_types[target_id] = set()
+        event_edge_types[target_id].add(numbered_edge_type)
+
+    return event_edge_types
 
 # Function to join unique edge types into a comma-separated string
-def join_unique_edge_types(event_id):
+def join_unique_edge_types(event_id, event_edge_types):
     # Make sure we're comparing IDs of the same type
     try:
         # Try to convert event_id to int for comparison
@@ -74,24 +84,30 @@ def join_unique_edge_types(event_id):
     return None
 
 # Add a single Type column with all unique edge types
-# First ensure ID is present in events_df
-if 'ID' not in events_df.columns:
-    print("Warning: 'ID' column not found in events dataframe. Looking for alternative ID columns.")
-    # Try to find alternative ID columns
-    id_candidates = [col for col in events_df.columns if 'id' in col.lower()]
-    if id_candidates:
-        print(f"Using '{id_candidates[0]}' as ID column.")
-        events_df['ID'] = events_df[id_candidates[0]]
-    else:
-        print("No ID column found. Type information cannot be assigned.")
-        events_df['Type'] = None
-
-# Now apply the function to get edge types
-if 'ID' in events_df.columns:
-    events_df['Type'] = events_df['ID'].apply(join_unique_edge_types)
-    # Count events with assigned types for verification
-    type_count = events_df['Type'].notna().sum()
-    print(f"Type information assigned to {type_count} events out of {len(events_df)} total events.")
+def assign_edge_types(events_df, edges_df):
+    with Instrumentation.span('edge_types'):
+        event_edge_types = collect_event_edge_types(edges_df)
+
+    # First ensure ID is present in events_df
+    if 'ID' not in events_df.columns:
+        print("Warning: 'ID' column not found in events dataframe. Looking for alternative ID columns.")
+        # Try to find alternative ID columns
+        id_candidates = [col for col in events_df.columns if 'id' in col.lower()]
+        if id_candidates:
+            print(f"Using '{id_candidates[0]}' as ID column.")
+            events_df['ID'] = events_df[id_candidates[0]]
+        else:
+            print("No ID column found. Type information cannot be assigned.")
+            events_df['Type'] = None
+
+    # Now apply the function to get edge types
+    if 'ID' in events_df.columns:
+        events_df['Type'] = events_df['ID'].apply(join_unique_edge_types, args=(event_edge_types,))
+        # Count events with assigned types for verification
+        type_count = events_df['Type'].notna().sum()
+        print(f"Type information assigned to {type_count} events out of {len(events_df)} total events.")
+
+    return events_df
 
 # Define the main characters to track
 main_characters = [
@@ -142,10 +158,18 @@ def contains_death_event(text):
             return True
     return False
 
-# Load the English NLP model
-nlp = spacy.load("en_core_web_sm")
+# The English NLP model is loaded on first use, so importing this module stays cheap
+_nlp = None
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        _nlp = spacy.load("en_core_web_sm")
+    return _nlp
 
 def get_main_characters_nlp(row):
+    nlp = get_nlp()
+
     description = row.get('Description', '')
     full_description = row.get('Full_Description', '')
     characters_str = row.get('Characters', '')
@@ -166,6 +190,7 @@ def get_main_characters_nlp(row):
     description_characters = []
     if isinstance(description, str) and description:
         doc = nlp(description)
+        Instrumentation.count('nlp_docs')
         # Get named entities that are people
         named_people = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
         # Get proper nouns as backup
@@ -184,6 +209,7 @@ def get_main_characters_nlp(row):
     full_desc_characters = []
     if len(description_characters) < 4 and isinstance(full_description, str):
         doc = nlp(full_description)
+        Instrumentation.count('nlp_docs')
         potential_names = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
         potential_names += [token.text for token in doc if token.pos_ == "PROPN"]
         
@@ -240,15 +266,19 @@ def get_main_characters_nlp(row):
     
     return main_characters_result[0], main_characters_result[1], main_characters_result[2], main_characters_result[3]
 
-# Apply the new function to get all four main characters
-characters_df = events_df.apply(get_main_characters_nlp, axis=1, result_type='expand')
-characters_df.columns = ['FirstMainCharacter', 'SecondMainCharacter', 'ThirdMainCharacter', 'FourthMainCharacter']
+# Apply the NLP function to get all four main characters
+def assign_main_characters(events_df):
+    with Instrumentation.span('nlp'):
+        characters_df = events_df.apply(get_main_characters_nlp, axis=1, result_type='expand')
+    characters_df.columns = ['FirstMainCharacter', 'SecondMainCharacter', 'ThirdMainCharacter', 'FourthMainCharacter']
+
+    # Add the character columns to the events dataframe
+    events_df['FirstMainCharacter'] = characters_df['FirstMainCharacter']
+    events_df['SecondMainCharacter'] = characters_df['SecondMainCharacter']
+    events_df['ThirdMainCharacter'] = characters_df['ThirdMainCharacter']
+    events_df['FourthMainCharacter'] = characters_df['FourthMainCharacter']
 
-# Add the character columns to the events dataframe
-events_df['FirstMainCharacter'] = characters_df['FirstMainCharacter']
-events_df['SecondMainCharacter'] = characters_df['SecondMainCharacter']
-events_df['ThirdMainCharacter'] = characters_df['ThirdMainCharacter']
-events_df['FourthMainCharacter'] = characters_df['FourthMainCharacter']
+    return events_df
 
 # Dictionary mapping characters to their initial format
 character_initials = {
@@ -429,19 +459,56 @@ def replace_with_character_initials(description):
     return result
 
 # Create a new column with the formatted descriptions
-events_df['FormattedDescription'] = events_df['Description'].apply(replace_with_character_initials)
+def format_descriptions(events_df):
+    with Instrumentation.span('initials'):
+        events_df['FormattedDescription'] = events_df['Description'].apply(replace_with_character_initials)
+    return events_df
+
+# Drop events without main characters and columns not needed downstream
+def filter_events(events_df):
+    # Filter out events with no main characters
+    events_df = events_df[events_df['FirstMainCharacter'].notna()]
+
+    # Reset the index after filtering
+    events_df = events_df.reset_index(drop=True)
+
+    # Remove ID and Ids merged columns
+    columns_to_drop = ['ID', 'IDs_merged']
+    events_df = events_df.drop(columns=[col for col in columns_to_drop if col in events_df.columns])
+
+    return events_df
+
+# Run the whole preprocessing pipeline and write the processed event table
+def preprocess(events_path='Data/Dark_GD_Contest_Events', edges_path='ed.csv', output_path='evPLUS.csv'):
+    events_df, edges_df = load_data(events_path, edges_path)
+    events_df = assign_edge_types(events_df, edges_df)
+    events_df = assign_main_characters(events_df)
+    events_df = format_descriptions(events_df)
+    events_df = filter_events(events_df)
+
+    # Export the filtered events dataframe to CSV for reference
+    events_df.to_csv(output_path, index=False)
+    print(f"Events data exported to {output_path}")
+
+    return events_df
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Preprocess the raw Dark event and edge tables.")
+    parser.add_argument('--events', default='Data/Dark_GD_Contest_Events', help="raw event table (CSV)")
+    parser.add_argument('--edges', default='ed.csv', help="edge table (CSV with Source, Target, Type)")
+    parser.add_argument('--output', default='evPLUS.csv', help="processed event table to write")
+    parser.add_argument('--trace', action='store_true', help="write per-stage timings and counters")
+    args = parser.parse_args(argv)
 
-# Filter out events with no main characters
-events_df = events_df[events_df['FirstMainCharacter'].notna()]
+    if args.trace:
+        Instrumentation.enable()
 
-# Reset the index after filtering
-events_df.reset_index(drop=True, inplace=True)
+    preprocess(args.events, args.edges, args.output)
 
-# Remove ID and Ids merged columns
-columns_to_drop = ['ID', 'IDs_merged']
-events_df = events_df.drop(columns=[col for col in columns_to_drop if col in events_df.columns])
+    # Per-stage timings and counters (only with --trace or DARK_TIMELINE_TRACE=1)
+    Instrumentation.write_reports("Results/preprocessing_trace")
 
-# Export the filtered events dataframe to CSV for reference
-events_csv_path = "evPLUS.csv"
-events_df.to_csv(events_csv_path, index=False)
-print(f"Events data exported to {events_csv_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
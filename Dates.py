@@ -0,0 +1,116 @@
+"""
+Date preprocessing for the event tables.
+
+Dates are parsed once with explicit formats (format='mixed' infers the format of
+every single value, which is slow), and the strings and keys used while rendering
+are precomputed as columns so the render loop never formats a date:
+
+    DateISO       '%Y-%m-%d'   grouping, hover text, date index
+    DateDMY       '%d-%m-%Y'   date background colours
+    DateSlash     '%d/%m/%Y'   first tick label of a year, time travel destinations
+    DateDayMonth  '%d/%m'      other tick labels
+    DateKey       int YYYYMMDD grouping and comparisons
+    Year          int
+"""
+import numpy as np
+import pandas as pd
+
+# Tried in order; whatever none of them matches is parsed with format='mixed'
+DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d.%m.%Y', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M']
+
+DATE_COLUMNS = ['DateISO', 'DateDMY', 'DateSlash', 'DateDayMonth', 'DateKey', 'Year']
+
+def parse_dates(values):
+    """Parse a Series of date strings (day first) using DATE_FORMATS, then a mixed-format fallback."""
+    values = pd.Series(values)
+
+    # Many events share a date, so every distinct string is parsed only once
+    codes, uniques = pd.factorize(values)
+    strings = np.asarray(uniques, dtype=object)
+    # One extra NaT slot at the end, picked by the code -1 of missing values
+    parsed_unique = np.full(len(strings) + 1, np.datetime64('NaT'), dtype='datetime64[ns]')
+    remaining = np.ones(len(strings), dtype=bool)
+
+    for date_format in DATE_FORMATS + ['mixed']:
+        positions = np.flatnonzero(remaining)
+        if len(positions) == 0:
+            break
+        if date_format == 'mixed':
+            attempt = pd.to_datetime(strings[positions], format='mixed', dayfirst=True)
+        else:
+            attempt = pd.to_datetime(strings[positions], format=date_format, errors='coerce')
+        matched = ~attempt.isna()
+        parsed_unique[positions[matched]] = attempt[matched].to_numpy(dtype='datetime64[ns]')
+        remaining[positions[matched]] = False
+
+    return pd.Series(parsed_unique[codes], index=values.index, name=values.name)
+
+def add_date_columns(events_df):
+    """Return a copy of events_df (with a parsed 'Date' column) plus the DATE_COLUMNS."""
+    events_df = events_df.copy()
+    dates = events_df['Date']
+
+    # Format each distinct date once; many events share a date
+    unique_dates = pd.Series(dates.dropna().unique())
+    formatted = pd.DataFrame({
+        'DateISO': unique_dates.dt.strftime('%Y-%m-%d'),
+        'DateDMY': unique_dates.dt.strftime('%d-%m-%Y'),
+        'DateSlash': unique_dates.dt.strftime('%d/%m/%Y'),
+        'DateDayMonth': unique_dates.dt.strftime('%d/%m')
+    })
+    formatted.index = unique_dates
+    for column in formatted.columns:
+        events_df[column] = dates.map(formatted[column]).fillna('')
+
+    events_df['DateKey'] = (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).fillna(0).astype('int64')
+    events_df['Year'] = dates.dt.year.fillna(0).astype('int64')
+
+    return events_df
+
+def prepare_events(events_df):
+    """Parse the 'Date' column and add the precomputed date columns."""
+    events_df = events_df.copy()
+    events_df['Date'] = parse_dates(events_df['Date'])
+    return add_date_columns(events_df)
+
+# Non-participant backgrounds alternate between two colours from one date to the next.
+# A breakpoint forces the band of its date and sets whether later dates use the
+# swapped pattern: (date as 'YYYY-MM-DD' or int YYYYMMDD, band of that date, swap after)
+DATE_BAND_COLORS = ("#151B23", "#152323")
+DATE_BAND_BREAKPOINTS = [
+    ('1921-06-21', 0, True),
+    ('2021-01-01', 1, False)
+]
+
+def _date_key(date):
+    return int(date.replace('-', '')) if isinstance(date, str) else int(date)
+
+def date_bands(date_keys, breakpoints=DATE_BAND_BREAKPOINTS):
+    """
+    Band index (0/1) for every row of date_keys (the DateKey column), in one pass:
+    distinct dates are numbered in order of appearance and alternate, with the
+    pattern switched at the breakpoints that occur in the data.
+    """
+    codes, uniques = pd.factorize(pd.Series(date_keys))
+    uniques = np.asarray(uniques)
+
+    bands = np.arange(len(uniques)) % 2
+    swapped = np.zeros(len(uniques), dtype=np.int64)
+    forced = []
+
+    positions = []
+    for date, band, swap_after in breakpoints:
+        matches = np.flatnonzero(uniques == _date_key(date))
+        if len(matches):
+            positions.append((matches[0], band, swap_after))
+
+    # Later breakpoints override the pattern of everything after them
+    for position, band, swap_after in sorted(positions):
+        swapped[position + 1:] = int(swap_after)
+        forced.append((position, band))
+
+    bands = bands ^ swapped
+    for position, band in forced:
+        bands[position] = band
+
+    return bands[codes]
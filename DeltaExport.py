@@ -0,0 +1,285 @@
+"""
+Delta export of the interactive timeline: the figure is published as content-hashed
+chunks, so a data fix only replaces the chunks it touches.
+
+    timeline.html            page shell: layout, page scripts and the chunk loader
+    plotly.min.js            plotly.js, shared by every shell in the folder
+    timeline.chunks.json     chunk list {chunk name: file} and item order, the only
+                             file revalidated on every visit
+    timeline.chunks/<hash>.json
+                             traces, shapes, hover texts and event records of one window
+
+Chunks are windows of CHUNK_COLUMNS event columns (output positions); primitives that
+span several windows (character labels, world strip, overview heatmap...) go to the
+global chunk. Windows interleave in the figure (all backgrounds are drawn before
+the rectangles...), so the chunk list records the order as runs of [chunk name,
+item count] and the page rebuilds the exact trace and shape order from it; an edit
+that adds or drops a shape only changes its own chunk and the runs. A chunk file is
+named after the hash of its content:
+an unchanged chunk keeps its file (and every visitor's cached copy), and diff()
+against the previous chunk list tells which ones a build replaced. Inserting an
+event shifts the columns after it, so those windows change too.
+"""
+import hashlib
+import json
+import os
+import re
+
+import Serializer
+
+# Event columns per chunk
+CHUNK_COLUMNS = 50
+
+GLOBAL_CHUNK = 'global'
+
+# Hex digits of the content hash kept in chunk file names
+HASH_LENGTH = 16
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?')
+
+def _x_values(item):
+    """x coordinates of a trace or shape JSON dict, or None when it is not tied to the x axis."""
+    if 'path' in item or 'x0' in item:
+        if item.get('xref', 'x') != 'x':
+            return None
+        if 'path' in item:
+            # Paths are absolute "M x y L x y Q x y x y ... Z" commands: x and y alternate
+            return [float(value) for value in _NUMBER.findall(item['path'])[0::2]]
+        return [item['x0'], item['x1']]
+    x = item.get('x')
+    if x is None:
+        return None
+    if hasattr(x, 'tolist'):
+        x = x.tolist()
+    return [value for value in x if isinstance(value, (int, float)) and not isinstance(value, bool)]
+
+def window_of(xs, window_width, event_spacing):
+    """Chunk name of an item covering the x values xs."""
+    if not xs:
+        return GLOBAL_CHUNK
+    # Columns are centred on output_position * event_spacing
+    first = int((min(xs) + event_spacing / 2) // window_width)
+    last = int((max(xs) + event_spacing / 2) // window_width)
+    return f"w{first}" if first == last else GLOBAL_CHUNK
+
+def split_figure(fig, events, precision=Serializer.FLOAT_PRECISION, columns=CHUNK_COLUMNS):
+    """
+    Split a timeline figure and its allEventsData records (Serializer.events_payload)
+    into (chunks, order):
+    - chunks: {chunk name: {'traces': [...], 'shapes': [...], 'events': [...],
+      'hover': {event_idx: hover texts}, 'palette_shapes': [...]}}, items in figure
+      order; palette_shapes holds the palette slot of every shape (see Palette.py)
+    - order: {'traces' / 'shapes' / 'events': [[chunk name, item count], ...]}, the
+      runs that interleave the chunks' items back into figure order
+    Hover texts and event records go to the chunk of the event's hover marker.
+    """
+    meta = fig.layout.meta or {}
+    event_spacing = meta.get('event_spacing', 1.0)
+    window_width = event_spacing * columns
+    hover_events = (meta.get('hover') or {}).get('events', {})
+    palette_shapes = meta.get('palette_shapes') or []
+
+    chunks = {}
+    order = {'traces': [], 'shapes': [], 'events': []}
+
+    def chunk(name):
+        return chunks.setdefault(name, {'traces': [], 'shapes': [], 'events': [], 'hover': {}, 'palette_shapes': []})
+
+    def add(name, kind, item):
+        chunk(name)[kind].append(item)
+        runs = order[kind]
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+
+    event_windows = {}
+    for trace in fig.data:
+        trace = Serializer.round_floats(trace.to_plotly_json(), precision)
+        name = window_of(_x_values(trace), window_width, event_spacing)
+        add(name, 'traces', trace)
+
+        trace_meta = trace.get('meta')
+        if isinstance(trace_meta, dict) and trace_meta.get('hover') is not None and trace.get('customdata'):
+            event_idx = trace['customdata'][0][0]
+            event_windows.setdefault(event_idx, name)
+
+    for index, shape in enumerate(fig.layout.to_plotly_json().get('shapes', [])):
+        shape = Serializer.round_floats(shape, precision)
+        name = window_of(_x_values(shape), window_width, event_spacing)
+        add(name, 'shapes', shape)
+        chunk(name)['palette_shapes'].append(palette_shapes[index] if index < len(palette_shapes) else -1)
+
+    for record in events:
+        add(event_windows.get(record['event_idx'], GLOBAL_CHUNK), 'events', record)
+
+    for event_idx, texts in hover_events.items():
+        # Keys are strings in a figure read back from JSON (plotly.io.read_json)
+        chunk(event_windows.get(int(event_idx), GLOBAL_CHUNK))['hover'][str(event_idx)] = texts
+
+    return chunks, order
+
+def chunk_file(payload):
+    """File name of a serialized chunk: its content hash."""
+    return f"{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:HASH_LENGTH]}.json"
+
+def load_chunk_list(path):
+    """{chunk name: file} of a previous build's chunk list ({} when there is none)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get('chunks', {})
+
+def diff(previous, current):
+    """Compare two chunk lists: {'added', 'changed', 'removed', 'unchanged'} chunk names."""
+    return {
+        'added': sorted(name for name in current if name not in previous),
+        'changed': sorted(name for name in current if name in previous and previous[name] != current[name]),
+        'removed': sorted(name for name in previous if name not in current),
+        'unchanged': sorted(name for name in current if previous.get(name) == current[name])
+    }
+
+def write_chunks(fig, events, output_dir, stem, precision=Serializer.FLOAT_PRECISION, columns=CHUNK_COLUMNS):
+    """
+    Write the chunks of a figure to <stem>.chunks/ and the chunk list to <stem>.chunks.json
+    in output_dir. Only new chunk files are written and files no longer listed are removed.
+    Returns (chunk list file name, diff against the previous build).
+    """
+    list_name = f"{stem}.chunks.json"
+    chunk_dir = f"{stem}.chunks"
+    list_path = os.path.join(output_dir, list_name)
+    os.makedirs(os.path.join(output_dir, chunk_dir), exist_ok=True)
+
+    previous = load_chunk_list(list_path)
+    chunks, order = split_figure(fig, events, precision, columns)
+    current = {}
+    for name, content in chunks.items():
+        payload = Serializer.dumps(content)
+        file_name = f"{chunk_dir}/{chunk_file(payload)}"
+        current[name] = file_name
+        path = os.path.join(output_dir, file_name)
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(payload)
+
+    # Ordered by window so the page can fetch from the start of the timeline
+    def position(name):
+        return (name != GLOBAL_CHUNK, int(name[1:]) if name != GLOBAL_CHUNK else 0)
+    current = {name: current[name] for name in sorted(current, key=position)}
+
+    with open(list_path, "w", encoding="utf-8") as f:
+        json.dump({'chunks': current, 'order': order}, f, separators=(',', ':'))
+    prune_chunks(output_dir, list_name)
+
+    return list_name, diff(previous, current)
+
+def prune_chunks(output_dir, list_name):
+    """Remove the chunk files of output_dir/<stem>.chunks/ that the chunk list no longer names."""
+    chunk_dir = os.path.join(output_dir, list_name[:-len('.json')])
+    listed = {os.path.basename(file_name) for file_name in load_chunk_list(os.path.join(output_dir, list_name)).values()}
+    for file_name in os.listdir(chunk_dir):
+        if file_name.endswith('.json') and file_name not in listed:
+            os.remove(os.path.join(chunk_dir, file_name))
+
+def write_plotlyjs(output_dir):
+    """Write plotly.min.js next to the chunked shells (only when it changed)."""
+    from plotly.offline import get_plotlyjs
+
+    path = os.path.join(output_dir, 'plotly.min.js')
+    plotlyjs = get_plotlyjs()
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            if f.read() == plotlyjs:
+                return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(plotlyjs)
+
+# Page script of a chunked shell: fetches the chunk list (revalidated on every visit)
+# and the chunks it names. Chunk files never change, so they are kept in Cache Storage
+# where available and only chunks missing from it are downloaded; the cache is pruned
+# to the current list. Then the figure is rebuilt in its original order and plotted,
+# and the onTimelineReady callbacks run.
+LOADER_JS = """
+var timelineReadyCallbacks = [];
+var timelineReady = null;
+function onTimelineReady(callback) {
+    if (timelineReady) { callback(); } else { timelineReadyCallbacks.push(callback); }
+}
+(function() {
+    var cacheName = 'dark-timeline-chunks';
+    var listUrl = new URL(%(chunk_list)s, document.baseURI).href;
+
+    function openCache() {
+        return (window.caches ? caches.open(cacheName) : Promise.reject()).catch(function() { return null; });
+    }
+
+    function fetchChunk(cache, url) {
+        var cached = cache ? cache.match(url) : Promise.resolve(undefined);
+        return cached.then(function(response) {
+            if (response) { return response.json(); }
+            return fetch(url).then(function(response) {
+                if (!response.ok) { throw new Error('Chunk ' + url + ': HTTP ' + response.status); }
+                if (cache) { cache.put(url, response.clone()); }
+                return response.json();
+            });
+        });
+    }
+
+    var chunksLoaded = Promise.all([
+        fetch(listUrl, {cache: 'no-cache'}).then(function(response) { return response.json(); }),
+        openCache()
+    ]).then(function(results) {
+        var list = results[0], cache = results[1];
+        var names = Object.keys(list.chunks);
+        var urls = names.map(function(name) { return new URL(list.chunks[name], listUrl).href; });
+        if (cache) {
+            cache.keys().then(function(requests) {
+                requests.forEach(function(request) {
+                    if (request.url.indexOf(listUrl.replace(/\\.json$/, '/')) === 0 && urls.indexOf(request.url) < 0) {
+                        cache.delete(request);
+                    }
+                });
+            });
+        }
+        return Promise.all(urls.map(function(url) { return fetchChunk(cache, url); })).then(function(loaded) {
+            var chunks = {};
+            names.forEach(function(name, i) { chunks[name] = loaded[i]; });
+            return {chunks: chunks, order: list.order};
+        });
+    });
+    var domLoaded = new Promise(function(resolve) { document.addEventListener('DOMContentLoaded', resolve); });
+
+    // Items of one kind in figure order: take "count" items from the named chunk per run
+    // (the runs of "runs", default kind itself)
+    function interleave(loaded, kind, runs) {
+        var items = [], taken = {};
+        loaded.order[runs || kind].forEach(function(run) {
+            var start = taken[run[0]] || 0;
+            items.push.apply(items, loaded.chunks[run[0]][kind].slice(start, start + run[1]));
+            taken[run[0]] = start + run[1];
+        });
+        return items;
+    }
+
+    Promise.all([chunksLoaded, domLoaded]).then(function(results) {
+        var loaded = results[0];
+        Object.values(loaded.chunks).forEach(function(chunk) { Object.assign(timelineHover.events, chunk.hover); });
+        var traces = interleave(loaded, 'traces'), shapes = interleave(loaded, 'shapes');
+        var events = interleave(loaded, 'events');
+        allEventsData = events;
+        var graphDiv = document.getElementsByClassName('plotly-graph-div')[0];
+        var meta = Object.assign({}, graphDiv.layout.meta, {palette_shapes: interleave(loaded, 'palette_shapes', 'shapes')});
+        var layout = Object.assign({}, graphDiv.layout, {shapes: shapes, meta: meta});
+        return Plotly.react(graphDiv, hydrateHoverTraces(traces), layout);
+    }).then(function() {
+        timelineReady = true;
+        timelineReadyCallbacks.splice(0).forEach(function(callback) { callback(); });
+    }).catch(function(error) {
+        console.error('Timeline chunks could not be loaded', error);
+    });
+})();
+"""
+
+def loader_script(chunk_list):
+    """<script> block loading the chunks named in chunk_list (URL relative to the page)."""
+    return f"<script>{LOADER_JS % {'chunk_list': json.dumps(chunk_list)}}</script>"
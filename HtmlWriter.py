@@ -0,0 +1,80 @@
+"""
+Streams a Plotly figure to a standalone HTML page.
+
+pio.to_html builds the whole page - plotly.js plus the figure JSON - as one string,
+and every str.replace used to inject CSS or JavaScript copies it again. Here the page
+skeleton comes from pio.to_html on an empty figure of the same size, and the traces
+and layout shapes are serialized in batches by Serializer and written straight to
+the file, so memory no longer grows with the page size.
+"""
+import uuid
+
+import Serializer
+
+def write_figure_html(fig, output_path, config=None, head_html='', body_html=(),
+                      precision=Serializer.FLOAT_PRECISION, data_function=None, exclude_meta=(),
+                      include_plotlyjs=True, include_data=True):
+    """
+    Write fig as a standalone page (plotly.js included) to output_path.
+
+    - head_html: markup inserted right after <head>
+    - body_html: iterable of markup chunks written before </body>, e.g. a generator
+      that streams a large data script
+    - precision: decimals kept for floats in the figure (None keeps full precision)
+    - data_function: name of a page function (e.g. defined in head_html) the trace
+      array is passed through before plotting
+    - exclude_meta: layout.meta keys left out of the page, e.g. data that head_html
+      already ships in another form
+    - include_plotlyjs: as for pio.to_html, e.g. 'directory' to load plotly.min.js from
+      the page's folder
+    - include_data: False writes the layout without traces and shapes, for pages that
+      load them separately (see DeltaExport.py)
+    """
+    import plotly.io as pio
+    from plotly.io.json import to_json_plotly
+
+    div_id = str(uuid.uuid4())
+
+    layout = fig.layout.to_plotly_json()
+    shapes = layout.pop('shapes', []) if include_data else []
+    layout.pop('shapes', None)
+    if exclude_meta and isinstance(layout.get('meta'), dict):
+        layout['meta'] = {key: value for key, value in layout['meta'].items() if key not in exclude_meta}
+
+    # Skeleton page with the real figure size; the marker layout is swapped for the real one
+    marker_layout = {'width': layout.get('width'), 'height': layout.get('height'), 'streamed': div_id}
+    skeleton = pio.to_html({'data': [], 'layout': marker_layout}, include_plotlyjs=include_plotlyjs,
+                           config=config, div_id=div_id, validate=False)
+    marker_json = to_json_plotly(marker_layout)
+    layout_at = skeleton.index(marker_json)
+    data_at = skeleton.rindex('[]', 0, layout_at)
+
+    before_data = skeleton[:data_at].replace('<head>', '<head>' + head_html, 1)
+    between = skeleton[data_at + 2:layout_at]
+    after_layout, page_end = skeleton[layout_at + len(marker_json):].rsplit('</body>', 1)
+    del skeleton
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(before_data)
+
+        if data_function:
+            f.write(f'{data_function}(')
+        traces = fig.data if include_data else ()
+        f.writelines(Serializer.json_array_chunks((trace.to_plotly_json() for trace in traces), precision))
+        if data_function:
+            f.write(')')
+        f.write(between)
+
+        layout_json = Serializer.dumps(Serializer.round_floats(layout, precision))
+        if shapes:
+            f.write(layout_json[:-1])
+            f.write(',"shapes":' if len(layout_json) > 2 else '"shapes":')
+            f.writelines(Serializer.json_array_chunks(shapes, precision))
+            f.write('}')
+        else:
+            f.write(layout_json)
+
+        f.write(after_layout)
+        f.writelines(body_html)
+        f.write('</body>')
+        f.write(page_end)
@@ -0,0 +1,94 @@
+"""
+Participation indicators of merged events as one instanced layer.
+
+A character taking part in several events of a merged group gets a silver mark
+per event on its rectangle: an L-shaped corner (events 0-3: top left, top right,
+bottom left, bottom right) or a short vertical line on a side (events 4-5). All
+marks are instances of two outlines - the top-left corner and the left line -
+mirrored into place, and are drawn as one filled scatter trace (polygons separated
+by gaps) instead of one layout shape each.
+"""
+
+# Kind of mark per event position in a merged group, and the mirroring (x, y) of its outline
+CORNERS = ('top_left', 'top_right', 'bottom_left', 'bottom_right', 'left_line', 'right_line')
+_MIRROR = {
+    'top_left': (1, 1), 'top_right': (-1, 1), 'bottom_left': (1, -1), 'bottom_right': (-1, -1),
+    'left_line': (1, 1), 'right_line': (-1, 1)
+}
+
+COLOR = "rgba(192, 192, 192, 0.9)"  # Bright silver with slight transparency
+BORDER_COLOR = '#111111'  # Plot background color
+BORDER_WIDTH = 0.12  # Width of the indicator border
+
+# Segments approximating the rounded corner of an L-shaped mark
+CURVE_STEPS = 4
+
+TRACE_NAME = 'indicator_layer'
+
+def _quadratic(start, control, end, steps=CURVE_STEPS):
+    """Points of a quadratic Bezier curve after start, up to and including end."""
+    points = []
+    for step in range(1, steps + 1):
+        t = step / steps
+        points.append(tuple((1 - t) ** 2 * a + 2 * (1 - t) * t * b + t ** 2 * c
+                            for a, b, c in zip(start, control, end)))
+    return points
+
+def corner_outline(corner_radius, border_width=BORDER_WIDTH):
+    """Outline of the top-left mark relative to the rectangle corner (y grows downwards)."""
+    length = border_width * 1.8  # Length of the arms extending from corner
+    thickness = border_width * 0.6  # Consistent thickness for all indicators
+    r = corner_radius
+    # Slim L-shape following the rectangle contour: outer edge, then the inset inner edge
+    outline = [(0, r + length), (0, r)]
+    outline += _quadratic((0, r), (0, 0), (r, 0))
+    outline += [(r + length, 0), (r + length, thickness), (r, thickness)]
+    outline += _quadratic((r, thickness), (thickness, thickness), (thickness, r))
+    outline.append((thickness, r + length))
+    return outline
+
+def line_outline(rect_height, border_width=BORDER_WIDTH):
+    """Outline of the left-side mark relative to the middle of the rectangle's left edge."""
+    line_length = rect_height * 0.35  # Slightly shorter for better proportion
+    thickness = border_width * 0.6 * 0.5  # Vertical lines are slimmer
+    return [(0, -line_length / 2), (thickness, -line_length / 2), (thickness, line_length / 2), (0, line_length / 2)]
+
+class IndicatorLayer:
+    """Collects the marks of a render; trace() returns them as a single Scatter."""
+
+    def __init__(self, corner_radius, rect_height):
+        corner = corner_outline(corner_radius)
+        line = line_outline(rect_height)
+        self.outlines = {
+            kind: [(dx * sx, dy * sy) for dx, dy in (line if kind.endswith('_line') else corner)]
+            for kind, (sx, sy) in _MIRROR.items()
+        }
+        self.x = []
+        self.y = []
+        self.count = 0
+
+    def add(self, kind, x, y):
+        """Mark of kind (one of CORNERS) anchored at the rectangle corner / side point (x, y)."""
+        outline = self.outlines[kind]
+        if self.count:
+            self.x.append(None)
+            self.y.append(None)
+        # Closed polygon: back to the first point
+        self.x.extend(x + dx for dx, _ in outline + outline[:1])
+        self.y.extend(y + dy for _, dy in outline + outline[:1])
+        self.count += 1
+
+    def trace(self):
+        import plotly.graph_objects as go
+
+        return go.Scatter(
+            x=self.x,
+            y=self.y,
+            mode='lines',
+            fill='toself',
+            fillcolor=COLOR,
+            line=dict(width=0.5, color=BORDER_COLOR),  # Thin border with background color
+            hoverinfo='skip',
+            showlegend=False,
+            name=TRACE_NAME
+        )
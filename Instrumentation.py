@@ -0,0 +1,136 @@
+"""
+Lightweight stage timing and counters for the timeline pipeline.
+
+Instrumentation is disabled by default and then costs a single flag check per call.
+Enable it with the DARK_TIMELINE_TRACE environment variable, the --trace flag of
+the scripts, or enable(). Stages can be timed with the span() context manager, or
+with start()/stop() inside long loops where a with-block would not fit. Repeated
+stages are accumulated, e.g. "layout" is summed over all event groups, and every
+single span is kept so the run can be opened as a flame view in chrome://tracing
+or Perfetto.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENV_VAR = 'DARK_TIMELINE_TRACE'
+
+_enabled = os.environ.get(ENV_VAR, '').lower() not in ('', '0', 'false', 'no')
+_stage_totals = {}  # {stage name: [total seconds, calls]}
+_counters = {}      # {counter name: value}
+_spans = []         # [(name, start seconds, duration seconds, process id, thread id)]
+_origin = time.perf_counter()
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    # The origin is kept, so spans of forked worker processes share the parent's time axis
+    _stage_totals.clear()
+    _counters.clear()
+    _spans.clear()
+
+def start(name):
+    """Begin timing a stage. Returns a token for stop(), or None when disabled."""
+    if not _enabled:
+        return None
+    return (name, time.perf_counter())
+
+def stop(token):
+    """Finish timing a stage started with start()."""
+    if token is None:
+        return
+    name, started = token
+    elapsed = time.perf_counter() - started
+    totals = _stage_totals.setdefault(name, [0.0, 0])
+    totals[0] += elapsed
+    totals[1] += 1
+    _spans.append((name, started - _origin, elapsed, os.getpid(), threading.get_ident()))
+
+@contextmanager
+def span(name):
+    token = start(name)
+    try:
+        yield
+    finally:
+        stop(token)
+
+def count(name, amount=1):
+    """Add to a counter, e.g. count('shapes', len(all_shapes))."""
+    if not _enabled:
+        return
+    _counters[name] = _counters.get(name, 0) + amount
+
+def stage_totals():
+    """Accumulated timings: {stage name: {'seconds': total, 'calls': count}}."""
+    return {name: {'seconds': total, 'calls': calls} for name, (total, calls) in _stage_totals.items()}
+
+def counters():
+    return dict(_counters)
+
+def snapshot():
+    """Everything recorded so far, as a picklable dict for merge() in another process."""
+    return {'stages': dict(_stage_totals), 'counters': counters(), 'spans': list(_spans)}
+
+def merge(recorded):
+    """Add the snapshot() of a worker process to this process's totals, counters and spans."""
+    for name, (total, calls) in recorded['stages'].items():
+        totals = _stage_totals.setdefault(name, [0.0, 0])
+        totals[0] += total
+        totals[1] += calls
+    for name, value in recorded['counters'].items():
+        _counters[name] = _counters.get(name, 0) + value
+    _spans.extend(recorded['spans'])
+
+def export_json(output_path):
+    """Write stage totals, counters and every recorded span as plain JSON."""
+    report = {
+        'stages': stage_totals(),
+        'counters': counters(),
+        'spans': [
+            {'name': name, 'start': started, 'seconds': duration, 'pid': pid}
+            for name, started, duration, pid, _ in sorted(_spans, key=lambda s: s[1])
+        ]
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+def export_chrome_trace(output_path):
+    """Write the recorded spans and counters in the Chrome trace-event format."""
+    pid = os.getpid()
+    events = [
+        {'name': name, 'cat': 'pipeline', 'ph': 'X', 'pid': span_pid, 'tid': tid,
+         'ts': started * 1e6, 'dur': duration * 1e6}
+        for name, started, duration, span_pid, tid in _spans
+    ]
+
+    # Counters are emitted once, at the end of the run
+    end = max((started + duration for _, started, duration, _, _ in _spans), default=0.0)
+    for name, value in _counters.items():
+        events.append({'name': name, 'cat': 'counters', 'ph': 'C', 'pid': pid,
+                       'ts': end * 1e6, 'args': {name: value}})
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+def write_reports(output_prefix):
+    """When enabled, write <prefix>.json and <prefix>.trace.json and print a summary."""
+    if not _enabled:
+        return
+    output_dir = os.path.dirname(output_prefix)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    export_json(f"{output_prefix}.json")
+    export_chrome_trace(f"{output_prefix}.trace.json")
+
+    for name, totals in stage_totals().items():
+        print(f"  {name:<28} {totals['seconds']:9.3f} s  ({totals['calls']} calls)")
+    for name, value in _counters.items():
+        print(f"  {name:<28} {value:>9}")
+    print(f"Instrumentation written to {output_prefix}.json and {output_prefix}.trace.json")
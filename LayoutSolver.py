@@ -0,0 +1,184 @@
+"""
+Vertical layout of the event rectangles in one timeline column.
+
+A rectangle whose description does not fit in three lines grows into the space
+above and/or below it, and an active neighbour it grows into is contracted. Single
+events and merged groups follow the same rules; they only differ in which characters
+are active and which own a description. Neighbours are looked up in a table built
+once per render, and y0/y1 come from per-state coordinate tables, so a column is
+solved without sorting characters or branching per rectangle.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# States of a rectangle edge, i.e. how far it reaches from the character's position:
+# rect_height/2, rect_height, 0.85*rect_height, rect_height/2 + rect_height/3, rect_height/8
+BASE, FULL, SHRUNK, EXTRA, CONTRACTED = range(5)
+
+# characters: characters in char_positions order; index: {character: position in that order}
+# rank: place in vertical order; above/below: vertical neighbour (None at the edges)
+# top/bottom: y0/y1 of every character's rectangle, one row per edge state
+NeighbourTable = namedtuple('NeighbourTable', ['characters', 'index', 'rank', 'above', 'below', 'top', 'bottom'])
+
+# expansions / contractions: {character: info dict} as read by add_description_text
+# y0 / y1: rectangle extent of every character, indexed like NeighbourTable.characters
+ColumnLayout = namedtuple('ColumnLayout', ['expansions', 'contractions', 'y0', 'y1'])
+
+def build_neighbours(char_positions, rect_height):
+    """Neighbour table for {character: y position}; built once per render."""
+    characters = list(char_positions)
+    positions = np.array([char_positions[char] for char in characters], dtype=float)
+    order = sorted(range(len(characters)), key=lambda i: positions[i])
+
+    rank = [0] * len(characters)
+    above = [None] * len(characters)
+    below = [None] * len(characters)
+    for place, i in enumerate(order):
+        rank[i] = place
+        if place > 0:
+            above[i] = characters[order[place - 1]]
+        if place < len(order) - 1:
+            below[i] = characters[order[place + 1]]
+
+    top = np.array([
+        positions - rect_height/2,
+        positions - rect_height,
+        positions - rect_height * 0.85,
+        positions - rect_height/2 - rect_height/3,
+        positions - rect_height/8
+    ])
+    bottom = np.array([
+        positions + rect_height/2,
+        positions + rect_height,
+        positions + rect_height * 0.85,
+        positions + rect_height/2 + rect_height/3,
+        positions + rect_height/8
+    ])
+
+    return NeighbourTable(characters, {char: i for i, char in enumerate(characters)},
+                          rank, above, below, top, bottom)
+
+def _contraction(contract_above, height):
+    return {
+        'contract_above': contract_above,
+        'contract_below': not contract_above,
+        'contracted_height': height
+    }
+
+def _expand(char_rank, char_above, char_below, above_is_active, below_is_active,
+            char_above_has_text, char_below_has_text, rect_height, asymmetric_expansion):
+    """Expansion of one description owner and the contractions it causes: (expansion, [(character, contraction)])."""
+    contractions = []
+
+    if not above_is_active and not below_is_active:
+        # Expand both directions (no active neighbors to contract)
+        expansion = {'expand_above': True, 'expand_below': True, 'expanded_height': rect_height * 2}
+    elif not above_is_active and below_is_active:
+        if asymmetric_expansion and char_below_has_text:
+            # The rectangle below has text too: expand above only and leave it alone
+            expansion = {'expand_above': True, 'expand_below': False, 'expand_below_extra': False,
+                         'expanded_height': rect_height * 1.5}
+        else:
+            # Expand above, contract below - extend slightly into contracted space
+            expansion = {'expand_above': True, 'expand_below': False, 'expand_below_extra': True,
+                         'expanded_height': rect_height * 1.5}
+            if char_below and not char_below_has_text:
+                contractions.append((char_below, _contraction(True, rect_height * 0.4)))
+    elif above_is_active and not below_is_active:
+        if asymmetric_expansion and char_above_has_text:
+            # The rectangle above has text too: expand below only and leave it alone
+            expansion = {'expand_above': False, 'expand_below': True, 'expand_above_extra': False,
+                         'expanded_height': rect_height * 1.5}
+        else:
+            # Expand below, contract above - extend slightly into contracted space
+            expansion = {'expand_above': False, 'expand_below': True, 'expand_above_extra': True,
+                         'expanded_height': rect_height * 1.5}
+            if char_above and not char_above_has_text:
+                contractions.append((char_above, _contraction(False, rect_height * 0.4)))
+    elif asymmetric_expansion and char_above_has_text and char_below_has_text:
+        # Both neighbors have text: upper characters (even rank) expand above only, the others below only
+        if char_rank % 2 == 0:
+            expansion = {'expand_above': True, 'expand_below': False, 'expand_above_extra': False,
+                         'expanded_height': rect_height * 1.5}
+        else:
+            expansion = {'expand_above': False, 'expand_below': True, 'expand_below_extra': False,
+                         'expanded_height': rect_height * 1.5}
+    elif asymmetric_expansion and char_above_has_text:
+        # Only the neighbor above has text: expand below only and contract the one below
+        expansion = {'expand_above': False, 'expand_below': True, 'expand_below_extra': False,
+                     'expanded_height': rect_height * 1.5}
+        if char_below:
+            contractions.append((char_below, _contraction(True, rect_height * 0.3)))
+    elif asymmetric_expansion and char_below_has_text:
+        # Only the neighbor below has text: expand above only and contract the one above
+        expansion = {'expand_above': True, 'expand_below': False, 'expand_above_extra': False,
+                     'expanded_height': rect_height * 1.5}
+        if char_above:
+            contractions.append((char_above, _contraction(False, rect_height * 0.3)))
+    else:
+        # Both neighbors active, expand moderately and contract both neighbors more
+        expansion = {'expand_above': True, 'expand_below': True, 'expand_above_extra': True,
+                     'expand_below_extra': True, 'expanded_height': rect_height * 0.9}
+        if char_above and not char_above_has_text:
+            contractions.append((char_above, _contraction(False, rect_height * 0.3)))
+        if char_below and not char_below_has_text:
+            contractions.append((char_below, _contraction(True, rect_height * 0.3)))
+
+    return expansion, contractions
+
+def solve_column(neighbours, owners, active, text_owners, rect_height, asymmetric_expansion=False):
+    """
+    Lay out one column.
+
+    - neighbours: NeighbourTable of the render
+    - owners: characters whose description hit the line limit, in the order they are placed
+      (a later owner's contraction of a shared neighbour replaces an earlier one)
+    - active: characters with a rectangle in this column
+    - text_owners: characters that show a description in this column
+    """
+    expansions = {}
+    contractions = {}
+    for char in owners:
+        i = neighbours.index.get(char)
+        if i is None:
+            continue
+        char_above, char_below = neighbours.above[i], neighbours.below[i]
+        expansion, contracted = _expand(
+            neighbours.rank[i], char_above, char_below,
+            char_above in active if char_above else False,
+            char_below in active if char_below else False,
+            char_above in text_owners if char_above else False,
+            char_below in text_owners if char_below else False,
+            rect_height, asymmetric_expansion)
+        expansions[char] = expansion
+        contractions.update(contracted)
+
+    top_state = np.full(len(neighbours.characters), BASE)
+    bottom_state = np.full(len(neighbours.characters), BASE)
+
+    for char, contraction in contractions.items():
+        i = neighbours.index[char]
+        if contraction['contract_above']:
+            top_state[i] = CONTRACTED
+        if contraction['contract_below']:
+            bottom_state[i] = CONTRACTED
+
+    # An expansion replaces any contraction of the same rectangle
+    for char, expansion in expansions.items():
+        i = neighbours.index[char]
+        above_extra = expansion.get('expand_above_extra', False)
+        below_extra = expansion.get('expand_below_extra', False)
+        if expansion['expand_above'] and expansion['expand_below']:
+            top_state[i] = bottom_state[i] = SHRUNK if above_extra and below_extra else FULL
+        elif expansion['expand_above']:
+            top_state[i] = FULL
+            bottom_state[i] = EXTRA if below_extra else BASE
+        elif expansion['expand_below']:
+            top_state[i] = EXTRA if above_extra else BASE
+            bottom_state[i] = FULL
+
+    columns = np.arange(len(neighbours.characters))
+    return ColumnLayout(expansions, contractions,
+                        neighbours.top[top_state, columns].tolist(),
+                        neighbours.bottom[bottom_state, columns].tolist())
@@ -0,0 +1,59 @@
+"""
+Zoom levels of the interactive timeline.
+
+The page zooms by laying the plot out again at a new width with the x axis range
+pinned, so Plotly redraws at native resolution instead of the browser scaling the
+whole rendered document. Every zoom factor maps to a level, and only the shape and
+trace groups of that level are drawn:
+
+    overview    events per character and year (or day/decade) as one heatmap;
+                clicking a cell jumps to that period at full detail
+    rectangles  event rectangles, backgrounds and world strip, no text or buttons
+    full        everything (the exported default)
+
+The levels are stored in layout.meta['lod'] and read by the page script.
+"""
+
+# Levels from the smallest zoom factor up; a level applies from min_zoom until the next one.
+# Shape groups are the shapes' name ('rectangle' when unnamed; the background_grid image of
+# BackgroundGrid.py follows it), trace groups come from TRACE_GROUPS.
+LEVELS = [
+    dict(name='overview', min_zoom=0.0, shapes=[], traces=['overview', 'label']),
+    dict(name='rectangles', min_zoom=0.5, shapes=['rectangle'], traces=['label', 'hover', 'world']),
+    dict(name='full', min_zoom=0.99, shapes=['rectangle'], traces=['label', 'hover', 'text', 'button', 'indicator', 'world'])
+]
+
+# (trace name prefix, group); traces matching none of them are hover markers
+TRACE_GROUPS = [
+    ('text_trace_', 'text'),
+    ('btn_', 'button'),
+    ('character_label_', 'label'),
+    ('overview_', 'overview'),
+    ('indicator_', 'indicator'),
+    ('world_', 'world')
+]
+DEFAULT_TRACE_GROUP = 'hover'
+
+def overview_trace(events_df, main_characters, char_positions, date_index, event_spacing, max_x, bucket='year'):
+    """
+    Hidden density heatmap (events per character and bucket, see Aggregation.py) for
+    the overview level; date_index holds the figure's sorted [ISO date, x] pairs.
+    """
+    import Aggregation
+
+    density = Aggregation.EventDensity(events_df, main_characters)
+    buckets, edges = Aggregation.bucket_edges(date_index, bucket, event_spacing, max_x)
+    return Aggregation.heatmap_trace(density, bucket, buckets, edges,
+                                     [char_positions[char] for char in main_characters], visible=False)
+
+def add_levels(fig, events_df, main_characters, char_positions, event_spacing, max_x, overview_bucket='year'):
+    """
+    Add the overview trace (one cell per character and overview_bucket: 'day', 'year'
+    or 'decade') and the level description (layout.meta['lod']) to a timeline figure.
+    """
+    meta = dict(fig.layout.meta or {})
+    if len(events_df) and meta.get('date_index'):
+        fig.add_trace(overview_trace(events_df, main_characters, char_positions,
+                                     meta['date_index'], event_spacing, max_x, overview_bucket))
+    meta['lod'] = dict(levels=LEVELS, trace_groups=TRACE_GROUPS, default_trace_group=DEFAULT_TRACE_GROUP)
+    fig.update_layout(meta=meta)
@@ -0,0 +1,73 @@
+"""
+Colour tables of the timeline, computed once per render instead of per shape.
+
+Every character gets a slot per variant:
+
+    base       rectangle colour of a normal event (the character colour)
+    dimmed     important events: the base colour at 70% brightness
+    death      death events: grey, the same for every character
+    highlight  the base colour blended 30% towards white
+
+plus a contrasting text colour (black or white) for labels drawn on the base
+colour. Shapes are filled with colors[slot], and the slot of every shape is kept
+in layout.meta['palette_shapes'], so the page can re-theme the figure by swapping
+the colour list (window.setTimelinePalette) without touching the shapes' geometry.
+"""
+
+DEFAULT_COLOR = "#FFFFFF"
+DEATH_COLOR = "#868686"
+DIM_FACTOR = 0.7
+HIGHLIGHT_BLEND = 0.3
+
+VARIANTS = ('base', 'dimmed', 'death', 'highlight')
+
+def _rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+def dim(hex_color, factor=DIM_FACTOR):
+    """hex_color with every channel scaled by factor (truncated, as '#rrggbb')."""
+    return '#%02x%02x%02x' % tuple(int(c * factor) for c in _rgb(hex_color))
+
+def blend(hex_color, amount=HIGHLIGHT_BLEND):
+    """hex_color moved `amount` of the way towards white."""
+    return '#%02x%02x%02x' % tuple(int(round(c + (255 - c) * amount)) for c in _rgb(hex_color))
+
+def contrast_text(hex_color):
+    """'black' on light colours (mean channel above 128), 'white' otherwise."""
+    return 'black' if sum(_rgb(hex_color)) / 3 > 128 else 'white'
+
+class Palette:
+    """Colour slots of a {character: hex colour} mapping; unknown characters use DEFAULT_COLOR."""
+
+    def __init__(self, character_colors):
+        self.colors = []
+        self.slots = []      # (character, variant) of every slot; character None is the default
+        self._index = {}
+        self.text = {}
+        for char, color in [*character_colors.items(), (None, DEFAULT_COLOR)]:
+            for variant, value in zip(VARIANTS, (color, dim(color), DEATH_COLOR, blend(color))):
+                self._index[char, variant] = len(self.colors)
+                self.colors.append(value)
+                self.slots.append((char, variant))
+            self.text[char] = contrast_text(color)
+
+    def slot(self, char, variant='base'):
+        index = self._index.get((char, variant))
+        return self._index[None, variant] if index is None else index
+
+    def rectangle_slot(self, char, is_death=False, is_important=False):
+        """Slot of an event rectangle of char."""
+        if is_death:
+            return self.slot(char, 'death')
+        return self.slot(char, 'dimmed' if is_important else 'base')
+
+    def color(self, char, variant='base'):
+        return self.colors[self.slot(char, variant)]
+
+    def text_color(self, char):
+        return self.text.get(char, self.text[None])
+
+    def to_json(self):
+        """The tables shipped in layout.meta['palette']."""
+        return dict(colors=list(self.colors), slots=[list(slot) for slot in self.slots])
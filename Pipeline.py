@@ -0,0 +1,279 @@
+"""
+Runs the timeline job - preprocess -> render -> export - from a config file or the
+command line. All variants of a deploy are built in one job: each event table is
+read only once and shared with a pool of render processes.
+
+Usage:
+    python Pipeline.py --config pipeline.json                 # every variant in the config
+    python Pipeline.py --config pipeline.json --variant main  # only the named variant(s)
+    python Pipeline.py --events Data/evPLUSPlusPlus.csv --output Results/test.html --event-spacing 2
+
+Config file (JSON); every key is optional:
+    {
+        "preprocess": {"events": "Data/Dark_GD_Contest_Events", "edges": "ed.csv",
+                       "output": "Data/evPLUSPlusPlus.csv"},
+        "defaults": {"events": "Data/evPLUSPlusPlus.csv", "png": true, "float_precision": 3, "chunked": false,
+                     "background_image": null, "grid": {"character_spacing": 2.5, ...}},
+        "variants": [
+            {"name": "main", "output": "Results/Visualization.html"},
+            {"name": "compact", "output": "Results/compact.html", "grid": {"event_spacing": 1.0}},
+            {"name": "origin", "output": "Results/origin.html", "worlds": ["Origin"]}
+        ]
+    }
+"preprocess.output" defaults to the default "events" table, so the render reads the
+freshly preprocessed data. Variant keys override "defaults"; "grid" entries are
+merged key by key and are passed to create_dark_timeline_grid, "worlds" keeps only
+events of the listed worlds, and "chunked" writes the HTML as a shell plus
+content-hashed data chunks (DeltaExport.py).
+Renders are cached in "cache" (a folder, default .render_cache; null disables it, see
+RenderCache.py): a variant whose data, options and code did not change is copied
+from the cache instead of being rendered again.
+Variants are rendered in parallel worker processes (--workers, default one per core).
+"""
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+
+import Instrumentation
+import RenderCache
+import Visualization
+
+# Keyword arguments of create_dark_timeline_grid a variant's "grid" may set
+GRID_OPTIONS = set(inspect.signature(Visualization.create_dark_timeline_grid).parameters) - {'events_df', 'background_image'}
+
+def load_config(config_path):
+    with open(config_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def resolve_variants(config, names=None):
+    """Merge every variant with the config defaults; keep only `names` when given."""
+    defaults = config.get('defaults', {})
+    variants = config.get('variants') or [{'name': 'default'}]
+
+    resolved = []
+    for variant in variants:
+        merged = {
+            'events': Visualization.DEFAULT_EVENTS_PATH,
+            'png': True,
+            'background_image': None,
+            'float_precision': None,
+            'chunked': False,
+            'cache': RenderCache.DEFAULT_DIR,
+            **defaults,
+            **variant
+        }
+        merged['grid'] = {**Visualization.DEFAULT_GRID_PARAMS, **defaults.get('grid', {}), **variant.get('grid', {})}
+        merged.setdefault('name', os.path.splitext(os.path.basename(merged.get('output', 'timeline')))[0])
+        merged.setdefault('output', os.path.join('Results', f"{merged['name']}.html"))
+
+        unknown = set(merged['grid']) - GRID_OPTIONS
+        if unknown:
+            raise ValueError(f"Variant '{merged['name']}' has unknown grid options: {', '.join(sorted(unknown))}")
+        resolved.append(merged)
+
+    if names:
+        missing = set(names) - {variant['name'] for variant in resolved}
+        if missing:
+            raise ValueError(f"Unknown variant(s): {', '.join(sorted(missing))}")
+        resolved = [variant for variant in resolved if variant['name'] in names]
+    return resolved
+
+def run_preprocess(settings):
+    import DataManipulation
+
+    # Missing keys fall back to the DataManipulation defaults
+    paths = {f"{key}_path": settings[key] for key in ('events', 'edges', 'output') if key in settings}
+    with Instrumentation.span('preprocess'):
+        DataManipulation.preprocess(**paths)
+
+# Event tables shared with the render workers, keyed by path. They are loaded before the
+# pool starts, so forked workers inherit them copy-on-write instead of re-reading or
+# unpickling them; where fork is unavailable the pool initializer receives a copy.
+_shared_event_tables = {}
+
+def select_events(events_df, variant):
+    """Restrict the event table to the variant's worlds ("worlds": ["Jonas", ...]), if any."""
+    worlds = variant.get('worlds')
+    if not worlds:
+        return events_df
+    # "Jonas/Martha" events belong to both worlds
+    in_worlds = events_df['World'].fillna('').str.split('/').apply(
+        lambda names: any(name.strip() in worlds for name in names))
+    return events_df[in_worlds].reset_index(drop=True)
+
+def _render_variant(variant):
+    started = time.time()
+    events_df = select_events(_shared_event_tables[variant['events']], variant)
+
+    cache = RenderCache.RenderCache(variant['cache']) if variant['cache'] else None
+    with Instrumentation.span(f"variant:{variant['name']}"):
+        entries = Visualization.render_timeline(events_df, variant['output'],
+                                                background_image=variant['background_image'],
+                                                png=variant['png'], manifest=False,
+                                                float_precision=variant['float_precision'],
+                                                chunked=variant['chunked'], cache=cache, **variant['grid'])
+    return entries, time.time() - started
+
+def _init_worker(event_tables, trace):
+    if event_tables is not None:
+        _shared_event_tables.update(event_tables)
+    Instrumentation.enable(trace)
+    # Forked workers start with a copy of the parent's spans; only report their own
+    Instrumentation.reset()
+
+def _render_variant_in_worker(variant):
+    Instrumentation.reset()
+    entries, seconds = _render_variant(variant)
+    return entries, seconds, Instrumentation.snapshot()
+
+def render_batch(variants, workers=None):
+    """
+    Render and export a list of variant configs (see the module docstring), in parallel
+    over `workers` processes (default: one per CPU core; 1 renders in this process).
+    Each event table is read once and shared by all workers.
+    Returns {variant name: seconds}.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    variants = resolve_variants({'variants': variants})
+    for variant in variants:
+        if variant['events'] not in _shared_event_tables:
+            _shared_event_tables[variant['events']] = Visualization.load_events(variant['events'])
+
+    workers = min(workers or os.cpu_count() or 1, len(variants))
+    if workers <= 1:
+        results = [_render_variant(variant) for variant in variants]
+    else:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context, event_tables = multiprocessing.get_context('fork'), None
+        else:
+            context, event_tables = multiprocessing.get_context(), dict(_shared_event_tables)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(event_tables, Instrumentation.is_enabled())) as pool:
+            results = []
+            for entries, seconds, recorded in pool.map(_render_variant_in_worker, variants):
+                Instrumentation.merge(recorded)
+                results.append((entries, seconds))
+
+    # The manifest is written here, once per output folder, so workers never race on it
+    timings = {}
+    for variant, (entries, seconds) in zip(variants, results):
+        manifest_path = os.path.join(os.path.dirname(variant['output']), "manifest.json")
+        for artifact_name, entry in entries.items():
+            Visualization.update_manifest(manifest_path, artifact_name, **entry)
+        print(f"Variant '{variant['name']}' written to {variant['output']} in {seconds:.2f} seconds")
+        timings[variant['name']] = seconds
+    return timings
+
+def config_from_args(args):
+    """Build a config dict from --config plus the command line overrides."""
+    config = load_config(args.config) if args.config else {}
+
+    overrides = {}
+    if args.events:
+        overrides['events'] = args.events
+    if args.background_image:
+        overrides['background_image'] = args.background_image
+    if args.no_png:
+        overrides['png'] = False
+    if args.chunked:
+        overrides['chunked'] = True
+    if args.no_cache:
+        overrides['cache'] = None
+    elif args.cache_dir:
+        overrides['cache'] = args.cache_dir
+    if args.float_precision is not None:
+        overrides['float_precision'] = args.float_precision
+    grid = {name: getattr(args, name) for name in Visualization.DEFAULT_GRID_PARAMS if getattr(args, name) is not None}
+    if grid:
+        overrides['grid'] = grid
+
+    defaults = config.setdefault('defaults', {})
+    defaults.update({key: value for key, value in overrides.items() if key != 'grid'})
+    defaults['grid'] = {**defaults.get('grid', {}), **overrides.get('grid', {})}
+
+    # Without a config file the command line describes a single variant.
+    # Grid overrides also go onto each variant, so they beat per-variant settings.
+    if args.output:
+        config['variants'] = [{'name': os.path.splitext(os.path.basename(args.output))[0], 'output': args.output}]
+    elif not config.get('variants'):
+        config['variants'] = [{'name': 'Visualization', 'output': Visualization.DEFAULT_OUTPUT_PATH}]
+    for variant in config['variants']:
+        variant['grid'] = {**variant.get('grid', {}), **overrides.get('grid', {})}
+
+    if args.preprocess:
+        config.setdefault('preprocess', {})
+        if args.raw_events:
+            config['preprocess']['events'] = args.raw_events
+        if args.raw_edges:
+            config['preprocess']['edges'] = args.raw_edges
+        if args.events:
+            config['preprocess']['output'] = args.events
+    elif args.skip_preprocess:
+        config.pop('preprocess', None)
+
+    return config
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preprocess, render and export Dark timeline variants in one job.")
+    parser.add_argument('--config', help="JSON job description (see the module docstring)")
+    parser.add_argument('--variant', action='append', help="only build this variant from the config (repeatable)")
+    parser.add_argument('--workers', type=int, help="parallel render processes (default: one per CPU core)")
+    parser.add_argument('--trace', action='store_true', help="write per-stage timings and counters")
+    parser.add_argument('--cache-dir', help="render cache folder (default .render_cache)")
+    parser.add_argument('--no-cache', action='store_true', help="render every variant, ignoring the render cache")
+
+    preprocess = parser.add_argument_group('preprocessing')
+    preprocess.add_argument('--preprocess', action='store_true', help="run DataManipulation before rendering")
+    preprocess.add_argument('--skip-preprocess', action='store_true', help="ignore the config's preprocess step")
+    preprocess.add_argument('--raw-events', help="raw event table for preprocessing")
+    preprocess.add_argument('--raw-edges', help="edge table for preprocessing")
+
+    render = parser.add_argument_group('rendering')
+    render.add_argument('--events', help="processed event table (CSV)")
+    render.add_argument('--output', help="HTML output of a single variant; other artifacts go next to it")
+    render.add_argument('--background-image', help="image file or URL drawn behind the grid")
+    render.add_argument('--no-png', action='store_true', help="skip the Kaleido PNG export")
+    render.add_argument('--chunked', action='store_true',
+                        help="write the HTML as a shell plus content-hashed chunks (delta publishing)")
+    render.add_argument('--float-precision', type=int,
+                        help="decimals kept for floats in the HTML (default 3, negative keeps full precision)")
+    render.add_argument('--character-spacing', dest='character_spacing', type=float)
+    render.add_argument('--event-spacing', dest='event_spacing', type=float)
+    render.add_argument('--rect-width', dest='rect_width', type=float)
+    render.add_argument('--rect-height', dest='rect_height', type=float)
+    render.add_argument('--non-participants', dest='show_non_participants', action=argparse.BooleanOptionalAction,
+                        help="draw rectangles for characters not in an event")
+    render.add_argument('--asymmetric-expansion', dest='asymmetric_expansion', action=argparse.BooleanOptionalAction,
+                        help="expand adjacent text rectangles in complementary directions")
+    render.add_argument('--background-mode', dest='background_mode', choices=('shapes', 'image'),
+                        help="draw non-participant rectangles as shapes or as one raster image")
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    if args.trace:
+        Instrumentation.enable()
+
+    try:
+        config = config_from_args(args)
+        variants = resolve_variants(config, args.variant)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if config.get('preprocess') is not None:
+        # Without an explicit output the processed table replaces the default event table,
+        # so the variants render the data that was just preprocessed
+        config['preprocess'].setdefault('output', config.get('defaults', {}).get('events', Visualization.DEFAULT_EVENTS_PATH))
+        run_preprocess(config['preprocess'])
+    render_batch(variants, workers=args.workers)
+
+    print(f"Pipeline finished: {len(variants)} variant(s) in {time.time() - start_time:.2f} seconds")
+    Instrumentation.write_reports(os.path.join("Results", "pipeline_trace"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+On-disk cache of rendered timelines.
+
+A render is keyed by a hash of the event table, the render and export options
+(grid parameters, background image, PNG / chunked / float precision) and the code
+version (every module of the project plus the plotly and kaleido versions). An
+entry holds the exported artifacts (HTML, date index, PNG, chunks), so a build
+whose inputs did not change copies the files back instead of rendering and
+running Kaleido again:
+
+    cache = RenderCache.RenderCache('.render_cache')
+    key = cache.key(events_df, options)
+    entries = cache.restore(key, output_dir)     # None on a miss
+    ...
+    cache.store(key, output_dir, entries)
+
+The cache is bounded by size: after every store the least recently used entries
+are removed until the total is under max_bytes.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import Instrumentation
+
+DEFAULT_DIR = '.render_cache'
+MAX_BYTES = 2 * 1024 ** 3
+
+# Bumped when the layout of a cache entry changes
+ENTRY_FORMAT = 2
+
+_code_version = None
+
+def code_version():
+    """Hash of the project's Python sources and the plotly / kaleido versions."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256(f"format {ENTRY_FORMAT}".encode())
+        source_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(source_dir)):
+            if name.endswith('.py'):
+                digest.update(name.encode())
+                with open(os.path.join(source_dir, name), 'rb') as f:
+                    digest.update(f.read())
+        for package in ('plotly', 'kaleido'):
+            try:
+                version = __import__(package).__version__
+            except ImportError:
+                version = None
+            digest.update(f"{package} {version}".encode())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+def data_hash(events_df):
+    """Hash of an event table's columns, dtypes, index and values."""
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(column), str(dtype)] for column, dtype in events_df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(events_df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def artifact_files(output_dir, entries):
+    """Files (relative to output_dir) written for the manifest entries of an export."""
+    files = []
+    for artifact_name, entry in entries.items():
+        files.append(artifact_name)
+        if entry.get('index'):
+            files.append(entry['index'])
+        if entry.get('chunks'):
+            files.append(entry['chunks'])
+            files.append('plotly.min.js')
+            with open(os.path.join(output_dir, entry['chunks']), encoding="utf-8") as f:
+                files.extend(json.load(f)['chunks'].values())
+    return list(dict.fromkeys(files))
+
+def _size(path):
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+class RenderCache:
+    """Size-bounded LRU cache of render outputs in directory."""
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, events_df, options):
+        """Cache key of rendering events_df with options (JSON-serializable render and export settings)."""
+        options = dict(options)
+        # A local background image is part of the figure: key on its content, not its name
+        image = options.get('background_image')
+        if image and os.path.isfile(image):
+            options['background_image'] = _file_hash(image)
+        digest = hashlib.sha256()
+        digest.update(data_hash(events_df).encode())
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+        digest.update(code_version().encode())
+        return digest.hexdigest()[:32]
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def restore(self, key, output_dir):
+        """Copy a cached render's artifacts into output_dir; returns its manifest entries, or None on a miss."""
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, 'entries.json'), encoding="utf-8") as f:
+                record = json.load(f)
+            for relative in record['files']:
+                target = os.path.join(output_dir, relative)
+                os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+                shutil.copyfile(os.path.join(entry, 'artifacts', relative), target)
+        except (OSError, ValueError, KeyError):
+            Instrumentation.count('render_cache_misses')
+            return None
+        # Last use is the entry's modification time
+        os.utime(entry)
+        Instrumentation.count('render_cache_hits')
+        return record['entries']
+
+    def store(self, key, output_dir, entries):
+        """Cache a render: the artifacts of its manifest entries, read from output_dir."""
+        os.makedirs(self.directory, exist_ok=True)
+        # Built under a temporary name and renamed, so parallel renders never see half an entry
+        staging = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}")
+        files = artifact_files(output_dir, entries)
+        try:
+            for relative in files:
+                target = os.path.join(staging, 'artifacts', relative)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(os.path.join(output_dir, relative), target)
+            with open(os.path.join(staging, 'entries.json'), "w", encoding="utf-8") as f:
+                json.dump({'entries': entries, 'files': files, 'created': time.time()}, f)
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            os.replace(staging, self._entry(key))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        if not os.path.isdir(self.directory):
+            return
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            try:
+                entries.append((os.path.getmtime(path), _size(path), path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            Instrumentation.count('render_cache_evictions')
@@ -0,0 +1,109 @@
+"""
+Fast JSON serialization of the timeline figure and the allEventsData payload.
+
+Encoding uses orjson (with NumPy support) when it is installed and plotly's encoder
+otherwise. Floats in traces and shape paths can be rounded to a fixed number of
+decimals, which removes the long binary tails (0.5499999999999999) that make up a
+large part of the figure JSON.
+"""
+import re
+
+try:
+    import orjson
+except ImportError:  # Optional: plotly's JSON encoder is used instead
+    orjson = None
+
+# Decimals kept for floats in the exported figure by default (see export_precision).
+# The page's highlight code matches positions with a 0.1 tolerance.
+FLOAT_PRECISION = 3
+
+# Items serialized per chunk when streaming a JSON array
+BATCH_SIZE = 500
+
+_NUMBER_IN_PATH = re.compile(r'-?\d+\.\d+(?:[eE][-+]?\d+)?')
+
+def dumps(obj):
+    """Serialize to a JSON string that is safe to embed in a <script> tag."""
+    text = None
+    if orjson is not None:
+        try:
+            text = orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass  # Types orjson does not know, e.g. pandas timestamps
+    if text is None:
+        from plotly.io.json import to_json_plotly
+        return to_json_plotly(obj)  # Escapes <, > and / itself
+    return text.replace('</', '<\\/').replace('<!--', '<\\u0021--')
+
+def export_precision(float_precision):
+    """
+    Decimals for an export's float_precision option: None is FLOAT_PRECISION and a
+    negative value keeps full precision (None, as taken by round_floats).
+    """
+    if float_precision is None:
+        return FLOAT_PRECISION
+    return None if float_precision < 0 else float_precision
+
+def format_float(value, precision):
+    # Plain decimal notation: the page parses shape paths with /[\d.\-]+/
+    text = f"{value:.{precision}f}".rstrip('0').rstrip('.')
+    return '0' if text in ('-0', '') else text
+
+def round_path(path, precision):
+    return _NUMBER_IN_PATH.sub(lambda m: format_float(float(m.group()), precision), path)
+
+def round_floats(obj, precision):
+    """Copy of a JSON-compatible structure (dicts, lists, NumPy arrays) with floats rounded."""
+    if precision is None:
+        return obj
+    if isinstance(obj, float):
+        return round(obj, precision)
+    if isinstance(obj, dict):
+        return {key: round_path(value, precision) if key == 'path' and isinstance(value, str)
+                else round_floats(value, precision)
+                for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [round_floats(value, precision) for value in obj]
+    if hasattr(obj, 'dtype') and obj.dtype.kind == 'f':
+        return obj.round(precision)
+    return obj
+
+def json_array_chunks(items, precision=None):
+    """Yield the JSON array of an iterable of items, one batch at a time."""
+    yield '['
+    batch = []
+    first = True
+    for item in items:
+        batch.append(round_floats(item, precision))
+        if len(batch) == BATCH_SIZE:
+            yield ('' if first else ',') + dumps(batch)[1:-1]
+            first = False
+            batch = []
+    if batch:
+        yield ('' if first else ',') + dumps(batch)[1:-1]
+    yield ']'
+
+def events_payload(events_df):
+    """
+    The allEventsData records of the page script, built column-wise:
+    [{'event_idx', 'type', 'characters', 'first_main_character', 'date'}, ...]
+    Missing columns give '' and missing values null.
+    """
+    def column(name):
+        if name not in events_df.columns:
+            return [''] * len(events_df)
+        values = events_df[name].astype(object)
+        return values.where(values.notna(), None).tolist()
+
+    if 'DateISO' in events_df.columns:
+        dates = events_df['DateISO'].tolist()
+    else:
+        dates = events_df['Date'].dt.strftime('%Y-%m-%d').fillna('').tolist()
+
+    return [
+        {'event_idx': idx, 'type': event_type, 'characters': characters,
+         'first_main_character': first_character, 'date': date}
+        for idx, event_type, characters, first_character, date in zip(
+            events_df.index.tolist(), column('Type'), column('Characters'),
+            column('FirstMainCharacter'), dates)
+    ]
@@ -0,0 +1,59 @@
+"""
+Text wrapping for event descriptions and hover labels.
+
+Descriptions are wrapped several times per render (to decide whether a rectangle
+expands, to draw it, and for the hover label) and again for every variant built in
+the same process, so results are memoized by (text, width, max_lines). A wrap
+returns the line count and whether the text was cut off along with the text.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+# text: lines joined with <br>; truncated: text was cut off at max_lines (and ends in "...")
+WrappedText = namedtuple('WrappedText', ['text', 'line_count', 'truncated'])
+
+EMPTY = WrappedText("", 0, False)
+
+@lru_cache(maxsize=65536)
+def _wrap(text, width, max_lines):
+    lines = []
+    remaining_text = text
+
+    while remaining_text and (max_lines is None or len(lines) < max_lines):
+        # If remaining text fits in one line
+        if len(remaining_text) <= width:
+            lines.append(remaining_text)
+            remaining_text = ""
+        else:
+            # Try to break at a space within the width
+            space_pos = remaining_text.rfind(' ', 0, width)
+
+            if space_pos != -1:
+                # Break at space to preserve whole words
+                lines.append(remaining_text[:space_pos])
+                remaining_text = remaining_text[space_pos+1:]  # Skip the space
+            else:
+                # No space found, need to hyphenate a word
+                lines.append(remaining_text[:width-2] + "-")
+                remaining_text = remaining_text[width-2:]
+
+    # If we still have text but hit max_lines, modify the last line with ellipsis
+    truncated = bool(max_lines and len(lines) == max_lines and remaining_text)
+    if truncated:
+        last_line = lines[-1]
+        if len(last_line) > width - 3:
+            lines[-1] = last_line[:width-4] + "..."
+        else:
+            lines[-1] += "..."
+
+    # Use HTML line breaks with reduced line-height CSS for tighter spacing
+    return WrappedText("<br>".join(lines), len(lines), truncated)
+
+def wrap(text, width, max_lines=None):
+    """Wrap text to lines of at most `width` characters; returns a WrappedText."""
+    if not isinstance(text, str):
+        return EMPTY
+    return _wrap(text, width, max_lines)
+
+def cache_info():
+    return _wrap.cache_info()
@@ -1,21 +1,48 @@
-import pandas as pd
-import numpy as np
-from plotly.subplots import make_subplots
-import textwrap
-import colorsys
-import plotly.graph_objects as go
-import plotly.express as px
-import plotly.io as pio
+"""
+Dark timeline grid: builds the Plotly figure from the processed event table and
+exports it as interactive HTML, PNG, date index and manifest entries.
+
+Heavy dependencies (pandas, numpy, plotly) are imported inside the functions that
+need them and no data is read at import time, so other tools can import this
+module cheaply. Run it with:
+    python -m Visualization [--events Data/evPLUSPlusPlus.csv] [--output Results/Visualization.html]
+"""
 import os
-import spacy
 import time
+import Instrumentation
+import Palette
+import TextLayout
+
+DEFAULT_EVENTS_PATH = 'Data/evPLUSPlusPlus.csv'
+
+# The website (script.js) looks up Visualization.html and Visualization.png in manifest.json,
+# so the published timeline must be exported under this name
+DEFAULT_OUTPUT_PATH = 'Results/Visualization.html'
+
+# Spacing and options of the published timeline
+DEFAULT_GRID_PARAMS = dict(
+    character_spacing=2.5,    # Increased spacing between characters
+    event_spacing=1.5,      # Adjust horizontal spacing between events
+    rect_width=0.7,        # Adjust rectangle width
+    rect_height=2.4,        # Adjusted rectangle height to match character spacing
+    show_non_participants=True,  # Set to False to disable non-participant rectangles
+    asymmetric_expansion=True,     # Enable asymmetric expansion for adjacent rectangles with text
+    background_mode='shapes'      # 'image' draws the non-participant rectangles as one raster layer
+)
 
-# Record start time for execution measurement
-start_time = time.time()
+# Size of the high-resolution PNG export
+PNG_WIDTH = 12288
+PNG_HEIGHT = 1200
 
-# Load the data
-events_df = pd.read_csv('Data/evPLUSPlusPlus.csv')
-edges_df = pd.read_csv('Data/edges.csv')
+# Load the processed event table, parse its dates and precompute the date strings
+def load_events(events_path=DEFAULT_EVENTS_PATH):
+    import pandas as pd
+    import Dates
+
+    events_df = pd.read_csv(events_path)
+
+    # Dates are parsed once and every format used while rendering is stored as a column
+    return Dates.prepare_events(events_df)
 
 main_characters = [
     "Jonas Kahnwald / Adam", 
@@ -36,9 +63,6 @@ main_characters = [
     "Hannah Kahnwald / Hannah Nielsen"
     ]
 
-# Convert dates to datetime objects for sorting and processing
-events_df['Date'] = pd.to_datetime(events_df['Date'], format='mixed', dayfirst=True)
-
 # Character color mapping for DARK
 character_colors = {       
     "Jonas Kahnwald / Adam": "#92782d", # Yellow
@@ -80,42 +104,9 @@ character_text_colors = {
     "Aleksander Tiedemann / Boris Niewald": "white"
 }
 
-# Function to wrap text for display in event squares
+# Function to wrap text for display in event squares (memoized in TextLayout)
 def wrap_event_text(text, width, max_lines=None):
-    if not isinstance(text, str):
-        return ""
-    
-    lines = []
-    remaining_text = text
-    
-    while remaining_text and (max_lines is None or len(lines) < max_lines):
-        # If remaining text fits in one line
-        if len(remaining_text) <= width:
-            lines.append(remaining_text)
-            remaining_text = ""
-        else:
-            # Try to break at a space within the width
-            space_pos = remaining_text[:width].rfind(' ')
-            
-            if space_pos != -1:
-                # Break at space to preserve whole words
-                lines.append(remaining_text[:space_pos])
-                remaining_text = remaining_text[space_pos+1:]  # Skip the space
-            else:
-                # No space found, need to hyphenate a word
-                lines.append(remaining_text[:width-2] + "-")
-                remaining_text = remaining_text[width-2:]
-    
-    # If we still have text but hit max_lines, modify the last line with ellipsis
-    if max_lines and len(lines) == max_lines and remaining_text:
-        last_line = lines[-1]
-        if len(last_line) > width - 3:
-            lines[-1] = last_line[:width-4] + "..."
-        else:
-            lines[-1] += "..."
-
-    # Use HTML line breaks with reduced line-height CSS for tighter spacing
-    return "<br>".join(lines)
+    return TextLayout.wrap(text, width, max_lines).text
 
 def extract_event_types_and_numbers(event_type_str):
     """
@@ -178,6 +169,8 @@ def add_description_text(all_text_traces, x_position, char_position, description
     Creates text traces that are compatible with the button highlighting system.
     Each text trace gets a unique name and stores the event index for JavaScript access.
     """
+    import plotly.graph_objects as go
+
     # Determine max_lines based on expansion_info
     if expansion_info is not None:
         if expansion_info.get('expand_above', False) and expansion_info.get('expand_below', False):
@@ -254,9 +247,6 @@ def optimize_description_placement(event_group):
     if len(event_group) <= 1:
         return event_group, []
     
-    # Extract date of the event group
-    current_date = event_group[0][1]['Date'].strftime('%Y-%m-%d')
-    
     # Create a dictionary to group events by first main character
     events_by_char = {}
     
@@ -290,6 +280,8 @@ def add_interactive_buttons(all_hover_traces, x_position, char_position, event,
     Buttons are positioned on the right side of the rectangle border.
     Only adds buttons if there are matching events with the same type and number.
     """
+    import plotly.graph_objects as go
+
     # Extract event types and numbers from the event
     event_types = extract_event_types_and_numbers(event.get('Type', ''))
     
@@ -305,7 +297,7 @@ def add_interactive_buttons(all_hover_traces, x_position, char_position, event,
             # Get the first matching event (destination)
             dest_event_idx = next(iter(matching_events))
             dest_event = events_df.iloc[dest_event_idx]
-            return dest_event['Date'].strftime('%d/%m/%Y')
+            return dest_event['DateSlash']
         return None
     
     # Filter event types to only include those with matching events
@@ -380,8 +372,25 @@ def add_interactive_buttons(all_hover_traces, x_position, char_position, event,
         
         all_hover_traces.append(button_trace)
 
+def image_source(path_or_url):
+    """
+    Layout image source for a local file or URL. Local files are embedded as a data URI,
+    so the exported HTML and PNG do not depend on where the image lives on disk.
+    """
+    import base64
+    import mimetypes
+
+    if path_or_url.startswith(('http://', 'https://', 'data:')):
+        return path_or_url
+    mime_type = mimetypes.guess_type(path_or_url)[0] or 'image/png'
+    with open(path_or_url, 'rb') as f:
+        encoded = base64.b64encode(f.read()).decode('ascii')
+    return f"data:{mime_type};base64,{encoded}"
+
 def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_width=0.8, rect_height=0.4, 
-                             show_non_participants=True, asymmetric_expansion=False):
+                             show_non_participants=True, asymmetric_expansion=False, events_df=None,
+                             background_image=None, band_colors=None, band_breakpoints=None,
+                             overview_bucket='year', background_mode='shapes'):
     """
     Create a timeline grid visualization with configurable spacing.
     
@@ -392,15 +401,63 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
     - rect_height: Height of event rectangles (default=0.4)
     - show_non_participants: Whether to show rectangles for non-participating characters (default=True)
     - asymmetric_expansion: When True, adjacent rectangles with text expand asymmetrically (one above only, one below only) (default=False)
+    - events_df: Processed event table; read from Data/evPLUSPlusPlus.csv when not given
+    - background_image: Image file or URL stretched behind the plot area (default=None, no image)
+    - band_colors: The two alternating background colours of non-participant rectangles (default=Dates.DATE_BAND_COLORS)
+    - band_breakpoints: Dates where the colour alternation is reset, see Dates.DATE_BAND_BREAKPOINTS (default)
+    - overview_bucket: Time bucket of the zoomed-out density overview: 'day', 'year' (default) or 'decade'
+    - background_mode: How non-participant rectangles are drawn: 'shapes' (default, one shape each) or 'image'
+      (one pre-rasterized layout image of all of them, see BackgroundGrid.py)
     """
+    import plotly.graph_objects as go
+
+    import BackgroundGrid
+    import Dates
+    import Indicators
+    import LayoutSolver
+    import LevelOfDetail
+    import WorldStrip
+
+    if events_df is None:
+        events_df = load_events()
+    elif 'DateKey' not in events_df.columns:
+        events_df = Dates.add_date_columns(events_df)
+    if band_colors is None:
+        band_colors = Dates.DATE_BAND_COLORS
+    if band_breakpoints is None:
+        band_breakpoints = Dates.DATE_BAND_BREAKPOINTS
+
+    render_span = Instrumentation.start('create_dark_timeline_grid')
+
     # Create figure with custom size
     fig = go.Figure()
     
     # Set up character positions with configurable spacing
     char_positions = {char: i * character_spacing for i, char in enumerate(main_characters)}
+    # Vertical neighbours of every character, shared by all columns
+    neighbours = LayoutSolver.build_neighbours(char_positions, rect_height)
     
     # Corner radius for rectangles
     corner_radius = 0.15  # Slightly reduced to match new proportions
+
+    # Rectangle, hover and text colours of every character, computed once
+    palette = Palette.Palette(character_colors)
+
+    # Participation marks of merged events, drawn as one trace
+    indicators = Indicators.IndicatorLayer(corner_radius, rect_height)
+
+    # Non-participant cells, rasterized into one image in image mode
+    if background_mode not in ('shapes', 'image'):
+        raise ValueError(f"Unknown background_mode {background_mode!r}: use 'shapes' or 'image'")
+    background_grid = BackgroundGrid.BackgroundGrid() if background_mode == 'image' else None
+    char_rows = {char: row for row, char in enumerate(main_characters)}
+
+    # World of every column, drawn as one strip below the characters
+    world_strip = WorldStrip.WorldStrip(
+        half_width=rect_width * 1.2 - 0.15,
+        y=len(main_characters) * character_spacing + 0.5,  # Position below the plot area but within visible range
+        height=0.2
+    )
     
     # Collect all shapes for batch processing
     all_shapes = []
@@ -408,33 +465,11 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
     all_text_traces = []
     all_hover_traces = []
     
-    # Pre-populate date_colors with alternating colors for each unique date
-    # This ensures the dictionary is filled before processing events
-    date_strings = [d.strftime('%d-%m-%Y') for d in events_df['Date']]
-    unique_dates = []
-    date_colors = {}
-    # Start with initial pattern
-    use_alternate_pattern = False
-    
-    for date_str in date_strings:
-        if date_str not in unique_dates:
-            unique_dates.append(date_str)
-            
-            # Determine default color based on current pattern
-            if not use_alternate_pattern:
-                default_color = "#151B23" if len(unique_dates) % 2 == 1 else "#152323"
-            else:
-                default_color = "#152323" if len(unique_dates) % 2 == 1 else "#151B23"
-            
-            # Override colors for specific dates and switch pattern
-            if date_str == "21-06-1921":
-                date_colors[date_str] = "#151B23"
-                use_alternate_pattern = True  # Switch pattern after this date
-            elif date_str == "01-01-2021":
-                date_colors[date_str] = "#152323"
-                use_alternate_pattern = False  # Switch pattern after this date
-            else:
-                date_colors[date_str] = default_color
+    grouping_span = Instrumentation.start('grouping')
+
+    # Background band (index into band_colors) of every event's date, used by the
+    # non-participant rectangles; positions match the event positions i below
+    date_bands = Dates.date_bands(events_df['DateKey'], band_breakpoints)
     
     # Group consecutive events with the same date
     merged_events = []
@@ -443,7 +478,7 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
     
     # Pre-process events to identify groups with the same date
     for i, (_, event) in enumerate(events_df.iterrows()):
-        event_date = event['Date'].strftime('%Y-%m-%d')
+        event_date = event['DateKey']
         
         if current_date == event_date and len(current_group) < 5:
             current_group.append((i, event))
@@ -462,14 +497,65 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
     # Keep track of event rectangles for overlap checking
     event_rects = {}  # {(char, x_position): (y0, y1)}
     
+    # Hover texts are stored once per event ({event_idx: [first main character, date,
+    # description, characters]}) with one template per hover style; hover traces only
+    # carry [[event_idx]] and meta.hover (their template), see export_timeline_html
+    hover_events = {}
+    hover_templates = {}
+
+    def hover_trace(event_idx, event, char, x_position, name_padding):
+        """Invisible hover marker of one character's rectangle, showing the event's details."""
+        if event_idx not in hover_events:
+            # Wrap the description and characters for better vertical display
+            hover_desc = event.get('Full_Description', event.get('FormattedDescription', ''))
+            hover_events[event_idx] = [
+                event.get('FirstMainCharacter', 'N/A'),
+                event['DateISO'],
+                wrap_event_text(hover_desc, width=50),
+                wrap_event_text(event.get('Characters', 'N/A'), width=40)
+            ]
+
+        death_value = event.get('Death', False)
+        is_death = death_value == True or death_value == 'True'
+
+        # For death events, grey background (same as rectangle color) and white text
+        if is_death:
+            char_color = Palette.DEATH_COLOR
+            text_color = "white"
+            # Add skull emoji after the main character name for death events
+            hovertemplate = f'<b style="color:{text_color}; text-align: center;">%{{customdata[0]}}{name_padding}💀</b><br><span style="color:{text_color}; text-align: center;">%{{customdata[1]}}</span><br><br><span style="color:{text_color}; text-align: center;">%{{customdata[2]}}</span><br><br><i style="color:{text_color}; text-align: center;">Characters:<br>%{{customdata[3]}}</i><extra></extra>'
+        else:
+            # Character color background, text color contrasting with it
+            char_color = palette.color(char)
+            text_color = palette.text_color(char)
+            # Add star emoji after the main character name for normal events
+            hovertemplate = f'<b style="color:{text_color}">%{{customdata[0]}}{name_padding}⭐</b><br><span style="color:{text_color}">%{{customdata[1]}}</span><br><br><span style="color:{text_color}">%{{customdata[2]}}</span><br><br><i style="color:{text_color}">Characters:<br>%{{customdata[3]}}</i><extra></extra>'
+
+        return go.Scatter(
+            x=[x_position],
+            y=[char_positions[char]],
+            mode='markers',
+            marker=dict(
+                opacity=0,
+                size=10,
+            ),
+            hoverinfo='all',
+            customdata=[[event_idx]],
+            meta=dict(hover=hover_templates.setdefault(hovertemplate, len(hover_templates))),
+            hoverlabel=dict(bgcolor=char_color, bordercolor="white", font=dict(color=text_color)),
+            showlegend=False
+        )
+
     # Helper function to add non-participant rectangles
-    def add_non_participant_rectangles(non_participants, x_position, date_str):
+    def add_non_participant_rectangles(non_participants, x_position, band):
         """Add background rectangles for characters not involved in an event."""
         # Get the date-based background color
-        date_bg_color = date_colors.get(date_str, "#151B23")
+        date_bg_color = band_colors[band]
         
         for char in non_participants:
-            if char in char_positions:
+            if char in char_positions and background_grid is not None:
+                background_grid.add(x_position, char_rows[char], band)
+            elif char in char_positions:
                 # Use the date-based color directly
                 color = date_bg_color
                 
@@ -517,6 +603,7 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
         # Check if we need to limit the group size due to overlapping descriptions
         event_group, remaining = optimize_description_placement(event_group)
         processed_merged_events.append(event_group)
+        Instrumentation.count('overflow_events', len(remaining))
         
         # Store remaining events for the next date group
         overflow_events = remaining
@@ -527,9 +614,14 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
 
     # Replace the original merged_events with the processed version
     merged_events = processed_merged_events
+    Instrumentation.count('groups', len(merged_events))
+    Instrumentation.stop(grouping_span)
 
     # Now process the event groups as normal
     for event_group in merged_events:
+        # Expansion/contraction decisions are timed as "layout", everything drawn as "shape_emission"
+        layout_span = Instrumentation.start('layout')
+
         # Check if we need to limit the group size due to overlapping descriptions
         event_group, limited = optimize_description_placement(event_group)
 
@@ -540,13 +632,12 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
             # Use output_position for x-coordinate
             x_position = output_position * event_spacing
             
-            event_date = event['Date'].strftime('%Y-%m-%d')
+            event_date = event['DateISO']
             event_desc = event['FormattedDescription']  # Raw description for hover info
             
             # Check if description hits max_lines - only calculate this once
             desc = event['FormattedDescription']
-            test_wrap = wrap_event_text(desc, width=16, max_lines=3)
-            hit_max_lines = test_wrap.count("<br>") >= 2 and "..." in test_wrap
+            hit_max_lines = TextLayout.wrap(desc, width=16, max_lines=3).truncated
             
             # Find all involved main characters - improved matching
             event_chars = []
@@ -563,125 +654,19 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
             if event['FirstMainCharacter'] and event['FirstMainCharacter'] not in event_chars:
                 event_chars.append(event['FirstMainCharacter'])
 
-            event_chars = list(set(event_chars))  # Remove duplicates
+            event_chars = list(dict.fromkeys(event_chars))  # Remove duplicates, keeping a stable order
             
-            # Determine if we need expansion/contraction for single events
-            expansions_single = {}
-            contractions_single = {}
-            
-            if hit_max_lines:
-                main_char = event['FirstMainCharacter']
-                if main_char in event_chars:
-                    # Find character positions relative to main_char
-                    char_positions_list = [(char, pos) for char, pos in char_positions.items()]
-                    char_positions_list.sort(key=lambda x: x[1])
-                    char_to_idx = {char: idx for idx, (char, _) in enumerate(char_positions_list)}
-                    
-                    main_char_idx = char_to_idx.get(main_char, -1)
-                    if main_char_idx >= 0:
-                        # Check adjacent characters for activity
-                        above_is_active = False
-                        below_is_active = False
-                        char_above = None
-                        char_below = None
-                        
-                        if main_char_idx > 0:
-                            char_above = char_positions_list[main_char_idx-1][0]
-                            above_is_active = char_above in event_chars
-                        
-                        if main_char_idx < len(char_positions_list) - 1:
-                            char_below = char_positions_list[main_char_idx+1][0]
-                            below_is_active = char_below in event_chars
-                        
-                        # Check if adjacent characters have text (are FirstMainCharacter of any event)
-                        char_above_has_text = False
-                        char_below_has_text = False
-                        if asymmetric_expansion:
-                            # For now, assume adjacent characters don't have text in single events
-                            # This logic primarily applies to merged events where multiple events have text
-                            char_above_has_text = False
-                            char_below_has_text = False
-                        
-                        # Apply expansion and contraction logic
-                        if not above_is_active and not below_is_active:
-                            # Expand both directions
-                            expansions_single[main_char] = {
-                                'expand_above': True,
-                                'expand_below': True,
-                                'expanded_height': rect_height * 2
-                            }
-                        elif not above_is_active and below_is_active:
-                            # Check for asymmetric expansion condition
-                            if asymmetric_expansion and char_below_has_text:
-                                # Current rectangle has text and below rectangle has text, expand above only
-                                expansions_single[main_char] = {
-                                    'expand_above': True,
-                                    'expand_below': False,
-                                    'expand_below_extra': False,
-                                    'expanded_height': rect_height * 1.5
-                                }
-                                # Don't contract the below character since it also has text
-                            else:
-                                # Expand above, contract below - extend slightly into contracted space
-                                expansions_single[main_char] = {
-                                    'expand_above': True,
-                                    'expand_below': False,
-                                    'expand_below_extra': True,  # Flag to extend into contracted space
-                                    'expanded_height': rect_height * 1.5
-                                }
-                                if char_below and not char_below_has_text:
-                                    contractions_single[char_below] = {
-                                        'contract_above': True,
-                                        'contract_below': False,
-                                        'contracted_height': rect_height * 0.4  # Made smaller
-                                    }
-                        elif above_is_active and not below_is_active:
-                            # Check for asymmetric expansion condition
-                            if asymmetric_expansion and char_above_has_text:
-                                # Current rectangle has text and above rectangle has text, expand below only
-                                expansions_single[main_char] = {
-                                    'expand_above': False,
-                                    'expand_below': True,
-                                    'expand_above_extra': False,
-                                    'expanded_height': rect_height * 1.5
-                                }
-                                # Don't contract the above character since it also has text
-                            else:
-                                # Expand below, contract above - extend slightly into contracted space
-                                expansions_single[main_char] = {
-                                    'expand_above': False,
-                                    'expand_below': True,
-                                    'expand_above_extra': True,  # Flag to extend into contracted space
-                                    'expanded_height': rect_height * 1.5
-                                }
-                                if char_above and not char_above_has_text:
-                                    contractions_single[char_above] = {
-                                        'contract_above': False,
-                                        'contract_below': True,
-                                        'contracted_height': rect_height * 0.4  # Made smaller
-                                    }
-                        else:
-                            # Both neighbors active, expand moderately and contract neighbors more
-                            expansions_single[main_char] = {
-                                'expand_above': True,
-                                'expand_below': True,
-                                'expand_above_extra': True,  # Extend into contracted space above
-                                'expand_below_extra': True,  # Extend into contracted space below
-                                'expanded_height': rect_height * 0.9  # Contract to 90%
-                            }
-                            if char_above:
-                                contractions_single[char_above] = {
-                                    'contract_above': False,
-                                    'contract_below': True,
-                                    'contracted_height': rect_height * 0.3  # Made much smaller
-                                }
-                            if char_below:
-                                contractions_single[char_below] = {
-                                    'contract_above': True,
-                                    'contract_below': False,
-                                    'contracted_height': rect_height * 0.3  # Made much smaller
-                                }
+            # Expansion/contraction for single events: the first main character owns the description
+            main_char = event['FirstMainCharacter']
+            owners = [main_char] if hit_max_lines and main_char in event_chars else []
+            column_layout = LayoutSolver.solve_column(neighbours, owners, event_chars, owners,
+                                                      rect_height, asymmetric_expansion)
+            expansions_single = column_layout.expansions
+            contractions_single = column_layout.contractions
             
+            Instrumentation.stop(layout_span)
+            shape_span = Instrumentation.start('shape_emission')
+
             # For each character involved in this event
             for char in event_chars:
                 if char in char_positions:
@@ -692,67 +677,18 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
                     # Check if the event is important
                     is_important = event.get('Important Trigger', False)
                     
-                    if is_death:
-                        color = "#868686"  # Gray color for death events
-                    else:
-                        base_color = character_colors.get(char, "#FFFFFF")  # Normal Color
-                        if is_important:
-                            # Make the color dimmer for important events
-                            # Convert hex to RGB, reduce brightness, convert back to hex
-                            hex_color = base_color.lstrip('#')
-                            rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-                            # Reduce brightness by 30%
-                            dimmed_rgb = tuple(int(c * 0.7) for c in rgb)
-                            color = '#%02x%02x%02x' % dimmed_rgb
-                        else:
-                            color = base_color  
+                    # Gray for death events, dimmer character color for important events
+                    slot = palette.rectangle_slot(char, is_death, is_important)
+                    color = palette.colors[slot]
 
                     # Define coordinates for the rectangle using incremental positioning
                     x0 = x_position - rect_width
-                    y0 = char_positions[char] - rect_height/2
                     x1 = x_position + rect_width
-                    y1 = char_positions[char] + rect_height/2
+                    y0 = column_layout.y0[neighbours.index[char]]
+                    y1 = column_layout.y1[neighbours.index[char]]
 
-                    # Apply expansion/contraction logic
-                    expansion_info = None
-                    if char in expansions_single:
-                        expansion = expansions_single[char]
-                        expansion_info = expansion
-                        if expansion['expand_above'] and expansion['expand_below']:
-                            # Check if we need to extend into contracted spaces
-                            if expansion.get('expand_above_extra', False) and expansion.get('expand_below_extra', False):
-                                # Both neighbors active - make rectangle smaller instead of extending
-                                y0 = char_positions[char] - rect_height * 0.85  # Smaller rectangle
-                                y1 = char_positions[char] + rect_height * 0.85  # Smaller rectangle
-                            else:
-                                y0 = char_positions[char] - rect_height
-                                y1 = char_positions[char] + rect_height
-                        elif expansion['expand_above']:
-                            y0 = char_positions[char] - rect_height
-                            # Check if we should extend into contracted space below
-                            if expansion.get('expand_below_extra', False):
-                                y1 = char_positions[char] + rect_height/2 + rect_height/3  # Made longer
-                            else:
-                                y1 = char_positions[char] + rect_height/2
-                        elif expansion['expand_below']:
-                            # Check if we should extend into contracted space above
-                            if expansion.get('expand_above_extra', False):
-                                y0 = char_positions[char] - rect_height/2 - rect_height/3  # Made longer
-                            else:
-                                y0 = char_positions[char] - rect_height/2
-                            y1 = char_positions[char] + rect_height
-                    elif char in contractions_single:
-                        contraction = contractions_single[char]
-                        expansion_info = contraction  # Pass contraction info as expansion_info for text positioning
-                        if contraction['contract_above'] and contraction['contract_below']:
-                            y0 = char_positions[char] - rect_height/8  # Made much smaller
-                            y1 = char_positions[char] + rect_height/8  # Made much smaller
-                        elif contraction['contract_above']:
-                            y0 = char_positions[char] - rect_height/8  # Made much shorter
-                            y1 = char_positions[char] + rect_height/2
-                        elif contraction['contract_below']:
-                            y0 = char_positions[char] - rect_height/2
-                            y1 = char_positions[char] + rect_height/8  # Made much shorter
+                    # Pass expansion/contraction info for text positioning
+                    expansion_info = expansions_single.get(char, contractions_single.get(char))
                     
                     # Create SVG path for rounded rectangle
                     path = (f'M {x0+corner_radius} {y0} L {x1-corner_radius} {y0} ' 
@@ -769,7 +705,8 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
                         opacity=1.0,
                         line=dict(width=0),                            xref="x",
                         yref="y",
-                        layer="between"
+                        layer="between",
+                        palette_slot=slot
                     )
 
                     if char in expansions_single:
@@ -801,44 +738,8 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
                             is_death  # Pass death information
                         )
 
-                    # Collect hover information trace data for THIS specific character's rectangle
-                    # Wrap the description and characters for better vertical display
-                    wrapped_description = wrap_event_text(event.get('Full_Description', event_desc), width=50)
-                    wrapped_characters = wrap_event_text(event.get('Characters', 'N/A'), width=40)
-                    
-                    # Get character color for hover background
-                    char_color = character_colors.get(char, "#FFFFFF")
-                    
-                    # For death events, override with grey background and white text
-                    if is_death:
-                        char_color = "#868686"  # Grey background for death events (same as rectangle color)
-                        text_color = "white"
-                        # Add skull emoji after the main character name for death events
-                        skull_emoji = "                                              💀"
-                        hovertemplate = f'<b style="color:{text_color}; text-align: center;">%{{customdata[0]}}{skull_emoji}</b><br><span style="color:{text_color}; text-align: center;">%{{customdata[1]}}</span><br><br><span style="color:{text_color}; text-align: center;">%{{customdata[2]}}</span><br><br><i style="color:{text_color}; text-align: center;">Characters:<br>%{{customdata[3]}}</i><extra></extra>'
-                    else:
-                        # Calculate text color based on background brightness for normal events
-                        text_color = 'black' if np.mean([int(char_color[i:i+2], 16) for i in (1, 3, 5)]) > 128 else 'white'
-                        # Add star emoji after the main character name for normal events
-                        star_emoji = "                                              ⭐"
-                        hovertemplate = f'<b style="color:{text_color}">%{{customdata[0]}}{star_emoji}</b><br><span style="color:{text_color}">%{{customdata[1]}}</span><br><br><span style="color:{text_color}">%{{customdata[2]}}</span><br><br><i style="color:{text_color}">Characters:<br>%{{customdata[3]}}</i><extra></extra>'
-                    
-                    all_hover_traces.append(
-                        go.Scatter(
-                            x=[x_position],
-                            y=[char_positions[char]],
-                            mode='markers',
-                            marker=dict(
-                                opacity=0,
-                                size=10,
-                            ),
-                            hoverinfo='all',
-                            customdata=[[event.get('FirstMainCharacter', 'N/A'), event_date, wrapped_description, wrapped_characters]],
-                            hovertemplate=hovertemplate,
-                            hoverlabel=dict(bgcolor=char_color, bordercolor="white", font=dict(color=text_color)),
-                            showlegend=False
-                        )
-                    )
+                    # Hover information for THIS specific character's rectangle
+                    all_hover_traces.append(hover_trace(i, event, char, x_position, " " * 46))
             
             # Add interactive buttons for this single event (positioned at the center of the rectangle)
             add_interactive_buttons(all_hover_traces, x_position, char_positions[event['FirstMainCharacter']], event, i, rect_width, rect_height, events_df)
@@ -846,8 +747,7 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
             # Add rectangles for characters NOT involved in this event
             if show_non_participants:
                 non_participants = [char for char in main_characters if char not in event_chars and char in char_positions]
-                event_date_str = event['Date'].strftime('%d-%m-%Y')
-                add_non_participant_rectangles(non_participants, x_position, event_date_str)
+                add_non_participant_rectangles(non_participants, x_position, date_bands[i])
                 
         else:
             # This is a merged group of 2-3 events with the same date
@@ -893,7 +793,7 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
 
             # Process each event in the group to collect all characters involved and assign descriptions
             for idx, (original_event_idx, event) in enumerate(event_group):
-                event_date = event['Date'].strftime('%Y-%m-%d')
+                event_date = event['DateISO']
                 
                 # Collect characters
                 event_chars = []
@@ -910,8 +810,8 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
                 if event['FirstMainCharacter'] and event['FirstMainCharacter'] not in event_chars:
                     event_chars.append(event['FirstMainCharacter'])
                 
-                # Remove duplicates and add to the set of all involved characters
-                event_chars = list(set(event_chars))
+                # Remove duplicates (stable order) and add to the set of all involved characters
+                event_chars = list(dict.fromkeys(event_chars))
                 all_chars_involved.update(event_chars)
                 
                 # Assign description to the event's first main character
@@ -930,176 +830,19 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
             # Check which descriptions need expansion
             desc_expansion_needed = {}
             for char, desc_info in assigned_descriptions.items():
-                test_wrap = wrap_event_text(desc_info['desc'], width=16, max_lines=3)
-                hit_max_lines = test_wrap.count("<br>") >= 2 and "..." in test_wrap
+                hit_max_lines = TextLayout.wrap(desc_info['desc'], width=16, max_lines=3).truncated
                 desc_expansion_needed[char] = hit_max_lines
             
-            # Find character vertical neighbors (who is above and below each character)
-            char_positions_list = [(char, pos) for char, pos in char_positions.items()]
-            char_positions_list.sort(key=lambda x: x[1])  # Sort by vertical position
-            
-            # Create a mapping of character to their position in the sorted list
-            char_to_idx = {char: idx for idx, (char, _) in enumerate(char_positions_list)}
-            
-            # Determine expansion possibilities and contractions for adjacent characters
-            expansions = {}
-            contractions = {}
-            
-            for char in assigned_descriptions:
-                if desc_expansion_needed.get(char, False):
-                    char_idx = char_to_idx.get(char, -1)
-                    if char_idx >= 0:
-                        # Check if characters above and below are active (in all_chars_involved)
-                        above_is_active = False
-                        below_is_active = False
-                        char_above = None
-                        char_below = None
-                        
-                        # Check character above
-                        if char_idx > 0:
-                            char_above = char_positions_list[char_idx-1][0]
-                            above_is_active = char_above in all_chars_involved
-                        
-                        # Check character below
-                        if char_idx < len(char_positions_list) - 1:
-                            char_below = char_positions_list[char_idx+1][0]
-                            below_is_active = char_below in all_chars_involved
-                        
-                        # Check if adjacent characters have text (are in assigned_descriptions)
-                        char_above_has_text = char_above in assigned_descriptions if char_above else False
-                        char_below_has_text = char_below in assigned_descriptions if char_below else False
-                        
-                        # Apply expansion rules and set up contractions for adjacent active characters
-                        if not above_is_active and not below_is_active:
-                            # Expand both directions (no active neighbors to contract)
-                            expansions[char] = {
-                                'expand_above': True,
-                                'expand_below': True,
-                                'expanded_height': rect_height * 2
-                            }
-                        elif not above_is_active and below_is_active:
-                            # Check for asymmetric expansion condition
-                            if asymmetric_expansion and char_below_has_text:
-                                # Current rectangle has text and below rectangle has text, expand above only
-                                expansions[char] = {
-                                    'expand_above': True,
-                                    'expand_below': False,
-                                    'expand_below_extra': False,
-                                    'expanded_height': rect_height * 1.5
-                                }
-                                # Don't contract the below character since it also has text
-                            else:
-                                # Expand only above, contract character below - extend slightly into contracted space
-                                expansions[char] = {
-                                    'expand_above': True,
-                                    'expand_below': False,
-                                    'expand_below_extra': True,  # Flag to extend into contracted space
-                                    'expanded_height': rect_height * 1.5
-                                }
-                                if char_below and not char_below_has_text:
-                                    contractions[char_below] = {
-                                        'contract_above': True,
-                                        'contract_below': False,
-                                        'contracted_height': rect_height * 0.4  # Made smaller
-                                    }
-                        elif above_is_active and not below_is_active:
-                            # Check for asymmetric expansion condition
-                            if asymmetric_expansion and char_above_has_text:
-                                # Current rectangle has text and above rectangle has text, expand below only
-                                expansions[char] = {
-                                    'expand_above': False,
-                                    'expand_below': True,
-                                    'expand_above_extra': False,
-                                    'expanded_height': rect_height * 1.5
-                                }
-                                # Don't contract the above character since it also has text
-                            else:
-                                # Expand only below, contract character above - extend slightly into contracted space
-                                expansions[char] = {
-                                    'expand_above': False,
-                                    'expand_below': True,
-                                    'expand_above_extra': True,  # Flag to extend into contracted space
-                                    'expanded_height': rect_height * 1.5
-                                }
-                                if char_above and not char_above_has_text:
-                                    contractions[char_above] = {
-                                        'contract_above': False,
-                                        'contract_below': True,
-                                        'contracted_height': rect_height * 0.4  # Made smaller
-                                    }
-                        else:
-                            # Both neighbors active
-                            if asymmetric_expansion and (char_above_has_text or char_below_has_text):
-                                # Special case: if both neighbors have text, apply asymmetric expansion
-                                if char_above_has_text and char_below_has_text:
-                                    # Both neighbors have text - use character position to determine direction
-                                    # Upper character expands above only, lower character expands below only
-                                    if char_idx % 2 == 0:  # Even index: expand above only
-                                        expansions[char] = {
-                                            'expand_above': True,
-                                            'expand_below': False,
-                                            'expand_above_extra': False,
-                                            'expanded_height': rect_height * 1.5
-                                        }
-                                    else:  # Odd index: expand below only
-                                        expansions[char] = {
-                                            'expand_above': False,
-                                            'expand_below': True,
-                                            'expand_below_extra': False,
-                                            'expanded_height': rect_height * 1.5
-                                        }
-                                elif char_above_has_text:
-                                    # Only above neighbor has text, expand below only
-                                    expansions[char] = {
-                                        'expand_above': False,
-                                        'expand_below': True,
-                                        'expand_below_extra': False,
-                                        'expanded_height': rect_height * 1.5
-                                    }
-                                    # Contract the below neighbor since it doesn't have text
-                                    if char_below:
-                                        contractions[char_below] = {
-                                            'contract_above': True,
-                                            'contract_below': False,
-                                            'contracted_height': rect_height * 0.3
-                                        }
-                                elif char_below_has_text:
-                                    # Only below neighbor has text, expand above only
-                                    expansions[char] = {
-                                        'expand_above': True,
-                                        'expand_below': False,
-                                        'expand_above_extra': False,
-                                        'expanded_height': rect_height * 1.5
-                                    }
-                                    # Contract the above neighbor since it doesn't have text
-                                    if char_above:
-                                        contractions[char_above] = {
-                                            'contract_above': False,
-                                            'contract_below': True,
-                                            'contracted_height': rect_height * 0.3
-                                        }
-                            else:
-                                # Both neighbors active, expand moderately and contract both neighbors more
-                                expansions[char] = {
-                                    'expand_above': True,
-                                    'expand_below': True,
-                                    'expand_above_extra': True,  # Extend into contracted space above
-                                    'expand_below_extra': True,  # Extend into contracted space below
-                                    'expanded_height': rect_height * 0.9  # Contract to 90%
-                                }
-                                if char_above and not char_above_has_text:
-                                    contractions[char_above] = {
-                                        'contract_above': False,
-                                        'contract_below': True,
-                                        'contracted_height': rect_height * 0.3  # Made much smaller
-                                    }
-                                if char_below and not char_below_has_text:
-                                    contractions[char_below] = {
-                                        'contract_above': True,
-                                        'contract_below': False,
-                                        'contracted_height': rect_height * 0.3  # Made much smaller
-                                    }
+            # Expand rectangles whose description needs it and contract their neighbours
+            owners = [char for char in assigned_descriptions if desc_expansion_needed[char]]
+            column_layout = LayoutSolver.solve_column(neighbours, owners, all_chars_involved, assigned_descriptions,
+                                                      rect_height, asymmetric_expansion)
+            expansions = column_layout.expansions
+            contractions = column_layout.contractions
             
+            Instrumentation.stop(layout_span)
+            shape_span = Instrumentation.start('shape_emission')
+
             # Loop through all characters to create shapes
             for char in main_characters:
                 if char in char_positions:
@@ -1118,69 +861,15 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
                             if char == event['FirstMainCharacter'] and event.get('Important Trigger', False):
                                 is_important_event = True
                         
-                        if is_death_event:
-                            color = "#868686"  # Gray color for death events
-                        else:
-                            base_color = character_colors.get(char, "#FFFFFF")  # Normal Color
-                            if is_important_event:
-                                # Make the color dimmer for important events
-                                # Convert hex to RGB, reduce brightness, convert back to hex
-                                hex_color = base_color.lstrip('#')
-                                rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-                                # Reduce brightness by 30%
-                                dimmed_rgb = tuple(int(c * 0.7) for c in rgb)
-                                color = '#%02x%02x%02x' % dimmed_rgb
-                            else:
-                                color = base_color
+                        # Gray for death events, dimmer character color for important events
+                        slot = palette.rectangle_slot(char, is_death_event, is_important_event)
+                        color = palette.colors[slot]
                         
-                        # Define coordinates for the rectangle
+                        # Define coordinates for the rectangle, expanded or contracted by the layout
                         x0 = x_position - rect_width
-                        y0 = char_positions[char] - rect_height/2
                         x1 = x_position + rect_width
-                        y1 = char_positions[char] + rect_height/2
-                        
-                        # Apply expansion if this character has a description needing expansion
-                        if char in expansions:
-                            expansion = expansions[char]
-                            if expansion['expand_above'] and expansion['expand_below']:
-                                # Check if we need to extend into contracted spaces
-                                if expansion.get('expand_above_extra', False) and expansion.get('expand_below_extra', False):
-                                    # Both neighbors active - make rectangle smaller instead of extending
-                                    y0 = char_positions[char] - rect_height * 0.85  # Smaller rectangle
-                                    y1 = char_positions[char] + rect_height * 0.85  # Smaller rectangle
-                                else:
-                                    y0 = char_positions[char] - rect_height
-                                    y1 = char_positions[char] + rect_height
-                            elif expansion['expand_above']:
-                                y0 = char_positions[char] - rect_height
-                                # Check if we should extend into contracted space below
-                                if expansion.get('expand_below_extra', False):
-                                    y1 = char_positions[char] + rect_height/2 + rect_height/3  # Made longer
-                                else:
-                                    y1 = char_positions[char] + rect_height/2
-                            elif expansion['expand_below']:
-                                # Check if we should extend into contracted space above
-                                if expansion.get('expand_above_extra', False):
-                                    y0 = char_positions[char] - rect_height/2 - rect_height/3  # Made longer
-                                else:
-                                    y0 = char_positions[char] - rect_height/2
-                                y1 = char_positions[char] + rect_height
-                        
-                        # Apply contraction if this character needs to be contracted due to adjacent expansion
-                        elif char in contractions:
-                            contraction = contractions[char]
-                            if contraction['contract_above'] and contraction['contract_below']:
-                                # Contract from both sides (though this case might not occur in practice)
-                                y0 = char_positions[char] - rect_height/8  # Made much smaller
-                                y1 = char_positions[char] + rect_height/8  # Made much smaller
-                            elif contraction['contract_above']:
-                                # Contract from above (neighbor below is expanding)
-                                y0 = char_positions[char] - rect_height/8  # Made much shorter
-                                y1 = char_positions[char] + rect_height/2
-                            elif contraction['contract_below']:
-                                # Contract from below (neighbor above is expanding)
-                                y0 = char_positions[char] - rect_height/2
-                                y1 = char_positions[char] + rect_height/8  # Made much shorter
+                        y0 = column_layout.y0[neighbours.index[char]]
+                        y1 = column_layout.y1[neighbours.index[char]]
                         
                         # Create SVG path for rounded rectangle
                         path = (f'M {x0+corner_radius} {y0} L {x1-corner_radius} {y0} ' 
@@ -1198,7 +887,8 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
                             line=dict(width=0),  # No border
                             xref="x",
                             yref="y",
-                            layer="between"  # Changed from "above" to "between" for participants
+                            layer="between",  # Changed from "above" to "between" for participants
+                            palette_slot=slot
                         )
 
                         if char in expansions:
@@ -1222,81 +912,13 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
                                 ('right_line', x1, (y0+y1)/2, 5)   # Event 5 -> Right line
                             ]
 
-                            # Silver color for corner coverings
-                            corner_color = "rgba(192, 192, 192, 0.9)"  # Bright silver with slight transparency
-                            background_color = '#111111' # Plot background color
-                            border_width = 0.12 # Width of the indicator border
-
-                            # Add corner coverings for each event this character participates in
-                            # Now we check which specific events the character participates in and show the corresponding corners
+                            # Add a mark for each event this character participates in, at the
+                            # corner or side mapped to that event
                             for event_idx in char_event_participation[char]:
-                                # Find the corner position for this specific event
-                                corner_mapping = None
                                 for corner_name, corner_x, corner_y, mapped_event_idx in corner_event_mapping:
                                     if mapped_event_idx == event_idx:
-                                        corner_mapping = (corner_name, corner_x, corner_y)
+                                        indicators.add(corner_name, corner_x, corner_y)
                                         break
-                                
-                                if corner_mapping:  # Only show if we have a valid corner mapping for this event
-                                    corner_name, corner_x, corner_y = corner_mapping
-
-                                    # Path for the silver indicator
-                                    indicator_path = ""
-
-                                    # Standardized indicator dimensions for slim consistent lines
-                                    indicator_length = border_width * 1.8  # Length of the arms extending from corner
-                                    line_thickness = border_width * 0.6  # Consistent thickness for all indicators - increased width
-                                    
-                                    if corner_name == 'top_left':
-                                        # Top-left corner indicator - slim L-shape following rectangle contour
-                                        # Outer path for the L-shape
-                                        outer_path = f"M {corner_x} {corner_y + corner_radius + indicator_length} L {corner_x} {corner_y + corner_radius} Q {corner_x} {corner_y} {corner_x + corner_radius} {corner_y} L {corner_x + corner_radius + indicator_length} {corner_y}"
-                                        # Inner path (inset by line_thickness)
-                                        inner_path = f"L {corner_x + corner_radius + indicator_length} {corner_y + line_thickness} L {corner_x + corner_radius} {corner_y + line_thickness} Q {corner_x + line_thickness} {corner_y + line_thickness} {corner_x + line_thickness} {corner_y + corner_radius} L {corner_x + line_thickness} {corner_y + corner_radius + indicator_length} Z"
-                                        indicator_path = outer_path + inner_path
-                                    elif corner_name == 'top_right':
-                                        # Top-right corner indicator - slim L-shape following rectangle contour
-                                        outer_path = f"M {corner_x - corner_radius - indicator_length} {corner_y} L {corner_x - corner_radius} {corner_y} Q {corner_x} {corner_y} {corner_x} {corner_y + corner_radius} L {corner_x} {corner_y + corner_radius + indicator_length}"
-                                        inner_path = f"L {corner_x - line_thickness} {corner_y + corner_radius + indicator_length} L {corner_x - line_thickness} {corner_y + corner_radius} Q {corner_x - line_thickness} {corner_y + line_thickness} {corner_x - corner_radius} {corner_y + line_thickness} L {corner_x - corner_radius - indicator_length} {corner_y + line_thickness} Z"
-                                        indicator_path = outer_path + inner_path
-                                    elif corner_name == 'bottom_left':
-                                        # Bottom-left corner indicator - slim L-shape following rectangle contour
-                                        outer_path = f"M {corner_x + corner_radius + indicator_length} {corner_y} L {corner_x + corner_radius} {corner_y} Q {corner_x} {corner_y} {corner_x} {corner_y - corner_radius} L {corner_x} {corner_y - corner_radius - indicator_length}"
-                                        inner_path = f"L {corner_x + line_thickness} {corner_y - corner_radius - indicator_length} L {corner_x + line_thickness} {corner_y - corner_radius} Q {corner_x + line_thickness} {corner_y - line_thickness} {corner_x + corner_radius} {corner_y - line_thickness} L {corner_x + corner_radius + indicator_length} {corner_y - line_thickness} Z"
-                                        indicator_path = outer_path + inner_path
-                                    elif corner_name == 'bottom_right':
-                                        # Bottom-right corner indicator - slim L-shape following rectangle contour
-                                        outer_path = f"M {corner_x} {corner_y - corner_radius - indicator_length} L {corner_x} {corner_y - corner_radius} Q {corner_x} {corner_y} {corner_x - corner_radius} {corner_y} L {corner_x - corner_radius - indicator_length} {corner_y}"
-                                        inner_path = f"L {corner_x - corner_radius - indicator_length} {corner_y - line_thickness} L {corner_x - corner_radius} {corner_y - line_thickness} Q {corner_x - line_thickness} {corner_y - line_thickness} {corner_x - line_thickness} {corner_y - corner_radius} L {corner_x - line_thickness} {corner_y - corner_radius - indicator_length} Z"
-                                        indicator_path = outer_path + inner_path
-                                    elif corner_name == 'left_line':
-                                        # Left side vertical line indicator - slimmer thickness
-                                        line_length = rect_height * 0.35  # Slightly shorter for better proportion
-                                        line_top = corner_y - line_length/2
-                                        line_bottom = corner_y + line_length/2
-                                        vertical_line_thickness = line_thickness * 0.5  # Make vertical lines slimmer
-                                        indicator_path = f"M {corner_x} {line_top} L {corner_x + vertical_line_thickness} {line_top} L {corner_x + vertical_line_thickness} {line_bottom} L {corner_x} {line_bottom} Z"
-                                    elif corner_name == 'right_line':
-                                        # Right side vertical line indicator - slimmer thickness
-                                        line_length = rect_height * 0.35  # Slightly shorter for better proportion
-                                        line_top = corner_y - line_length/2
-                                        line_bottom = corner_y + line_length/2
-                                        vertical_line_thickness = line_thickness * 0.5  # Make vertical lines slimmer
-                                        indicator_path = f"M {corner_x - vertical_line_thickness} {line_top} L {corner_x} {line_top} L {corner_x} {line_bottom} L {corner_x - vertical_line_thickness} {line_bottom} Z"
-
-                                    # Add the indicator shape
-                                    all_shapes.append(
-                                        dict(
-                                            type="path",
-                                            path=indicator_path,
-                                            fillcolor=corner_color,
-                                            opacity=1.0,
-                                            line=dict(width=0.5, color=background_color),  # Add thin border with background color
-                                            xref="x",
-                                            yref="y",
-                                            layer="above"  # Place indicator on top
-                                        )
-                                    )
                         
                         # Add description text if this character has been assigned a description
                         if char in assigned_descriptions:
@@ -1345,63 +967,18 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
                         # Create a single hover trace for this character with all their events
                         if char_events:
                             # For multiple events, show the most relevant one (first main character event if available)
-                            primary_event = None
-                            for event in char_events:
+                            primary = 0
+                            for position, event in enumerate(char_events):
                                 if event.get('FirstMainCharacter') == char:
-                                    primary_event = event
+                                    primary = position
                                     break
-                            if primary_event is None:
-                                primary_event = char_events[0]
-                            
-                            hover_desc = primary_event.get('Full_Description', primary_event.get('FormattedDescription', ''))
-                            hover_date = primary_event['Date'].strftime('%Y-%m-%d')
-                            
-                            # Check if this is a death event
-                            death_value = primary_event.get('Death', False)
-                            is_death = death_value == True or death_value == 'True'
-                            
-                            # Wrap the description and characters for better vertical display
-                            wrapped_description = wrap_event_text(hover_desc, width=50)
-                            wrapped_characters = wrap_event_text(primary_event.get('Characters', 'N/A'), width=40)
-                            
-                            # Get character color for hover background
-                            char_color = character_colors.get(char, "#FFFFFF")
                             
-                            # For death events, override with grey background and white text
-                            if is_death:
-                                char_color = "#868686"  # Grey background for death events (same as rectangle color)
-                                text_color = "white"
-                                # Add skull emoji after the main character name for death events
-                                skull_emoji = "                                                                             💀"
-                                hovertemplate = f'<b style="color:{text_color}; text-align: center;">%{{customdata[0]}}{skull_emoji}</b><br><span style="color:{text_color}; text-align: center;">%{{customdata[1]}}</span><br><br><span style="color:{text_color}; text-align: center;">%{{customdata[2]}}</span><br><br><i style="color:{text_color}; text-align: center;">Characters:<br>%{{customdata[3]}}</i><extra></extra>'
-                            else:
-                                # Calculate text color based on background brightness for normal events
-                                text_color = 'black' if np.mean([int(char_color[i:i+2], 16) for i in (1, 3, 5)]) > 128 else 'white'
-                                # Add star emoji after the main character name for normal events
-                                star_emoji = "                                                                             ⭐"
-                                hovertemplate = f'<b style="color:{text_color}">%{{customdata[0]}}{star_emoji}</b><br><span style="color:{text_color}">%{{customdata[1]}}</span><br><br><span style="color:{text_color}">%{{customdata[2]}}</span><br><br><i style="color:{text_color}">Characters:<br>%{{customdata[3]}}</i><extra></extra>'
-                            
-                            all_hover_traces.append(
-                                go.Scatter(
-                                    x=[x_position],
-                                    y=[char_positions[char]],
-                                    mode='markers',
-                                    marker=dict(
-                                        opacity=0,
-                                        size=10,
-                                    ),
-                                    hoverinfo='all',
-                                    customdata=[[primary_event.get('FirstMainCharacter', 'N/A'), hover_date, wrapped_description, wrapped_characters]],
-                                    hovertemplate=hovertemplate,
-                                    hoverlabel=dict(bgcolor=char_color, bordercolor="white", font=dict(color=text_color)),
-                                    showlegend=False
-                                )
-                            )
+                            all_hover_traces.append(hover_trace(char_event_ids[primary], char_events[primary],
+                                                                char, x_position, " " * 77))
                     
                     # Handle non-participants
                     elif show_non_participants:
-                        event_date_str = event_group[0][1]['Date'].strftime('%d-%m-%Y')
-                        add_non_participant_rectangles([char], x_position, event_date_str)
+                        add_non_participant_rectangles([char], x_position, date_bands[event_group[0][0]])
         
         # Add interactive buttons for merged events
         for idx, (event_idx, event) in enumerate(event_group):
@@ -1412,130 +989,26 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
         
         # Increment output_position for the next event or merged group
         # --- Add horizontal slit for world indicator here ---
-        world_colors = {
-            "Jonas": "#f9b405", #Gold
-            "Martha": "#9803f6", #Purple
-            "Origin": "#032ff6", #Blue
-            "Origin (End)": "#032ff6", #Blue
-        }
-        
         # Determine world for this group (handle both single and merged events)
         if len(event_group) > 1 and 'World' in event_group[0][1]:
             world = event_group[0][1]['World']
         else:
             world = event_group[0][1].get('World', None)
         
-        x_pos = output_position * event_spacing
-        slit_y = len(main_characters) * character_spacing + 0.5  # Position below the plot area but within visible range
-        slit_width = rect_width * 1.2
-        slit_height = 0.2  # Height for the rounded rectangle
-        
-        # Create coordinates for the world indicator
-        x0 = x_pos - slit_width + 0.15
-        x1 = x_pos + slit_width - 0.15
-        y0 = slit_y - slit_height/2
-        y1 = slit_y + slit_height/2
-        
-        # Check for mixed world scenarios (e.g., "Jonas/Martha", "Martha/Jonas")
-        if world and "/" in world:
-            # Split the world names
-            world_parts = [w.strip() for w in world.split("/")]
-            if len(world_parts) == 2:
-                first_world = world_parts[0]
-                second_world = world_parts[1]
-                first_color = world_colors.get(first_world, "#FFFFFF")
-                second_color = world_colors.get(second_world, "#FFFFFF")
-                
-                # Create left half with first world color
-                x_mid = (x0 + x1) / 2
-                left_path = (f'M {x0+corner_radius} {y0} L {x_mid} {y0} ' 
-                            f'L {x_mid} {y1} L {x0+corner_radius} {y1} ' 
-                            f'Q {x0} {y1} {x0} {y1-corner_radius} L {x0} {y0+corner_radius} ' 
-                            f'Q {x0} {y0} {x0+corner_radius} {y0} Z')
-                
-                all_shapes.append(
-                    dict(
-                        type="path",
-                        path=left_path,
-                        fillcolor=first_color,
-                        opacity=1.0,
-                        line=dict(width=0),
-                        xref="x",
-                        yref="y",
-                        layer="above"
-                    )
-                )
-                
-                # Create right half with second world color
-                right_path = (f'M {x_mid} {y0} L {x1-corner_radius} {y0} ' 
-                             f'Q {x1} {y0} {x1} {y0+corner_radius} L {x1} {y1-corner_radius} ' 
-                             f'Q {x1} {y1} {x1-corner_radius} {y1} L {x_mid} {y1} ' 
-                             f'L {x_mid} {y0} Z')
-                
-                all_shapes.append(
-                    dict(
-                        type="path",
-                        path=right_path,
-                        fillcolor=second_color,
-                        opacity=1.0,
-                        line=dict(width=0),
-                        xref="x",
-                        yref="y",
-                        layer="above"
-                    )
-                )
-            else:
-                # Fallback for unexpected format - use single color
-                world_color = world_colors.get(world, "#FFFFFF")
-                path = (f'M {x0+corner_radius} {y0} L {x1-corner_radius} {y0} ' 
-                       f'Q {x1} {y0} {x1} {y0+corner_radius} L {x1} {y1-corner_radius} ' 
-                       f'Q {x1} {y1} {x1-corner_radius} {y1} L {x0+corner_radius} {y1} ' 
-                       f'Q {x0} {y1} {x0} {y1-corner_radius} L {x0} {y0+corner_radius} ' 
-                       f'Q {x0} {y0} {x0+corner_radius} {y0} Z')
-                
-                all_shapes.append(
-                    dict(
-                        type="path",
-                        path=path,
-                        fillcolor=world_color,
-                        opacity=1.0,
-                        line=dict(width=0),
-                        xref="x",
-                        yref="y",
-                        layer="above"
-                    )
-                )
-        else:
-            # Single world scenario - use original logic
-            world_color = world_colors.get(world, "#FFFFFF")
-            path = (f'M {x0+corner_radius} {y0} L {x1-corner_radius} {y0} ' 
-                   f'Q {x1} {y0} {x1} {y0+corner_radius} L {x1} {y1-corner_radius} ' 
-                   f'Q {x1} {y1} {x1-corner_radius} {y1} L {x0+corner_radius} {y1} ' 
-                   f'Q {x0} {y1} {x0} {y1-corner_radius} L {x0} {y0+corner_radius} ' 
-                   f'Q {x0} {y0} {x0+corner_radius} {y0} Z')
-            
-            all_shapes.append(
-                dict(
-                    type="path",
-                    path=path,
-                    fillcolor=world_color,
-                    opacity=1.0,
-                    line=dict(width=0),
-                    xref="x",
-                    yref="y",
-                    layer="above"
-                )
-            )
+        world_strip.add(output_position * event_spacing, world)
         output_position += 1
+        Instrumentation.stop(shape_span)
 
-    # Add all shapes to the figure in a single operation
-    # Non-expanded shapes first
-    for shape in all_shapes:
-        fig.add_shape(shape)
-    
-    # Then expanded shapes, so they are drawn on top
-    for shape in expanded_shapes:
-        fig.add_shape(shape)
+    assembly_span = Instrumentation.start('figure_assembly')
+    Instrumentation.count('shapes', len(all_shapes) + len(expanded_shapes))
+    Instrumentation.count('traces', len(all_text_traces) + len(all_hover_traces))
+
+    # Add all shapes to the figure in a single operation (add_shape per shape is quadratic),
+    # non-expanded shapes first and expanded shapes last so they are drawn on top, keeping
+    # the palette slot of every shape (-1 for colors outside the palette) for re-theming
+    shapes = all_shapes + expanded_shapes
+    palette_shapes = [shape.pop('palette_slot', -1) for shape in shapes]
+    fig.update_layout(shapes=shapes)
 
     # Add all traces to the figure
     for trace in all_text_traces:
@@ -1543,6 +1016,12 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
     
     for trace in all_hover_traces:
         fig.add_trace(trace)
+
+    if indicators.count:
+        fig.add_trace(indicators.trace())
+
+    if world_strip.count:
+        fig.add_trace(world_strip.trace())
     
     # Calculate max positions for proper axis limits
     # Use output_position instead of len(events_df) to account for merged events
@@ -1554,20 +1033,21 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
     dead_space_data_units = 6.0
     
     # Add background image to cover the entire plot area with extension
-    fig.add_layout_image(
-        dict(
-            source="C:/Users/User/Desktop/CurrentVersion/bgimplusplus.png",
-            xref="x",
-            yref="y",
-            x=-6,  # Extended even further left to ensure full coverage
-            y=-dead_space_data_units - 2,  # Start from below the dead space area
-            sizex=max_x + 12,  # Cover more width (6 units on each side for full coverage)
-            sizey=total_char_space + dead_space_data_units + 6,  # Cover from dead space to bottom of plot
-            sizing="stretch",  # Force the image to stretch to fill the entire specified area
-            opacity=1.0,
-            layer="below"
+    if background_image:
+        fig.add_layout_image(
+            dict(
+                source=image_source(background_image),
+                xref="x",
+                yref="y",
+                x=-6,  # Extended even further left to ensure full coverage
+                y=-dead_space_data_units - 2,  # Start from below the dead space area
+                sizex=max_x + 12,  # Cover more width (6 units on each side for full coverage)
+                sizey=total_char_space + dead_space_data_units + 6,  # Cover from dead space to bottom of plot
+                sizing="stretch",  # Force the image to stretch to fill the entire specified area
+                opacity=1.0,
+                layer="below"
+            )
         )
-    )
 
     # Calculate the figure height to make the plot area exactly 1600px
     # The plot area height should be 1600px, so we calculate figure height accordingly
@@ -1581,7 +1061,7 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
     # Add character labels as rectangles
     label_width = 2  # Width for character name labels
     for char, y_pos in char_positions.items():
-        color = character_colors.get(char, "#FFFFFF")
+        color = palette.color(char)
         
         all_shapes.append(
             dict(
@@ -1627,26 +1107,31 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
     year_positions = []
     last_year = None
 
+    # Sorted date -> x-position index used by the website to jump to a date
+    date_index = {}
+
     # Iterate through the merged events to find unique dates and their positions
     output_position = 0  # Reset output_position for date positioning
     for event_group in merged_events:
         # Use the first event in the group to determine the date
         first_event = event_group[0][1]
-        date_obj = first_event['Date']
-        date_str = date_obj.strftime('%d-%m-%Y')
-        current_year = date_obj.year
-
-        # Check if the date is already added
-        if date_str not in unique_dates:
-            # Format the date based on whether it's the first date of the year
-            if current_year != last_year:
-                formatted_date = date_obj.strftime('%d/%m/%Y')  # Full format for the first date of the year
-                last_year = current_year
-            else:
-                formatted_date = date_obj.strftime('%d/%m')  # Only day-month for subsequent dates in the same year
-
-            unique_dates.append(formatted_date)
-            unique_positions.append(output_position * event_spacing)  # Use the output position for positioning
+        current_year = first_event['Year']
+
+        # The date index keeps the first (left-most) column of every calendar date
+        iso_date = first_event['DateISO']
+        if iso_date not in date_index:
+            date_index[iso_date] = output_position * event_spacing
+
+        # Every column gets a tick label, also when it repeats the previous column's date
+        # Format the date based on whether it's the first date of the year
+        if current_year != last_year:
+            formatted_date = first_event['DateSlash']  # Full format for the first date of the year
+            last_year = current_year
+        else:
+            formatted_date = first_event['DateDayMonth']  # Only day-month for subsequent dates in the same year
+
+        unique_dates.append(formatted_date)
+        unique_positions.append(output_position * event_spacing)  # Use the output position for positioning
 
         # Increment output_position for the next event or merged group
         output_position += 1
@@ -1679,9 +1164,28 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
             fixedrange=True,  # Prevent zooming to ensure dead space remains visible
             side='left',  # Ensure character names appear on the left
             showticklabels=True  # Explicitly show tick labels
-        )
+        ),
+        # Chronologically sorted [date, x] pairs (undated events, DateISO '', have no
+        # position to jump to), read back by export_date_index, the hover texts shared by
+        # the hover traces, the column width (for DeltaExport) and the color tables with
+        # the palette slot of every shape
+        meta=dict(date_index=sorted([date, x] for date, x in date_index.items() if date),
+                  hover=dict(events=hover_events, templates=list(hover_templates)),
+                  event_spacing=event_spacing,
+                  palette=palette.to_json(), palette_shapes=palette_shapes)
     )
-    
+
+    # Non-participant rectangles as one image above the background image, rasterized at
+    # the figure's pixel density now that its size and axis ranges are set
+    if background_grid is not None and background_grid.count:
+        fig.add_layout_image(background_grid.layout_image(
+            [char_positions[char] for char in main_characters], rect_width, rect_height / 2, corner_radius,
+            band_colors, BackgroundGrid.figure_resolution(fig)))
+        Instrumentation.count('background_cells', background_grid.count)
+
+    # Zoom levels for the page: overview heatmap and which primitives each level draws
+    LevelOfDetail.add_levels(fig, events_df, main_characters, char_positions, event_spacing, max_x, overview_bucket)
+
     # Add click events to the button traces for interactive functionality
     # This will be handled via custom JavaScript when the HTML is generated
     for trace in all_hover_traces:
@@ -1689,21 +1193,86 @@ def create_dark_timeline_grid(character_spacing=1.0, event_spacing=1.0, rect_wid
             # Add custom data for JavaScript interaction
             if not hasattr(trace, 'customdata') or trace.customdata is None:
                 trace.customdata = []
-    
+
+    Instrumentation.stop(assembly_span)
+    Instrumentation.stop(render_span)
     return fig
 
-# Run the visualization
-if __name__ == "__main__":
-    # Create visualization with configurable spacing parameters
-    fig = create_dark_timeline_grid(
-        character_spacing=2.5,    # Increased spacing between characters
-        event_spacing=1.5,      # Adjust horizontal spacing between events
-        rect_width=0.7,        # Adjust rectangle width
-        rect_height=2.4,        # Adjusted rectangle height to match character spacing
-        show_non_participants=True,  # Set to False to disable non-participant rectangles
-        asymmetric_expansion=True     # Enable asymmetric expansion for adjacent rectangles with text
-    )
-    
+def export_date_index(fig, output_path):
+    """
+    Write the sorted date -> x-position index of a timeline figure as JSON.
+
+    "positions" holds the figure pixel offset of every date in "dates", so the website
+    can scroll straight to a date without measuring the plot. The "years" list holds
+    [year, pixel offset] of the first column of every year for the year minimap.
+    """
+    import json
+
+    layout = fig.layout
+    x_min, x_max = layout.xaxis.range
+    width = layout.width
+    px_per_unit = width / (x_max - x_min)
+
+    dates = []
+    positions = []
+    years = []
+    last_year = None
+    for date, x in layout.meta['date_index']:
+        px = round((x - x_min) * px_per_unit, 1)
+        dates.append(date)
+        positions.append(px)
+
+        year = int(date[:4])
+        if year != last_year:
+            years.append([year, px])
+            last_year = year
+
+    date_index = {
+        'width': width,
+        'height': layout.height,
+        'dates': dates,      # ISO dates, sorted ascending (binary-searchable)
+        'positions': positions,
+        'years': years
+    }
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(date_index, f, separators=(',', ':'))
+
+def update_manifest(manifest_path, artifact_name, **entry):
+    """
+    Record the intrinsic size (and related files) of an exported artifact in the
+    content manifest read by the website, keeping entries of other artifacts.
+
+    Example entry: update_manifest(path, "timeline.html", width=16380, height=2200, index="timeline.index.json")
+    """
+    import json
+
+    manifest = {'artifacts': {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    manifest.setdefault('artifacts', {})[artifact_name] = entry
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def export_timeline_html(fig, output_path, events_df, float_precision=None, chunk_list=None):
+    """
+    Write the figure as a standalone HTML page with the injected CSS, the event data
+    (events_df, the table the figure was built from) and the JavaScript used by the
+    time travel / world swap buttons.
+    Floats in the figure are rounded to float_precision decimals (default Serializer.FLOAT_PRECISION,
+    negative keeps full precision).
+    With chunk_list (URL of a DeltaExport chunk list) the page is only a shell: plotly.js
+    comes from plotly.min.js next to it and the figure data from the listed chunks.
+    """
+    import DeltaExport
+    import HtmlWriter
+    import Serializer
+
+    float_precision = Serializer.export_precision(float_precision)
+
     # Save as interactive HTML with custom JavaScript for button functionality
     # Configure to completely remove all toolbar functionality and interactions
     config = {
@@ -1725,14 +1294,14 @@ if __name__ == "__main__":
         }
     }
     
-    html_string = pio.to_html(fig, include_plotlyjs=True, config=config)
-    
     # Add CSS to ensure no gray overlay from HTML/body elements and force white dates
     css_injection = """
     <style>
     body, html {
         background-color: transparent !important;
         background: transparent !important;
+        margin: 0 !important;  /* Page size == figure size, as recorded in the manifest */
+        padding: 0 !important;
     }
     .plotly-graph-div {
         background-color: transparent !important;
@@ -1754,45 +1323,52 @@ if __name__ == "__main__":
     </style>
     """
     
-    # Inject CSS into the HTML
-    html_string = html_string.replace('<head>', '<head>' + css_injection)
-    
-    # Create simple event data mapping for JavaScript
-    all_events_data = []
-    shape_to_event_mapping = []  # Maps shape index to event info
-    
-    # Process events to create mapping
-    shape_index = 0
-    for idx, row in events_df.iterrows():
-        event_data = {
-            'event_idx': idx,
-            'type': row.get('Type', ''),
-            'characters': row.get('Characters', ''),
-            'first_main_character': row.get('FirstMainCharacter', ''),
-            'date': row['Date'].strftime('%Y-%m-%d') if pd.notnull(row['Date']) else ''
-        }
-        all_events_data.append(event_data)
-        
-        # Add shape mapping info for this event
-        # Note: This is a simplified mapping - in reality, each event can have multiple shapes
-        # We'll need to enhance this in the JavaScript side
-        shape_to_event_mapping.append({
-            'event_idx': idx,
-            'event_type': row.get('Type', ''),
-            'shape_start_index': shape_index  # Will be updated when we know actual count
-        })
-    
-    # Convert to JavaScript format
-    import json
-    all_events_js = json.dumps(all_events_data)
+    # Hover texts, shipped once: hover traces carry [[event_idx]] and meta.hover (a template
+    # index) and are filled in from this table right before plotting
+    hover_store = dict((fig.layout.meta or {}).get('hover') or {'events': {}, 'templates': []})
+    if chunk_list:
+        hover_store['events'] = {}  # Filled in from the chunks
+    hover_script = f"""
+    <script>
+    var timelineHover = {Serializer.dumps(hover_store)};
+    function hydrateHoverTraces(data) {{
+        for (var trace of data) {{
+            if (trace.meta && trace.meta.hover !== undefined && trace.customdata) {{
+                trace.customdata = [timelineHover.events[trace.customdata[0][0]]];
+                trace.hovertemplate = timelineHover.templates[trace.meta.hover];
+            }}
+        }}
+        return data;
+    }}
+    </script>
+    """
+
+    # The page script below runs once the figure is plotted: right away for a standalone
+    # page, after the chunks are loaded for a shell
+    if chunk_list:
+        ready_script = DeltaExport.loader_script(chunk_list)
+    else:
+        ready_script = """
+    <script>
+    function onTimelineReady(callback) {
+        document.addEventListener('DOMContentLoaded', callback);
+    }
+    </script>
+    """
+
+    # Event data for JavaScript, built column-wise from the event table (shells get it from the chunks)
+    all_events_data = [] if chunk_list else Serializer.events_payload(events_df)
     
+    # The event data is streamed into the script in place of this marker
+    events_marker = "/*allEventsData*/"
+
     # Add custom JavaScript for button click handling
     custom_js = f"""
     <script>
     // Event data injected from Python
-    var allEventsData = {all_events_js};
+    var allEventsData = {events_marker};
     
-    document.addEventListener('DOMContentLoaded', function() {{
+    onTimelineReady(function() {{
         var graphDiv = document.getElementsByClassName('plotly-graph-div')[0];
         
         // Store original properties for reset functionality
@@ -1893,6 +1469,13 @@ if __name__ == "__main__":
             }}
         }}
         
+        // The non-participant image of background_mode 'image' (BackgroundGrid.py) is
+        // dimmed and hidden together with the shapes it replaces
+        function gridImages(properties) {{
+            return (graphDiv.layout.images || []).map(image =>
+                image.name === 'background_grid' ? Object.assign({{}}, image, properties) : image);
+        }}
+
         // Function to reset all highlighting and restore text visibility
         function resetHighlight() {{
             if (!isHighlightActive) return;
@@ -1940,7 +1523,7 @@ if __name__ == "__main__":
             }}
             
             // Apply updates
-            Plotly.update(graphDiv, updateData, {{shapes: updateShapes}});
+            Plotly.update(graphDiv, updateData, {{shapes: updateShapes, images: gridImages({{opacity: 1.0}})}});
         }}
         
         // Main highlighting function with improved text handling
@@ -2126,8 +1709,12 @@ if __name__ == "__main__":
                         // Non-text traces (hover traces, etc.)
                         var shouldKeepVisible = false;
                         
+                        // Participation indicators and the world strip always stay bright, like the layer="above" shapes
+                        if (trace.name && (trace.name.startsWith('indicator_') || trace.name.startsWith('world_'))) {{
+                            shouldKeepVisible = true;
+                        }}
                         // Check if this hover trace is related to a matching event
-                        if (trace.customdata && trace.customdata.length > 0) {{
+                        else if (trace.customdata && trace.customdata.length > 0) {{
                             for (var pos of brightPositions) {{
                                 if (trace.x && trace.y && trace.x.length > 0 && trace.y.length > 0) {{
                                     if (Math.abs(trace.x[0] - pos.x) < 0.1 && Math.abs(trace.y[0] - pos.y) < 1.5) {{
@@ -2146,7 +1733,7 @@ if __name__ == "__main__":
             }}
             
             // Apply updates to remaining traces first
-            Plotly.update(graphDiv, updateData, {{shapes: updateShapes}});
+            Plotly.update(graphDiv, updateData, {{shapes: updateShapes, images: gridImages({{opacity: 0.15}})}});
             
             // Now remove the non-matching text traces
             if (tracesToRemove.length > 0) {{
@@ -2168,6 +1755,13 @@ if __name__ == "__main__":
             var point = data.points[0];
             var trace = graphDiv.data[point.curveNumber];
             
+            // A cell of the density overview jumps to its period at full detail
+            if (trace.type === 'heatmap' && trace.name && trace.name.startsWith('overview_')) {{
+                var px = (point.x - baseRange[0]) * baseWidth / (baseRange[1] - baseRange[0]);
+                if (window.onTimelineJump) window.onTimelineJump(px);
+                return;
+            }}
+
             // Check if clicked point is a button
             if (trace.name && trace.name.startsWith('btn_') && trace.customdata) {{
                 var eventType = trace.customdata[0];
@@ -2181,24 +1775,218 @@ if __name__ == "__main__":
         graphDiv.on('plotly_doubleclick', function() {{
             resetHighlight();
         }});
+
+        // Semantic zoom, called by the website: the plot is laid out again at factor x its
+        // width with the x axis range pinned, and only the shape and trace groups of the zoom
+        // level for that factor are drawn (levels from layout.meta.lod, see LevelOfDetail.py)
+        var lod = (graphDiv.layout.meta && graphDiv.layout.meta.lod) || null;
+        var baseWidth = graphDiv.layout.width;
+        var baseRange = graphDiv.layout.xaxis.range.slice();
+        var currentLevel = 'full';
+
+        function traceGroup(trace) {{
+            var name = trace.name || '';
+            for (var [prefix, group] of lod.trace_groups) {{
+                if (name.startsWith(prefix)) return group;
+            }}
+            return lod.default_trace_group;
+        }}
+
+        function levelForZoom(factor) {{
+            var level = lod.levels[0];
+            for (var candidate of lod.levels) {{
+                if (factor >= candidate.min_zoom) level = candidate;
+            }}
+            return level;
+        }}
+
+        window.setTimelineZoom = function(factor) {{
+            var width = Math.round(baseWidth * factor);
+            var layoutUpdate = {{width: width, 'xaxis.range': baseRange.slice()}};
+            var level = lod ? levelForZoom(factor) : null;
+
+            if (level && level.name !== currentLevel) {{
+                // Highlighting keeps per-index state of traces and shapes, so it is cleared first
+                resetHighlight();
+                var visible = graphDiv.data.map(trace => level.traces.includes(traceGroup(trace)));
+                layoutUpdate.shapes = (graphDiv.layout.shapes || []).map(shape =>
+                    Object.assign({{}}, shape, {{visible: level.shapes.includes(shape.name || 'rectangle')}}));
+                layoutUpdate.images = gridImages({{visible: level.shapes.includes('rectangle')}});
+                Plotly.update(graphDiv, {{visible: visible}}, layoutUpdate);
+                currentLevel = level.name;
+            }} else {{
+                Plotly.relayout(graphDiv, layoutUpdate);
+            }}
+
+            document.body.dataset.levelOfDetail = currentLevel;
+            return width;
+        }};
+
+        // Re-theme: colors replaces layout.meta.palette.colors slot by slot (see Palette.py)
+        window.setTimelinePalette = function(colors) {{
+            var meta = graphDiv.layout.meta || {{}};
+            if (!meta.palette || !meta.palette_shapes) return;
+            resetHighlight();
+            var slots = meta.palette_shapes;
+            var shapes = (graphDiv.layout.shapes || []).map((shape, i) =>
+                slots[i] >= 0 ? Object.assign({{}}, shape, {{fillcolor: colors[slots[i]]}}) : shape);
+            meta.palette.colors = colors.slice();
+            Plotly.relayout(graphDiv, {{shapes: shapes}});
+        }};
     }});
     </script>
     """
     
-    # Insert the custom JavaScript before the closing body tag
-    html_string = html_string.replace('</body>', custom_js + '</body>')
-    
-    # Write the modified HTML
-    with open("Results/fckbksfrnocap.html", "w", encoding="utf-8") as f:
-        f.write(html_string)
+    # Stream the page: CSS into the head, figure JSON in batches, then the custom JavaScript
+    # with the event data before the closing body tag - the page never exists as one string
+    js_before_events, js_after_events = custom_js.split(events_marker)
 
-    # Save as high-resolution image - height now scales with character spacing
-    pio.write_image(fig, "Results/fckbksfrnocap.png", 
-                   width=12288, height=1200, scale=1)
-    
+    def body_html():
+        yield js_before_events
+        yield from Serializer.json_array_chunks(all_events_data)
+        yield js_after_events
+
+    HtmlWriter.write_figure_html(fig, output_path, config=config, head_html=css_injection + hover_script + ready_script,
+                                 body_html=body_html(), precision=float_precision,
+                                 data_function='hydrateHoverTraces',
+                                 exclude_meta=('hover', 'palette_shapes') if chunk_list else ('hover',),
+                                 include_plotlyjs='directory' if chunk_list else True,
+                                 include_data=not chunk_list)
+
+
+def export_timeline(fig, events_df, output_path, png=True, manifest=True, float_precision=None, chunked=False):
+    """
+    Write every artifact of a rendered timeline next to output_path (an .html file):
+    the interactive HTML, its date index and optionally the PNG.
+    chunked=True writes the HTML as a shell plus content-hashed data chunks (see
+    DeltaExport.py), so republishing after a small data change only replaces the
+    chunks that changed.
+
+    Returns the manifest entries {artifact name: entry}. They are also merged into
+    manifest.json next to the output unless manifest=False (parallel renders
+    collect them and write the manifest once). float_precision is passed on to
+    export_timeline_html.
+    """
+    import plotly.io as pio
+
+    output_dir, html_name = os.path.split(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(html_name)[0]
+    index_name = f"{stem}.index.json"
+    png_name = f"{stem}.png"
+
+    chunk_list = None
+    if chunked:
+        import DeltaExport
+        import Serializer
+
+        with Instrumentation.span('chunk_export'):
+            precision = Serializer.export_precision(float_precision)
+            chunk_list, changes = DeltaExport.write_chunks(fig, Serializer.events_payload(events_df),
+                                                           output_dir, stem, precision)
+            DeltaExport.write_plotlyjs(output_dir)
+        print(f"Chunks of {html_name}: " + ", ".join(f"{len(names)} {kind}" for kind, names in changes.items()))
+
+    with Instrumentation.span('html_export'):
+        export_timeline_html(fig, output_path, events_df, float_precision, chunk_list)
+
+    # Write the date index used by the website's "go to date" control and year minimap
+    export_date_index(fig, os.path.join(output_dir, index_name))
+
+    # Record intrinsic sizes so the website never has to load a view just to measure it
+    entries = {html_name: dict(width=fig.layout.width, height=fig.layout.height, index=index_name)}
+    if chunk_list:
+        entries[html_name]['chunks'] = chunk_list
+
+    if png:
+        # Save as high-resolution image - height now scales with character spacing
+        with Instrumentation.span('png_export'):
+            pio.write_image(fig, os.path.join(output_dir, png_name), 
+                           width=PNG_WIDTH, height=PNG_HEIGHT, scale=1)
+        entries[png_name] = dict(width=PNG_WIDTH, height=PNG_HEIGHT)
+
+    if manifest:
+        for artifact_name, entry in entries.items():
+            update_manifest(os.path.join(output_dir, "manifest.json"), artifact_name, **entry)
+    return entries
+
+def render_timeline(events_df, output_path, background_image=None, png=True, manifest=True,
+                    float_precision=None, chunked=False, cache=None, **grid_params):
+    """
+    Render events_df (create_dark_timeline_grid with background_image and grid_params)
+    and write every artifact next to output_path (export_timeline). With a
+    RenderCache, a render of the same data, options and code is copied from the cache
+    instead, and new renders are added to it. Returns the manifest entries.
+    """
+    output_dir = os.path.dirname(output_path)
+    if cache is not None:
+        options = dict(grid_params, background_image=background_image, png=png, chunked=chunked,
+                       float_precision=float_precision, output=os.path.basename(output_path))
+        with Instrumentation.span('render_cache'):
+            key = cache.key(events_df, options)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            entries = cache.restore(key, output_dir)
+        if entries is not None:
+            for artifact_name, entry in entries.items():
+                if entry.get('chunks'):
+                    import DeltaExport
+                    DeltaExport.prune_chunks(output_dir, entry['chunks'])
+                if manifest:
+                    update_manifest(os.path.join(output_dir, "manifest.json"), artifact_name, **entry)
+            return entries
+
+    fig = create_dark_timeline_grid(events_df=events_df, background_image=background_image, **grid_params)
+    entries = export_timeline(fig, events_df, output_path, png=png, manifest=manifest,
+                              float_precision=float_precision, chunked=chunked)
+
+    if cache is not None:
+        with Instrumentation.span('render_cache'):
+            cache.store(key, output_dir, entries)
+    return entries
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render the Dark timeline grid to HTML and PNG.")
+    parser.add_argument('--events', default=DEFAULT_EVENTS_PATH, help="processed event table (CSV)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_PATH,
+                        help="HTML output; the PNG, date index and manifest are written next to it")
+    parser.add_argument('--background-image', help="image file or URL drawn behind the grid")
+    parser.add_argument('--no-png', action='store_true', help="skip the Kaleido PNG export")
+    parser.add_argument('--chunked', action='store_true',
+                        help="write the HTML as a shell plus content-hashed chunks (delta publishing)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="render cache folder (default .render_cache); unchanged inputs skip the render")
+    parser.add_argument('--no-cache', action='store_true', help="always render, without reading or filling the cache")
+    parser.add_argument('--trace', action='store_true', help="write per-stage timings and counters")
+    args = parser.parse_args(argv)
+
+    # Record start time for execution measurement
+    start_time = time.time()
+    if args.trace:
+        Instrumentation.enable()
+
+    events_df = load_events(args.events)
+
+    cache = None
+    if not args.no_cache:
+        import RenderCache
+        cache = RenderCache.RenderCache(args.cache_dir or RenderCache.DEFAULT_DIR)
+
+    # Create visualization with configurable spacing parameters
+    render_timeline(events_df, args.output, background_image=args.background_image, png=not args.no_png,
+                    chunked=args.chunked, cache=cache, **DEFAULT_GRID_PARAMS)
 
     print("Visualization created successfully!")
     # Calculate and display execution time
     end_time = time.time()
     execution_time = end_time - start_time
-    print(f"Execution time: {execution_time:.2f} seconds")
\ No newline at end of file
+    print(f"Execution time: {execution_time:.2f} seconds")
+
+    # Per-stage timings and counters (only with --trace or DARK_TIMELINE_TRACE=1)
+    Instrumentation.write_reports(os.path.join(os.path.dirname(args.output), "visualization_trace"))
+
+if __name__ == "__main__":
+    main()
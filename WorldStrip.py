@@ -0,0 +1,95 @@
+"""
+World strip under the grid: one slit per event column in the colour of the
+column's world, as a single 1-row heatmap instead of one or two shapes per column.
+
+Every column is two cells, its left and right half, holding a world code (index
+into WORLDS, 0 for unknown worlds); a mixed world such as "Jonas/Martha" colours
+the halves differently. Cells between the slits are empty. The codes are the
+heatmap's z row and the colours its categorical colour scale, so the page can
+recolour or filter the strip by swapping the z array (the trace's meta lists the
+world of every code).
+"""
+
+# World names by code; code 0 is any other world
+WORLDS = (None, "Jonas", "Martha", "Origin", "Origin (End)")
+WORLD_COLORS = {
+    None: "#FFFFFF",
+    "Jonas": "#f9b405", #Gold
+    "Martha": "#9803f6", #Purple
+    "Origin": "#032ff6", #Blue
+    "Origin (End)": "#032ff6", #Blue
+}
+
+TRACE_NAME = 'world_strip'
+
+def world_code(world):
+    return WORLDS.index(world) if world in WORLDS else 0
+
+def half_codes(world):
+    """(left, right) world codes of a column whose world is world ("A/B" splits the column)."""
+    if isinstance(world, str) and "/" in world:
+        parts = [w.strip() for w in world.split("/")]
+        if len(parts) == 2:
+            return world_code(parts[0]), world_code(parts[1])
+    code = world_code(world)
+    return code, code
+
+def colorscale():
+    """Categorical colour scale: code k fills [k, k + 1) / len(WORLDS), for zmin -0.5, zmax len(WORLDS) - 0.5."""
+    scale = []
+    for code, world in enumerate(WORLDS):
+        color = WORLD_COLORS[world]
+        scale += [[code / len(WORLDS), color], [(code + 1) / len(WORLDS), color]]
+    return scale
+
+class WorldStrip:
+    """Collects the world of every column; trace() returns the strip as one Heatmap."""
+
+    def __init__(self, half_width, y, height):
+        self.half_width = half_width
+        self.y = y
+        self.height = height
+        self.columns = []
+
+    def add(self, x, world):
+        self.columns.append((x, half_codes(world)))
+
+    @property
+    def count(self):
+        return len(self.columns)
+
+    def cells(self):
+        """(x edges, codes): the cell boundaries and the code of every cell (None between slits)."""
+        edges = []
+        codes = []
+        for x, (left, right) in sorted(self.columns, key=lambda column: column[0]):
+            x0 = x - self.half_width
+            if not edges:
+                edges.append(x0)
+            elif x0 > edges[-1]:
+                # Empty cell up to this slit
+                codes.append(None)
+                edges.append(x0)
+            else:
+                # Overlapping slits: this column covers the end of the previous one
+                edges[-1] = max(x0, edges[-2])
+            edges += [x, x + self.half_width]
+            codes += [left, right]
+        return edges, codes
+
+    def trace(self):
+        import plotly.graph_objects as go
+
+        edges, codes = self.cells()
+        return go.Heatmap(
+            x=edges,
+            y=[self.y - self.height / 2, self.y + self.height / 2],
+            z=[codes],
+            zmin=-0.5,
+            zmax=len(WORLDS) - 0.5,
+            colorscale=colorscale(),
+            showscale=False,
+            hoverinfo='skip',
+            meta=dict(worlds=list(WORLDS)),
+            name=TRACE_NAME
+        )
@@ -26,6 +26,9 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Add header blackening effect on scroll
     addHeaderBlackeningEffect();
+
+    // Long task / frame time overlay (?profile)
+    initializePerformanceOverlay();
 });
 
 function initializeBackgroundEffects() {
@@ -92,9 +95,6 @@ function initializeVizControls() {
     const loadingOverlay = createLoadingOverlay();
     vizContainer.appendChild(loadingOverlay);
 
-    // Setup external scrolling for the iframe
-    setupExternalScrolling(iframe, iframeWrapper);
-
     const controlsContainer = document.createElement('div');
     controlsContainer.className = 'viz-controls';
 
@@ -152,6 +152,8 @@ function initializeVizControls() {
             vizContainer.style.minHeight = (currentHeight + 100) + 'px';
 
             if (btnInfo.type === 'image') {
+                // The date index maps positions of the interactive figure only
+                removeDateNavigator(vizContainer);
                 iframe.removeAttribute('src');
                 iframe.srcdoc = `
                     <style>
@@ -208,56 +210,32 @@ function initializeVizControls() {
                 `;                // Hide loading overlay after image loads (with a small delay)
                 setTimeout(() => {
                     hideLoadingOverlay(loadingOverlay);
-                    // Setup external scrolling for new content
-                    setupExternalScrolling(iframe, iframeWrapper);
+                    // Size the iframe for external scrolling from the image's exported size
+                    loadContentManifest().then(manifest => {
+                        const dimensions = manifest[btnInfo.src] || {};
+                        const imageHeight = btnInfo.height - 20;
+                        const imageWidth = dimensions.width && dimensions.height
+                            ? dimensions.width * imageHeight / dimensions.height + 20  // + body padding
+                            : null;
+                        setupExternalScrolling(iframe, iframeWrapper, imageWidth);
+                    });
                     // Re-initialize zoom for the new content
                     setTimeout(initializeZoom, 100);
                 }, 800);} else {
-                // Create a temporary iframe to measure the original HTML content
-                const tempIframe = document.createElement('iframe');
-                tempIframe.style.position = 'absolute';
-                tempIframe.style.top = '-9999px';
-                tempIframe.style.left = '-9999px';
-                tempIframe.style.width = '100%';
-                tempIframe.style.height = 'auto';
-                tempIframe.style.border = 'none';
-                tempIframe.src = btnInfo.src;
-                
-                document.body.appendChild(tempIframe);
-                
-                tempIframe.onload = () => {
-                    let originalHeight = 1000; // Default fallback height
-                    let originalWidth = 1400; // Default fallback width
-                    
-                    try {
-                        // Try to get the actual content dimensions
-                        const tempDoc = tempIframe.contentDocument || tempIframe.contentWindow.document;
-                        if (tempDoc && tempDoc.body) {
-                            originalHeight = Math.max(
-                                tempDoc.body.scrollHeight,
-                                tempDoc.body.offsetHeight,
-                                tempDoc.documentElement.scrollHeight,
-                                tempDoc.documentElement.offsetHeight
-                            );
-                            originalWidth = Math.max(
-                                tempDoc.body.scrollWidth,
-                                tempDoc.body.offsetWidth,
-                                tempDoc.documentElement.scrollWidth,
-                                tempDoc.documentElement.offsetWidth
-                            );
-                        }
-                    } catch (e) {
-                        // Cross-origin or other access issues, use default dimensions
-                        console.log('Using default dimensions due to access restrictions');
-                    }
+                // Intrinsic content size comes from the exporter's manifest, so the
+                // timeline document is only loaded once (by the real iframe below)
+                loadContentManifest().then(manifest => {
+                    const dimensions = manifest[btnInfo.src] || {};
+                    const originalHeight = dimensions.height || 1000; // Default fallback height
+                    const originalWidth = dimensions.width || 1400; // Default fallback width
                     
                     // Calculate scale factor to fit height to 700px
                     const targetHeight = btnInfo.height; // This will now use 725 from the button config
                     const scaleFactor = targetHeight / originalHeight;
                     const scaledWidth = originalWidth * scaleFactor;
                     
-                    // Remove temporary iframe
-                    document.body.removeChild(tempIframe);
+                    // Remember the content scale so date positions can be mapped to scroll offsets
+                    iframeWrapper.dataset.contentScale = scaleFactor;
                     
                     // Create the scaled HTML wrapper
                     iframe.removeAttribute('src');
@@ -334,13 +312,20 @@ function initializeVizControls() {
                         // Add a small delay to ensure content is fully rendered
                         setTimeout(() => {
                             hideLoadingOverlay(loadingOverlay);
-                            // Setup external scrolling for new content
-                            setupExternalScrolling(iframe, iframeWrapper);
+                            // Size the iframe for external scrolling from the manifest dimensions
+                            setupExternalScrolling(iframe, iframeWrapper, scaledWidth);
                             // Re-initialize zoom for the new content
                             setTimeout(initializeZoom, 100);
                         }, 500);
+                        
+                        // Build the "go to date" control and year minimap from the exported index
+                        if (dimensions.index) {
+                            loadDateIndex(dimensions.index).then(dateIndex => {
+                                initializeDateNavigator(vizContainer, iframeWrapper, dateIndex);
+                            });
+                        }
                     };
-                };
+                });
             }
         });
         controlsContainer.appendChild(button);
@@ -363,7 +348,8 @@ function initializeVizControls() {
         }, 100);
     }
 
-    syncThemeWithAnimation(controlsContainer);
+    // Theme the whole container so the controls and the date navigator share the colours
+    syncThemeWithAnimation(vizContainer);
 }
 
 // Function to show desktop-only message
@@ -494,12 +480,80 @@ function formatColor(color) {
     }
 }
 
-function syncThemeWithAnimation(controlsContainer) {
+// Keyframes of the header animations (see timeMachinePhase / godParticlePhase in style.css)
+// as [progress, opacity] pairs, so the theme can be computed from the animation clock
+// instead of reading computed styles.
+const PHASE_CYCLE_MS = 40000;
+const TIME_MACHINE_KEYFRAMES = [[0, 0], [0.05, 1], [0.35, 1], [0.40, 0], [1, 0]];
+const GOD_PARTICLE_KEYFRAMES = [[0, 0], [0.50, 0], [0.55, 1], [0.85, 1], [0.90, 0], [1, 0]];
+
+// CSS "ease-in-out" timing function: cubic-bezier(0.42, 0, 0.58, 1)
+function easeInOut(x) {
+    const bezier = (s, p1, p2) => 3 * (1 - s) * (1 - s) * s * p1 + 3 * (1 - s) * s * s * p2 + s * s * s;
+    let low = 0;
+    let high = 1;
+    let s = x;
+    for (let i = 0; i < 12; i++) {
+        s = (low + high) / 2;
+        if (bezier(s, 0.42, 0.58) < x) {
+            low = s;
+        } else {
+            high = s;
+        }
+    }
+    return bezier(s, 0, 1);
+}
+
+function keyframeOpacity(keyframes, progress) {
+    for (let i = 1; i < keyframes.length; i++) {
+        const [endProgress, endOpacity] = keyframes[i];
+        if (progress <= endProgress) {
+            const [startProgress, startOpacity] = keyframes[i - 1];
+            const t = (progress - startProgress) / (endProgress - startProgress);
+            return interpolate(startOpacity, endOpacity, easeInOut(t));
+        }
+    }
+    return keyframes[keyframes.length - 1][1];
+}
+
+// Returns a function giving the 0-1 progress of a CSS animation within its cycle.
+// Reading Animation.currentTime does not touch style or layout.
+function createAnimationClock(element, animationName) {
+    const animation = element.getAnimations
+        ? element.getAnimations().find(a => a.animationName === animationName)
+        : null;
+    const fallbackStart = performance.now();
+
+    return () => {
+        const time = animation && animation.currentTime !== null
+            ? animation.currentTime
+            : performance.now() - fallbackStart;
+        return (time % PHASE_CYCLE_MS) / PHASE_CYCLE_MS;
+    };
+}
+
+function getAnimationOpacities() {
+    const timeMachineEffect = document.querySelector('.time-machine-effect');
+    const godParticleEffect = document.querySelector('.god-particle-effect');
+    if (!timeMachineEffect || !godParticleEffect) return null;
+
+    return {
+        timeMachine: keyframeOpacity(TIME_MACHINE_KEYFRAMES, createAnimationClock(timeMachineEffect, 'timeMachinePhase')()),
+        godParticle: keyframeOpacity(GOD_PARTICLE_KEYFRAMES, createAnimationClock(godParticleEffect, 'godParticlePhase')())
+    };
+}
+
+// Handle of the running theme loop, so re-initialising the controls doesn't stack loops
+let themeEngine = null;
+
+function syncThemeWithAnimation(themeTarget) {
     const timeMachineEffect = document.querySelector('.time-machine-effect');
     const godParticleEffect = document.querySelector('.god-particle-effect');
 
     if (!timeMachineEffect || !godParticleEffect) return;
 
+    if (themeEngine) themeEngine.stop();
+
     const themes = {
         bronze: {
             '--btn-text-color': '#cd853f',
@@ -531,61 +585,68 @@ function syncThemeWithAnimation(controlsContainer) {
     for (const key in themes.bronze) {
         parsedThemes.bronze[key] = parseColor(themes.bronze[key]);
         parsedThemes.blue[key] = parseColor(themes.blue[key]);
-    }    // Variables to track transition timing
+    }
+
+    const timeMachineClock = createAnimationClock(timeMachineEffect, 'timeMachinePhase');
+    const godParticleClock = createAnimationClock(godParticleEffect, 'godParticlePhase');
+
+    // Variables to track transition timing
     let transitionStartTime = null;
     let currentTargetMixFactor = 0;
     let actualMixFactor = 0;
     const TRANSITION_DURATION = 10000; // 10 seconds in milliseconds
+    const STEP_INTERVAL = 50; // Smoothing step, keeps the original ~20 updates per second feel
+    let lastStepTime = 0;
+    let appliedMixFactor = null;
+    let frameId = null;
 
-    setInterval(() => {
-        const timeMachineOpacity = parseFloat(window.getComputedStyle(timeMachineEffect).opacity);
-        const godParticleOpacity = parseFloat(window.getComputedStyle(godParticleEffect).opacity);
+    function computeTargetMixFactor() {
+        const timeMachineOpacity = keyframeOpacity(TIME_MACHINE_KEYFRAMES, timeMachineClock());
+        const godParticleOpacity = keyframeOpacity(GOD_PARTICLE_KEYFRAMES, godParticleClock());
 
         const totalOpacity = timeMachineOpacity + godParticleOpacity;
-        
-        let targetMixFactor = 0;
-        if (totalOpacity > 0.001) {
-            // Calculate the raw mix factor
-            const rawMixFactor = godParticleOpacity / totalOpacity;
-            
-            // Apply an extremely gradual transition with very slow color changes
-            // The transition will be barely noticeable until very late in the cycle
-            if (rawMixFactor < 0.6) {
-                // Stay almost completely bronze for the first 60% with minimal hints
-                targetMixFactor = Math.pow(rawMixFactor / 0.6, 3) * 0.08; // Cubic easing, max only 8%
-            } else if (rawMixFactor < 0.85) {
-                // Gradual increase from 60% to 85% of the cycle
-                const midSection = (rawMixFactor - 0.6) / 0.25; // Normalize to 0-1
-                targetMixFactor = 0.08 + (Math.pow(midSection, 2.5) * 0.22); // From 8% to 30%
-            } else {
-                // Final push to blue in the last 15% of the cycle
-                const finalSection = (rawMixFactor - 0.85) / 0.15; // Normalize to 0-1
-                targetMixFactor = 0.30 + (Math.pow(finalSection, 1.8) * 0.70); // From 30% to 100%
-            }
-        } else {
-            targetMixFactor = 0; // Default to bronze when no animation is visible
+        if (totalOpacity <= 0.001) return 0; // Default to bronze when no animation is visible
+
+        // Calculate the raw mix factor
+        const rawMixFactor = godParticleOpacity / totalOpacity;
+
+        // Apply an extremely gradual transition with very slow color changes
+        // The transition will be barely noticeable until very late in the cycle
+        if (rawMixFactor < 0.6) {
+            // Stay almost completely bronze for the first 60% with minimal hints
+            return Math.pow(rawMixFactor / 0.6, 3) * 0.08; // Cubic easing, max only 8%
+        } else if (rawMixFactor < 0.85) {
+            // Gradual increase from 60% to 85% of the cycle
+            const midSection = (rawMixFactor - 0.6) / 0.25; // Normalize to 0-1
+            return 0.08 + (Math.pow(midSection, 2.5) * 0.22); // From 8% to 30%
         }
+        // Final push to blue in the last 15% of the cycle
+        const finalSection = (rawMixFactor - 0.85) / 0.15; // Normalize to 0-1
+        return 0.30 + (Math.pow(finalSection, 1.8) * 0.70); // From 30% to 100%
+    }
+
+    function step(now) {
+        const targetMixFactor = computeTargetMixFactor();
 
         // Check if target has changed significantly (more than 1% difference)
         if (Math.abs(targetMixFactor - currentTargetMixFactor) > 0.01) {
             currentTargetMixFactor = targetMixFactor;
-            transitionStartTime = Date.now();
+            transitionStartTime = now;
         }
 
-        // Apply 4-second gradual transition to reach the target
+        // Apply the gradual transition to reach the target
         if (transitionStartTime !== null) {
-            const elapsed = Date.now() - transitionStartTime;
-            const progress = Math.min(elapsed / TRANSITION_DURATION, 1); // 0 to 1 over 4 seconds
-            
-            // Use smooth easing for the 4-second transition
-            const easedProgress = progress < 0.5 
-                ? 2 * progress * progress 
-                : 1 - Math.pow(-2 * progress + 2, 3) / 2; // Smooth ease-in-out curve
-            
-            // Interpolate from current actual value to target over 4 seconds
+            const elapsed = now - transitionStartTime;
+            const progress = Math.min(elapsed / TRANSITION_DURATION, 1);
+
+            // Smooth ease-in-out curve
+            const easedProgress = progress < 0.5
+                ? 2 * progress * progress
+                : 1 - Math.pow(-2 * progress + 2, 3) / 2;
+
             const startMixFactor = actualMixFactor;
             actualMixFactor = startMixFactor + (currentTargetMixFactor - startMixFactor) * easedProgress;
-            
+
             // Reset transition when complete
             if (progress >= 1) {
                 transitionStartTime = null;
@@ -593,6 +654,12 @@ function syncThemeWithAnimation(controlsContainer) {
         } else {
             actualMixFactor = currentTargetMixFactor;
         }
+    }
+
+    function applyTheme() {
+        // Skip style writes (and the style recalculation they cause) while the colour is steady
+        if (appliedMixFactor !== null && Math.abs(actualMixFactor - appliedMixFactor) < 0.002) return;
+        appliedMixFactor = actualMixFactor;
 
         for (const key in parsedThemes.bronze) {
             const color1 = parsedThemes.bronze[key];
@@ -605,9 +672,50 @@ function syncThemeWithAnimation(controlsContainer) {
                 a: interpolate(color1.a, color2.a, actualMixFactor)
             };
 
-            controlsContainer.style.setProperty(key, formatColor(mixedColor));
+            themeTarget.style.setProperty(key, formatColor(mixedColor));
+        }
+    }
+
+    function frame(now) {
+        frameId = requestAnimationFrame(frame);
+        if (now - lastStepTime < STEP_INTERVAL) return;
+        lastStepTime = now;
+
+        step(now);
+        applyTheme();
+    }
+
+    function start() {
+        if (frameId === null && !document.hidden) {
+            frameId = requestAnimationFrame(frame);
+        }
+    }
+
+    function stop() {
+        if (frameId !== null) {
+            cancelAnimationFrame(frameId);
+            frameId = null;
+        }
+    }
+
+    // Pause completely while the page is hidden
+    function handleVisibilityChange() {
+        if (document.hidden) {
+            stop();
+        } else {
+            start();
+        }
+    }
+    document.addEventListener('visibilitychange', handleVisibilityChange);
+
+    themeEngine = {
+        stop: () => {
+            stop();
+            document.removeEventListener('visibilitychange', handleVisibilityChange);
         }
-    }, 50); // Update colors ~20 times per second for a smooth transition
+    };
+
+    start();
 }
 
 function addSmoothScrolling() {
@@ -815,64 +923,44 @@ function enhanceIframeInteraction() {
     });
 }
 
-// Function to handle iframe content and external scrolling
-function setupExternalScrolling(iframe, iframeWrapper) {
+// Size the iframe to its content so the wrapper provides the (external) scrollbars.
+// contentWidth comes from the exporter's manifest: measuring the loaded document
+// (scrollWidth/offsetWidth...) would force a synchronous layout of the whole timeline.
+function setupExternalScrolling(iframe, iframeWrapper, contentWidth) {
     if (!iframe || !iframeWrapper) return;
-    
-    iframe.addEventListener('load', function() {
-        try {
-            // Add class to wrapper to enable wide content scrolling
-            iframeWrapper.classList.add('wide-content');
-            
-            // Ensure iframe takes full content width
-            const iframeDoc = iframe.contentDocument || iframe.contentWindow.document;
-            if (iframeDoc && iframeDoc.body) {
-                // Inject styles into iframe to disable internal scrollbars
-                const style = iframeDoc.createElement('style');
-                style.textContent = `
-                    body, html {
-                        overflow: visible !important;
-                        margin: 0 !important;
-                        padding: 0 !important;
-                        background: #111 !important;
-                        width: auto !important;
-                        height: auto !important;
-                    }
-                    * {
-                        box-sizing: border-box !important;
-                    }
-                    ::-webkit-scrollbar {
-                        display: none !important;
-                    }
-                `;
-                iframeDoc.head.appendChild(style);
-                
-                // Get the actual content dimensions
-                const contentWidth = Math.max(
-                    iframeDoc.body.scrollWidth,
-                    iframeDoc.body.offsetWidth,
-                    iframeDoc.documentElement.scrollWidth,
-                    iframeDoc.documentElement.offsetWidth
-                );
-                
-                const contentHeight = Math.max(
-                    iframeDoc.body.scrollHeight,
-                    iframeDoc.body.offsetHeight,
-                    iframeDoc.documentElement.scrollHeight,
-                    iframeDoc.documentElement.offsetHeight
-                );
-                  // Set iframe dimensions to match content
-                iframe.style.width = Math.max(contentWidth, 1400) + 'px';
-                iframe.style.height = '725px'; // Fixed height as requested
-                
-                console.log(`Content dimensions: ${contentWidth}x${contentHeight}`);
-            }
-        } catch (e) {
-            console.log('Cross-origin restrictions prevent iframe content modification');            // For cross-origin content, just ensure proper sizing
-            iframe.style.width = '1500px'; // Default wide width to trigger scrolling
-            iframe.style.height = '725px'; // Fixed height as requested
+
+    // Add class to wrapper to enable wide content scrolling
+    iframeWrapper.classList.add('wide-content');
+    iframe.style.width = Math.max(contentWidth || 1500, 1400) + 'px';
+    iframe.style.height = '725px'; // Fixed height as requested
+
+    try {
+        // Disable the internal scrollbars of the loaded document (write-only, no layout reads)
+        const iframeDoc = iframe.contentDocument;
+        if (iframeDoc && iframeDoc.head && !iframeDoc.getElementById('external-scrolling-style')) {
+            const style = iframeDoc.createElement('style');
+            style.id = 'external-scrolling-style';
+            style.textContent = `
+                body, html {
+                    overflow: visible !important;
+                    margin: 0 !important;
+                    padding: 0 !important;
+                    background: #111 !important;
+                    width: auto !important;
+                    height: auto !important;
+                }
+                * {
+                    box-sizing: border-box !important;
+                }
+                ::-webkit-scrollbar {
+                    display: none !important;
+                }
+            `;
+            iframeDoc.head.appendChild(style);
         }
-    });
+    } catch (e) {
+        console.log('Cross-origin restrictions prevent iframe content modification');
+    }
 }
 
 function applyIframeContainerScrollbar() {
@@ -883,6 +971,149 @@ function applyIframeContainerScrollbar() {
     }
 }
 
+// Content manifest written by the exporter: intrinsic width/height (and date index)
+// of every artifact, keyed by file name. Fetched once and shared by all views.
+let contentManifestPromise = null;
+
+function loadContentManifest() {
+    if (!contentManifestPromise) {
+        contentManifestPromise = fetch('manifest.json')
+            .then(response => response.ok ? response.json() : { artifacts: {} })
+            .then(manifest => manifest.artifacts || {})
+            .catch(() => {
+                console.log('Content manifest not available - using default dimensions');
+                return {};
+            });
+    }
+    return contentManifestPromise;
+}
+
+// Date navigation - uses the sorted date index written next to the timeline HTML
+function loadDateIndex(url) {
+    return fetch(url)
+        .then(response => response.ok ? response.json() : null)
+        .catch(() => {
+            console.log('Date index not available - date navigation disabled');
+            return null;
+        });
+}
+
+// Convert "YYYY", "MM/YYYY", "DD/MM/YYYY" or "YYYY-MM-DD" into an ISO date string
+function parseDateQuery(query) {
+    const text = query.trim();
+    let match = text.match(/^(\d{4})$/);
+    if (match) return `${match[1]}-01-01`;
+
+    match = text.match(/^(\d{1,2})[\/\-.](\d{4})$/);
+    if (match) return `${match[2]}-${match[1].padStart(2, '0')}-01`;
+
+    match = text.match(/^(\d{1,2})[\/\-.](\d{1,2})[\/\-.](\d{4})$/);
+    if (match) return `${match[3]}-${match[2].padStart(2, '0')}-${match[1].padStart(2, '0')}`;
+
+    match = text.match(/^(\d{4})-(\d{1,2})-(\d{1,2})$/);
+    if (match) return `${match[1]}-${match[2].padStart(2, '0')}-${match[3].padStart(2, '0')}`;
+
+    return null;
+}
+
+// Binary search for the first indexed date on or after isoDate (O(log n))
+function findDatePosition(dateIndex, isoDate) {
+    const dates = dateIndex.dates;
+    let low = 0;
+    let high = dates.length;
+
+    while (low < high) {
+        const mid = (low + high) >>> 1;
+        if (dates[mid] < isoDate) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+
+    const idx = Math.min(low, dates.length - 1);
+    return { date: dates[idx], px: dateIndex.positions[idx] };
+}
+
+// Scroll the wrapper so that a figure pixel column ends up in the middle of the view
+function scrollTimelineTo(iframeWrapper, px) {
+    const contentScale = parseFloat(iframeWrapper.dataset.contentScale || '1');
+    const target = px * contentScale * zoomLevel - iframeWrapper.clientWidth / 2;
+    iframeWrapper.scrollTo({ left: Math.max(0, target), behavior: 'smooth' });
+}
+
+function removeDateNavigator(vizContainer) {
+    const existing = vizContainer.querySelector('.timeline-navigator');
+    if (existing) existing.remove();
+}
+
+function initializeDateNavigator(vizContainer, iframeWrapper, dateIndex) {
+    removeDateNavigator(vizContainer);
+    if (!dateIndex || !dateIndex.dates || dateIndex.dates.length === 0) return;
+
+    const navigator = document.createElement('div');
+    navigator.className = 'timeline-navigator';
+
+    // "Go to date/year" form
+    const form = document.createElement('form');
+    form.className = 'date-jump';
+
+    const input = document.createElement('input');
+    input.type = 'text';
+    input.className = 'date-jump-input';
+    input.placeholder = 'Year or DD/MM/YYYY';
+    input.title = `Dates from ${dateIndex.dates[0]} to ${dateIndex.dates[dateIndex.dates.length - 1]}`;
+
+    const goButton = document.createElement('button');
+    goButton.type = 'submit';
+    goButton.className = 'date-jump-btn';
+    goButton.textContent = 'Go';
+
+    form.appendChild(input);
+    form.appendChild(goButton);
+
+    form.addEventListener('submit', (e) => {
+        e.preventDefault();
+        const isoDate = parseDateQuery(input.value);
+        if (!isoDate) {
+            input.classList.add('invalid');
+            return;
+        }
+        input.classList.remove('invalid');
+
+        const target = findDatePosition(dateIndex, isoDate);
+        input.title = `Showing ${target.date}`;
+        scrollTimelineTo(iframeWrapper, target.px);
+    });
+
+    // Year minimap - one segment per year, sized by the width of that year on the timeline
+    const minimap = document.createElement('div');
+    minimap.className = 'year-minimap';
+
+    const years = dateIndex.years;
+    const fragment = document.createDocumentFragment();
+    years.forEach(([year, px], i) => {
+        const nextPx = i + 1 < years.length ? years[i + 1][1] : dateIndex.width;
+        const share = (nextPx - px) / dateIndex.width * 100;
+
+        const segment = document.createElement('button');
+        segment.type = 'button';
+        segment.className = 'year-segment';
+        segment.style.width = share + '%';
+        segment.title = String(year);
+        // Only label segments wide enough to hold the text
+        if (share > 2.5) segment.textContent = year;
+
+        segment.addEventListener('click', () => scrollTimelineTo(iframeWrapper, px));
+        fragment.appendChild(segment);
+    });
+    minimap.appendChild(fragment);
+
+    navigator.appendChild(form);
+    navigator.appendChild(minimap);
+    vizContainer.insertBefore(navigator, iframeWrapper);
+}
+
 // Add header blackening effect on scroll
 function addHeaderBlackeningEffect() {
     const header = document.querySelector('.header-section');
@@ -905,11 +1136,15 @@ function addHeaderBlackeningEffect() {
     `;
     header.appendChild(blackOverlay);
     
-    // Listen for scroll events
-    window.addEventListener('scroll', function() {
+    // Layout values are read once (and on resize), never inside the scroll handler
+    let windowHeight = window.innerHeight;
+    const animations = header.querySelectorAll('.background-animation, .time-machine-effect, .god-particle-effect');
+    let framePending = false;
+
+    function applyBlackening() {
+        framePending = false;
         const scrollY = window.scrollY;
-        const windowHeight = window.innerHeight;
-          // Calculate blackening progress (0 to 1)
+        // Calculate blackening progress (0 to 1)
         // Start blackening when scroll reaches 10% of viewport height (sooner)
         const blackenStartPoint = windowHeight * 0.1;
         const blackenEndPoint = windowHeight * 0.6;
@@ -931,11 +1166,22 @@ function addHeaderBlackeningEffect() {
         header.style.setProperty('--blacken-opacity', blackenProgress * 0.9);
         
         // Also dim the animations as lights go out (more aggressive dimming)
-        const animations = header.querySelectorAll('.background-animation, .time-machine-effect, .god-particle-effect');
         animations.forEach(animation => {
             animation.style.opacity = 1 - (blackenProgress * 0.85); // Dim more aggressively
         });
-    });
+    }
+
+    // Passive listener, at most one update per animation frame
+    window.addEventListener('scroll', function() {
+        if (!framePending) {
+            framePending = true;
+            requestAnimationFrame(applyBlackening);
+        }
+    }, { passive: true });
+
+    window.addEventListener('resize', function() {
+        windowHeight = window.innerHeight;
+    }, { passive: true });
 }
 
 // Loading overlay functions
@@ -997,16 +1243,11 @@ function createLoadingOverlay() {
 
 function updateLoadingTheme(overlay) {
     // Determine current theme based on background animations
-    const timeMachineEffect = document.querySelector('.time-machine-effect');
-    const godParticleEffect = document.querySelector('.god-particle-effect');
-    
-    if (!timeMachineEffect || !godParticleEffect) return;
-    
-    const timeMachineOpacity = parseFloat(window.getComputedStyle(timeMachineEffect).opacity);
-    const godParticleOpacity = parseFloat(window.getComputedStyle(godParticleEffect).opacity);
+    const opacities = getAnimationOpacities();
+    if (!opacities) return;
     
     // Determine which theme is more prominent
-    const isTimeMachineTheme = timeMachineOpacity >= godParticleOpacity;
+    const isTimeMachineTheme = opacities.timeMachine >= opacities.godParticle;
     
     if (isTimeMachineTheme) {
         createTimeMachineLoading(overlay);
@@ -1355,6 +1596,73 @@ if ('performance' in window) {
     });
 }
 
+// Profiling overlay, enabled with ?profile in the URL (or localStorage darkTimelineProfile = 1).
+// Reports long tasks (> 50 ms, where the browser supports the Long Tasks API) and the frame
+// times measured while the timeline is being scrolled, against the 16.7 ms frame budget.
+// The numbers are also kept in window.timelineProfile.
+const FRAME_BUDGET_MS = 1000 / 60;
+
+function initializePerformanceOverlay() {
+    const enabled = /[?&]profile\b/.test(window.location.search) || localStorage.getItem('darkTimelineProfile') === '1';
+    if (!enabled) return;
+
+    const profile = window.timelineProfile = {
+        longTasks: 0,
+        longestTaskMs: 0,
+        scrollFrames: 0,
+        slowScrollFrames: 0,
+        worstScrollFrameMs: 0
+    };
+
+    const overlay = document.createElement('div');
+    overlay.className = 'perf-overlay';
+    document.body.appendChild(overlay);
+
+    if ('PerformanceObserver' in window && (PerformanceObserver.supportedEntryTypes || []).includes('longtask')) {
+        new PerformanceObserver(list => {
+            list.getEntries().forEach(entry => {
+                profile.longTasks += 1;
+                profile.longestTaskMs = Math.max(profile.longestTaskMs, entry.duration);
+            });
+        }).observe({ type: 'longtask', buffered: true });
+    } else {
+        profile.longTasks = null; // Not supported by this browser
+    }
+
+    // Frames are only counted while a scroll happened in the last 150 ms
+    let lastScroll = -Infinity;
+    const markScroll = () => { lastScroll = performance.now(); };
+    window.addEventListener('scroll', markScroll, { passive: true });
+    document.querySelectorAll('.iframe-scroll-wrapper').forEach(wrapper => {
+        wrapper.addEventListener('scroll', markScroll, { passive: true });
+    });
+
+    let previousFrame = performance.now();
+    let lastRender = 0;
+    function frame(now) {
+        const duration = now - previousFrame;
+        previousFrame = now;
+        if (now - lastScroll < 150) {
+            profile.scrollFrames += 1;
+            if (duration > FRAME_BUDGET_MS + 1) profile.slowScrollFrames += 1;
+            profile.worstScrollFrameMs = Math.max(profile.worstScrollFrameMs, duration);
+        }
+        // Redraw the overlay a few times per second only
+        if (now - lastRender > 500) {
+            lastRender = now;
+            const longTasks = profile.longTasks === null
+                ? 'n/a'
+                : `${profile.longTasks} (max ${profile.longestTaskMs.toFixed(0)} ms)`;
+            overlay.textContent =
+                `Long tasks: ${longTasks}\n` +
+                `Scroll frames over ${FRAME_BUDGET_MS.toFixed(1)} ms: ${profile.slowScrollFrames}/${profile.scrollFrames}\n` +
+                `Worst scroll frame: ${profile.worstScrollFrameMs.toFixed(1)} ms`;
+        }
+        requestAnimationFrame(frame);
+    }
+    requestAnimationFrame(frame);
+}
+
 // Zoom functionality (panning removed)
 let zoomLevel = 1;
 let zoomControlsTimeout = null;
@@ -1481,17 +1789,23 @@ function clearZoomControlsTimeout() {
     }
 }
 
+// Zoom limits; the semantic zoom of the interactive timeline can go further out
+const ZOOM_MAX = 3;
+const ZOOM_MIN = 0.5;
+const SEMANTIC_ZOOM_MIN = 0.2;
+
 function zoomIn(iframe, indicator) {
-    if (zoomLevel < 3) {
-        zoomLevel += 0.2;
+    if (zoomLevel < ZOOM_MAX) {
+        zoomLevel = Math.round((zoomLevel + 0.2) * 10) / 10;
         updateTransform(iframe);
         updateZoomIndicator(indicator);
     }
 }
 
 function zoomOut(iframe, indicator) {
-    if (zoomLevel > 0.5) {
-        zoomLevel -= 0.2;
+    const minZoom = getTimelineFrame(iframe) ? SEMANTIC_ZOOM_MIN : ZOOM_MIN;
+    if (zoomLevel > minZoom) {
+        zoomLevel = Math.round((zoomLevel - 0.2) * 10) / 10;
         updateTransform(iframe);
         updateZoomIndicator(indicator);
     }
@@ -1503,7 +1817,41 @@ function resetView(iframe, indicator) {
     updateZoomIndicator(indicator);
 }
 
+// The timeline page inside the scaled wrapper, if it is same-origin and supports semantic zoom
+function getTimelineFrame(iframe) {
+    try {
+        const doc = iframe.contentDocument;
+        const timelineFrame = doc && doc.querySelector('iframe.html-content');
+        if (timelineFrame && timelineFrame.contentWindow && timelineFrame.contentWindow.setTimelineZoom) {
+            return timelineFrame;
+        }
+    } catch (e) {
+        // Cross-origin content - fall back to scaling the iframe
+    }
+    return null;
+}
+
 function updateTransform(iframe) {
+    const timelineFrame = getTimelineFrame(iframe);
+    if (timelineFrame) {
+        // Semantic zoom: Plotly lays the timeline out at the new width and switches its
+        // level of detail, so nothing is rasterized at a scale and text stays sharp
+        const width = timelineFrame.contentWindow.setTimelineZoom(zoomLevel);
+        const wrapper = iframe.closest('.iframe-scroll-wrapper');
+        const contentScale = parseFloat((wrapper && wrapper.dataset.contentScale) || '1');
+        timelineFrame.parentElement.style.width = width + 'px';
+        iframe.style.width = Math.max(width * contentScale, 1400) + 'px';
+        iframe.style.transform = '';
+
+        // Clicking a cell of the density overview zooms back in on its period
+        timelineFrame.contentWindow.onTimelineJump = (px) => {
+            zoomLevel = 1;
+            updateTransform(iframe);
+            if (window.currentZoomIndicator) updateZoomIndicator(window.currentZoomIndicator);
+            if (wrapper) scrollTimelineTo(wrapper, px);
+        };
+        return;
+    }
     iframe.style.transform = `scale(${zoomLevel})`;
     iframe.style.transformOrigin = '0 0';
 }
@@ -0,0 +1,19 @@
+import Aggregation
+
+DATE_INDEX = [['1900-01-05', 0.0], ['1900-06-01', 1.5], ['1901-02-02', 3.0], ['1912-03-04', 4.5]]
+
+def test_bucket_edges_by_year():
+    buckets, edges = Aggregation.bucket_edges(DATE_INDEX, 'year', 1.5, 6.0)
+    assert buckets == [1900, 1901, 1912]
+    # Each bucket starts half a column before its first column; the last ends at the grid's end
+    assert edges == [-0.75, 2.25, 3.75, 5.25]
+
+def test_bucket_edges_by_decade():
+    buckets, edges = Aggregation.bucket_edges(DATE_INDEX, 'decade', 1.5, 6.0)
+    assert buckets == [1900, 1910]
+    assert edges == [-0.75, 3.75, 5.25]
+
+def test_bucket_edges_skip_undated_columns():
+    buckets, edges = Aggregation.bucket_edges([['', 0.0]] + DATE_INDEX[1:], 'year', 1.5, 6.0)
+    assert buckets == [1900, 1901, 1912]
+    assert edges[0] == 0.75
@@ -0,0 +1,82 @@
+import base64
+import struct
+import zlib
+
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+import BackgroundGrid
+
+def grid(cells):
+    background = BackgroundGrid.BackgroundGrid()
+    for cell in cells:
+        background.add(*cell)
+    return background
+
+def test_occupancy_matrix():
+    x_values, matrix = BackgroundGrid.occupancy_matrix([(1.5, 0, 1), (0.0, 1, 0)], 3)
+    assert x_values == [0.0, 1.5]
+    assert matrix.tolist() == [[-1, 1], [0, -1], [-1, -1]]
+
+def test_rasterize_places_cells():
+    pixels, extent = grid([(0.0, 0, 0), (1.0, 1, 1)]).rasterize([0.0, 1.0], 0.4, 0.25, 0, resolution=(10, 10))
+    assert pixels.shape == (15, 18)
+    assert extent == pytest.approx((-0.4, -0.25, 1.8, 1.5))
+    expected = np.zeros((15, 18), dtype=np.uint8)
+    expected[0:5, 0:8] = 1
+    expected[10:15, 10:18] = 2
+    assert (pixels == expected).all()
+
+def test_rasterize_later_column_covers_overlap():
+    pixels, _ = grid([(0.0, 0, 0), (1.0, 0, 1)]).rasterize([0.0], 0.6, 0.25, 0, resolution=(10, 10))
+    assert pixels[0].tolist() == [1] * 10 + [2] * 12
+
+def test_rasterize_rounds_corners():
+    pixels, _ = grid([(0.0, 0, 0)]).rasterize([0.0], 0.5, 0.5, 0.3, resolution=(10, 10))
+    assert pixels[0, 0] == 0 and pixels[-1, -1] == 0
+    assert pixels[5, 0] == 1 and pixels[0, 5] == 1
+
+def test_rasterize_keeps_covered_edge_of_previous_column():
+    # The second column's character takes part: the first column's overhang stays visible
+    both, _ = grid([(0.0, 0, 0), (1.0, 1, 1)]).rasterize([0.0, 1.0], 0.6, 0.25, 0, resolution=(10, 10))
+    assert both[0].tolist() == [1] * 12 + [0] * 10
+
+def test_figure_resolution():
+    fig = go.Figure(layout=dict(width=1000, height=400, margin=dict(l=0, r=0, t=0, b=0),
+                                xaxis=dict(range=[-2, 8]), yaxis=dict(range=[10, -10])))
+    assert BackgroundGrid.figure_resolution(fig) == (100, 20)
+
+def image_size(image):
+    data = base64.b64decode(image['source'].split(',', 1)[1])
+    return struct.unpack('>II', data[16:24])
+
+def test_image_matches_screen_pixels():
+    background = grid([(x * 1.5, row, x % 2) for x in range(300) for row in range(3)])
+    # 300 columns on a 16380 px wide figure
+    resolution = (16380 / (300 * 1.5 + 3), 50)
+    image = background.layout_image([0.0, 2.5, 5.0], 0.7, 1.2, 0.15, ('#151B23', '#152323'), resolution)
+    width, height = image_size(image)
+    assert width == round(image['sizex'] * resolution[0]) and width < 16380
+    assert height == round(image['sizey'] * resolution[1])
+
+def test_image_is_capped():
+    background = grid([(x * 1.5, 0, 0) for x in range(30000)])
+    image = background.layout_image([0.0], 0.7, 1.2, 0.15, ('#151B23', '#152323'), (20, 20))
+    assert image_size(image)[0] == BackgroundGrid.MAX_PIXELS
+    # The image still spans every column
+    assert image['sizex'] == pytest.approx(29999 * 1.5 + 1.4)
+
+def test_png_round_trip():
+    pixels = np.array([[0, 1], [2, 1]], dtype=np.uint8)
+    data = BackgroundGrid.png(pixels, ('#151B23', '#152323'))
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks, position = {}, 8
+    while position < len(data):
+        length, = struct.unpack('>I', data[position:position + 4])
+        chunks[data[position + 4:position + 8]] = data[position + 8:position + 8 + length]
+        position += 12 + length
+    assert struct.unpack('>II', chunks[b'IHDR'][:8]) == (2, 2)
+    assert chunks[b'PLTE'] == bytes.fromhex('000000151B23152323')
+    assert chunks[b'tRNS'] == b'\x00\xff\xff'
+    assert zlib.decompress(chunks[b'IDAT']) == b'\x00\x00\x01\x00\x02\x01'
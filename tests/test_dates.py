@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+import Dates
+
+@pytest.mark.parametrize('date_format', Dates.DATE_FORMATS)
+def test_parse_dates_formats(date_format):
+    # Day and month both fit the other, so a format tried too early would swap them
+    date = pd.Timestamp('2019-11-04')
+    assert Dates.parse_dates([date.strftime(date_format)]).tolist() == [date]
+
+def test_parse_dates_mixed_fallback_and_missing():
+    values = pd.Series(['4 November 2019', '04/11/2019', None], index=[5, 6, 7], name='Date')
+    parsed = Dates.parse_dates(values)
+    assert parsed.tolist()[:2] == [pd.Timestamp('2019-11-04')] * 2
+    assert pd.isna(parsed[7])
+    assert parsed.index.tolist() == [5, 6, 7] and parsed.name == 'Date'
+
+def test_add_date_columns():
+    events_df = pd.DataFrame({'Date': Dates.parse_dates(['21/06/1921', None])})
+    dated, undated = Dates.add_date_columns(events_df)[Dates.DATE_COLUMNS].to_dict('records')
+    assert dated == {'DateISO': '1921-06-21', 'DateDMY': '21-06-1921', 'DateSlash': '21/06/1921',
+                     'DateDayMonth': '21/06', 'DateKey': 19210621, 'Year': 1921}
+    assert undated == {'DateISO': '', 'DateDMY': '', 'DateSlash': '', 'DateDayMonth': '',
+                       'DateKey': 0, 'Year': 0}
+    assert 'DateISO' not in events_df.columns
+
+def test_date_bands_alternate_per_distinct_date():
+    keys = [19000101, 19000101, 19000102, 19000103]
+    assert Dates.date_bands(keys, breakpoints=[]).tolist() == [0, 0, 1, 0]
+
+def test_date_bands_breakpoint_forces_band_and_swaps_after():
+    keys = [19000101, 19000102, 19210621, 19300101, 19400101]
+    bands = Dates.date_bands(keys, breakpoints=[('1921-06-21', 0, True)])
+    # Plain alternation would give 0 1 0 1 0; the pattern is swapped after the breakpoint
+    assert bands.tolist() == [0, 1, 0, 0, 1]
+
+def test_date_bands_breakpoint_sets_band_of_its_date():
+    keys = [20200101, 20210101, 20220101]
+    assert Dates.date_bands(keys, breakpoints=[(20210101, 0, False)]).tolist() == [0, 0, 0]
+
+def test_date_bands_ignore_breakpoints_missing_from_data():
+    keys = [19000101, 19000102]
+    assert Dates.date_bands(keys).tolist() == [0, 1]
@@ -0,0 +1,64 @@
+import plotly.graph_objects as go
+
+import DeltaExport
+
+def interleave(chunks, runs, kind):
+    """The loader's interleave(): rebuild figure order from the chunk runs."""
+    items, taken = [], {}
+    for name, count in runs:
+        start = taken.get(name, 0)
+        items += chunks[name][kind][start:start + count]
+        taken[name] = start + count
+    return items
+
+def figure():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=[1.0], y=[0], name='a', customdata=[[0]], meta=dict(hover=0)))
+    fig.add_trace(go.Scatter(x=[60.0], y=[0], name='b', customdata=[[1]], meta=dict(hover=0)))
+    fig.add_trace(go.Scatter(x=[2.0], y=[1], name='c'))
+    fig.add_trace(go.Scatter(x=[0.0, 120.0], y=[2, 2], name='spanning'))
+    fig.update_layout(
+        shapes=[
+            dict(type='rect', x0=0.5, x1=1.5, y0=0, y1=1),
+            dict(type='path', path='M 55 0 L 56 0 L 56 1 Z'),
+            dict(type='rect', x0=2.5, x1=3.5, y0=0, y1=1),
+            dict(type='rect', xref='paper', x0=0, x1=1, y0=0, y1=1)
+        ],
+        meta=dict(event_spacing=1.0, palette_shapes=[3, -1, 4, -1],
+                  hover=dict(events={0: ['x'], 1: ['y']}, templates=['t']))
+    )
+    return fig
+
+def test_window_of():
+    assert DeltaExport.window_of([0.0, 1.0], 50, 1.0) == 'w0'
+    assert DeltaExport.window_of([49.6], 50, 1.0) == 'w1'
+    assert DeltaExport.window_of([10.0, 60.0], 50, 1.0) == DeltaExport.GLOBAL_CHUNK
+    assert DeltaExport.window_of([], 50, 1.0) == DeltaExport.GLOBAL_CHUNK
+
+def test_split_figure_assigns_windows():
+    events = [{'event_idx': 0}, {'event_idx': 1}, {'event_idx': 2}]
+    chunks, order = DeltaExport.split_figure(figure(), events, columns=50)
+    assert [trace['name'] for trace in chunks['w0']['traces']] == ['a', 'c']
+    assert [trace['name'] for trace in chunks['w1']['traces']] == ['b']
+    assert [trace['name'] for trace in chunks['global']['traces']] == ['spanning']
+    # Events and hover texts follow their hover marker; unknown events are global
+    assert chunks['w0']['events'] == [{'event_idx': 0}] and chunks['w0']['hover'] == {'0': ['x']}
+    assert chunks['w1']['hover'] == {'1': ['y']}
+    assert chunks['global']['events'] == [{'event_idx': 2}]
+    assert chunks['w0']['palette_shapes'] == [3, 4]
+
+def test_runs_restore_figure_order():
+    fig = figure()
+    chunks, order = DeltaExport.split_figure(fig, [], columns=50)
+    assert [trace['name'] for trace in interleave(chunks, order['traces'], 'traces')] == ['a', 'b', 'c', 'spanning']
+    shapes = interleave(chunks, order['shapes'], 'shapes')
+    assert [shape.get('x0', shape.get('path')) for shape in shapes] == [0.5, 'M 55 0 L 56 0 L 56 1 Z', 2.5, 0]
+    assert interleave(chunks, order['shapes'], 'palette_shapes') == [3, -1, 4, -1]
+    assert order['shapes'] == [['w0', 1], ['w1', 1], ['w0', 1], ['global', 1]]
+
+def test_diff():
+    previous = {'w0': 'a.json', 'w1': 'b.json', 'w2': 'c.json'}
+    current = {'w0': 'a.json', 'w1': 'x.json', 'w3': 'd.json'}
+    assert DeltaExport.diff(previous, current) == {
+        'added': ['w3'], 'changed': ['w1'], 'removed': ['w2'], 'unchanged': ['w0']
+    }
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+import Instrumentation
+
+@pytest.fixture
+def recording(monkeypatch):
+    monkeypatch.setattr(Instrumentation, '_enabled', True)
+    Instrumentation.reset()
+    yield
+    Instrumentation.reset()
+
+def test_disabled_records_nothing(recording, monkeypatch):
+    monkeypatch.setattr(Instrumentation, '_enabled', False)
+    with Instrumentation.span('render'):
+        Instrumentation.count('shapes', 3)
+    assert Instrumentation.snapshot() == {'stages': {}, 'counters': {}, 'spans': []}
+
+def test_merge_adds_worker_snapshot(recording):
+    with Instrumentation.span('render'):
+        Instrumentation.count('shapes', 3)
+    worker = {'stages': {'render': [2.0, 2], 'export': [1.0, 1]},
+              'counters': {'shapes': 4, 'traces': 1},
+              'spans': [('render', 0.5, 1.0, 1234, 1), ('render', 1.5, 1.0, 1234, 1), ('export', 2.5, 1.0, 1234, 1)]}
+    Instrumentation.merge(worker)
+
+    stages = Instrumentation.stage_totals()
+    assert stages['render']['calls'] == 3 and stages['render']['seconds'] >= 2.0
+    assert stages['export'] == {'seconds': 1.0, 'calls': 1}
+    assert Instrumentation.counters() == {'shapes': 7, 'traces': 1}
+    assert len(Instrumentation.snapshot()['spans']) == 4
+
+def test_export_chrome_trace(recording, tmp_path):
+    Instrumentation.merge({'stages': {'render': [0.25, 1]}, 'counters': {'shapes': 5},
+                           'spans': [('render', 0.5, 0.25, 1234, 1)]})
+    output_path = tmp_path / 'trace.json'
+    Instrumentation.export_chrome_trace(str(output_path))
+    events = json.loads(output_path.read_text())['traceEvents']
+
+    span, counter = events
+    assert span['name'] == 'render' and span['ph'] == 'X' and span['pid'] == 1234
+    assert span['ts'] == pytest.approx(500000) and span['dur'] == pytest.approx(250000)
+    # Counters come once, at the end of the last span
+    assert counter['ph'] == 'C' and counter['args'] == {'shapes': 5}
+    assert counter['ts'] == pytest.approx(750000)
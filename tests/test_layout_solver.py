@@ -0,0 +1,115 @@
+import pytest
+
+import LayoutSolver
+
+RECT_HEIGHT = 0.4
+POSITIONS = {'a': 0.0, 'b': 1.0, 'c': 2.0, 'd': 3.0}
+
+@pytest.fixture
+def neighbours():
+    return LayoutSolver.build_neighbours(POSITIONS, RECT_HEIGHT)
+
+def extent(layout, neighbours, char):
+    i = neighbours.index[char]
+    return layout.y0[i], layout.y1[i]
+
+def test_neighbour_table_edges(neighbours):
+    assert neighbours.rank == [0, 1, 2, 3]
+    assert neighbours.above == [None, 'a', 'b', 'c']
+    assert neighbours.below == ['b', 'c', 'd', None]
+
+def test_no_active_neighbours_expands_both_ways(neighbours):
+    layout = LayoutSolver.solve_column(neighbours, ['b'], {'b'}, {'b'}, RECT_HEIGHT)
+    assert layout.expansions['b'] == {'expand_above': True, 'expand_below': True, 'expanded_height': RECT_HEIGHT * 2}
+    assert layout.contractions == {}
+    assert extent(layout, neighbours, 'b') == pytest.approx((0.6, 1.4))
+    # Other rectangles keep their base extent
+    assert extent(layout, neighbours, 'c') == pytest.approx((1.8, 2.2))
+
+def test_active_below_contracts_it(neighbours):
+    layout = LayoutSolver.solve_column(neighbours, ['b'], {'b', 'c'}, {'b'}, RECT_HEIGHT)
+    assert layout.expansions['b']['expand_above'] and not layout.expansions['b']['expand_below']
+    assert layout.contractions == {'c': {'contract_above': True, 'contract_below': False,
+                                         'contracted_height': RECT_HEIGHT * 0.4}}
+    # Full reach above, the extra third below
+    assert extent(layout, neighbours, 'b') == pytest.approx((0.6, 1.0 + 0.2 + 0.4 / 3))
+    assert extent(layout, neighbours, 'c') == pytest.approx((1.95, 2.2))
+
+def test_active_above_contracts_it(neighbours):
+    layout = LayoutSolver.solve_column(neighbours, ['c'], {'b', 'c'}, {'c'}, RECT_HEIGHT)
+    assert not layout.expansions['c']['expand_above'] and layout.expansions['c']['expand_below']
+    assert layout.contractions == {'b': {'contract_above': False, 'contract_below': True,
+                                         'contracted_height': RECT_HEIGHT * 0.4}}
+    assert extent(layout, neighbours, 'c') == pytest.approx((2.0 - 0.2 - 0.4 / 3, 2.4))
+    assert extent(layout, neighbours, 'b') == pytest.approx((0.8, 1.05))
+
+@pytest.mark.parametrize('asymmetric', [False, True])
+def test_neighbour_with_text_below(neighbours, asymmetric):
+    layout = LayoutSolver.solve_column(neighbours, ['b'], {'b', 'c'}, {'b', 'c'}, RECT_HEIGHT,
+                                       asymmetric_expansion=asymmetric)
+    expansion = layout.expansions['b']
+    assert expansion['expand_above'] and not expansion['expand_below']
+    # A rectangle with text is never contracted; asymmetric mode also drops the extra reach
+    assert layout.contractions == {}
+    assert expansion['expand_below_extra'] is not asymmetric
+
+@pytest.mark.parametrize('asymmetric', [False, True])
+def test_neighbour_with_text_above(neighbours, asymmetric):
+    layout = LayoutSolver.solve_column(neighbours, ['c'], {'b', 'c'}, {'b', 'c'}, RECT_HEIGHT,
+                                       asymmetric_expansion=asymmetric)
+    expansion = layout.expansions['c']
+    assert not expansion['expand_above'] and expansion['expand_below']
+    assert layout.contractions == {}
+    assert expansion['expand_above_extra'] is not asymmetric
+
+def test_both_neighbours_active_contracts_both(neighbours):
+    layout = LayoutSolver.solve_column(neighbours, ['b'], {'a', 'b', 'c'}, {'b'}, RECT_HEIGHT)
+    assert layout.expansions['b']['expanded_height'] == pytest.approx(RECT_HEIGHT * 0.9)
+    assert layout.contractions['a'] == {'contract_above': False, 'contract_below': True,
+                                        'contracted_height': pytest.approx(RECT_HEIGHT * 0.3)}
+    assert layout.contractions['c']['contract_above']
+    assert extent(layout, neighbours, 'b') == pytest.approx((0.66, 1.34))
+    assert extent(layout, neighbours, 'a') == pytest.approx((-0.2, 0.05))
+    assert extent(layout, neighbours, 'c') == pytest.approx((1.95, 2.2))
+
+def test_asymmetric_text_on_both_sides_alternates_by_rank(neighbours):
+    active = set(POSITIONS)
+    layout = LayoutSolver.solve_column(neighbours, ['b', 'c'], active, active, RECT_HEIGHT,
+                                       asymmetric_expansion=True)
+    # b (rank 1) expands below only, c (rank 2) above only
+    assert not layout.expansions['b']['expand_above'] and layout.expansions['b']['expand_below']
+    assert layout.expansions['c']['expand_above'] and not layout.expansions['c']['expand_below']
+    assert layout.contractions == {}
+
+def test_asymmetric_text_above_contracts_below(neighbours):
+    layout = LayoutSolver.solve_column(neighbours, ['b'], {'a', 'b', 'c'}, {'a', 'b'}, RECT_HEIGHT,
+                                       asymmetric_expansion=True)
+    assert layout.expansions['b']['expand_below'] and not layout.expansions['b']['expand_above']
+    assert set(layout.contractions) == {'c'}
+    assert layout.contractions['c']['contracted_height'] == pytest.approx(RECT_HEIGHT * 0.3)
+
+def test_asymmetric_text_below_contracts_above(neighbours):
+    layout = LayoutSolver.solve_column(neighbours, ['b'], {'a', 'b', 'c'}, {'b', 'c'}, RECT_HEIGHT,
+                                       asymmetric_expansion=True)
+    assert layout.expansions['b']['expand_above'] and not layout.expansions['b']['expand_below']
+    assert set(layout.contractions) == {'a'}
+
+def test_edge_rows(neighbours):
+    # Top row: nothing above, active neighbour below
+    top = LayoutSolver.solve_column(neighbours, ['a'], {'a', 'b'}, {'a'}, RECT_HEIGHT)
+    assert top.expansions['a']['expand_above'] and set(top.contractions) == {'b'}
+    assert extent(top, neighbours, 'a')[0] == pytest.approx(-0.4)
+    # Bottom row: nothing below, active neighbour above
+    bottom = LayoutSolver.solve_column(neighbours, ['d'], {'c', 'd'}, {'d'}, RECT_HEIGHT)
+    assert bottom.expansions['d']['expand_below'] and set(bottom.contractions) == {'c'}
+    assert extent(bottom, neighbours, 'd')[1] == pytest.approx(3.4)
+
+def test_expansion_replaces_contraction(neighbours):
+    # b contracts c, then c's own expansion wins
+    layout = LayoutSolver.solve_column(neighbours, ['b', 'c'], {'b', 'c'}, {'b'}, RECT_HEIGHT)
+    assert 'c' in layout.contractions and 'c' in layout.expansions
+    assert extent(layout, neighbours, 'c')[0] == pytest.approx(1.8 - 0.4 / 3)
+
+def test_unknown_owner_is_ignored(neighbours):
+    layout = LayoutSolver.solve_column(neighbours, ['z'], {'z'}, {'z'}, RECT_HEIGHT)
+    assert layout.expansions == {} and layout.y0 == pytest.approx([-0.2, 0.8, 1.8, 2.8])
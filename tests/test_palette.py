@@ -0,0 +1,26 @@
+import Palette
+
+def test_dim_truncates_channels():
+    # 255 * 0.7 = 178.5, 128 * 0.7 = 89.6, 1 * 0.7 = 0.7
+    assert Palette.dim('#FF8001') == '#b25900'
+
+def test_blend_towards_white():
+    # 0 + 255 * 0.3 = 76.5 rounds to 76; 200 + 55 * 0.3 = 216.5 rounds to 216
+    assert Palette.blend('#00C8FF') == '#4cd8ff'
+
+def test_contrast_text_threshold():
+    assert Palette.contrast_text('#808080') == 'white'
+    assert Palette.contrast_text('#818181') == 'black'
+    # Mean of 255, 255, 0 is 170
+    assert Palette.contrast_text('#FFFF00') == 'black'
+
+def test_palette_slots():
+    palette = Palette.Palette({'Jonas': '#FF8001'})
+    assert palette.colors == ['#FF8001', '#b25900', Palette.DEATH_COLOR, '#ffa64d',
+                              '#FFFFFF', '#b2b2b2', Palette.DEATH_COLOR, '#ffffff']
+    assert palette.rectangle_slot('Jonas') == 0
+    assert palette.rectangle_slot('Jonas', is_important=True) == 1
+    assert palette.rectangle_slot('Jonas', is_death=True, is_important=True) == 2
+    # Unknown characters use the default colour's slots
+    assert palette.color('Martha', 'dimmed') == '#b2b2b2'
+    assert palette.text_color('Jonas') == 'white' and palette.text_color('Martha') == 'black'
@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import Benchmark
+import Pipeline
+import Visualization
+
+def args(**values):
+    """Namespace of the command line arguments Pipeline.main parses, all unset."""
+    namespace = dict(config=None, events=None, output=None, background_image=None, no_png=False,
+                     chunked=False, no_cache=False, cache_dir=None, float_precision=None,
+                     preprocess=False, skip_preprocess=False, raw_events=None, raw_edges=None)
+    namespace.update({name: None for name in Visualization.DEFAULT_GRID_PARAMS})
+    namespace.update(values)
+    return argparse.Namespace(**namespace)
+
+def test_resolve_variants_merges_grid_options():
+    config = {
+        'defaults': {'png': False, 'grid': {'event_spacing': 2.0, 'rect_width': 0.5}},
+        'variants': [{'name': 'a', 'grid': {'event_spacing': 3.0}}, {'name': 'b', 'png': True}]
+    }
+    a, b = Pipeline.resolve_variants(config)
+    assert a['grid'] == {**Visualization.DEFAULT_GRID_PARAMS, 'event_spacing': 3.0, 'rect_width': 0.5}
+    assert a['png'] is False and b['png'] is True
+    assert b['grid']['event_spacing'] == 2.0
+    assert b['output'] == os.path.join('Results', 'b.html')
+    assert [variant['name'] for variant in Pipeline.resolve_variants(config, ['b'])] == ['b']
+
+def test_resolve_variants_rejects_unknown_options():
+    with pytest.raises(ValueError, match='row_height'):
+        Pipeline.resolve_variants({'variants': [{'name': 'a', 'grid': {'row_height': 1}}]})
+    with pytest.raises(ValueError, match='missing'):
+        Pipeline.resolve_variants({'variants': [{'name': 'a'}]}, ['missing'])
+
+def test_command_line_grid_beats_variant(tmp_path):
+    config_path = tmp_path / 'pipeline.json'
+    config_path.write_text(json.dumps({
+        'defaults': {'grid': {'rect_width': 0.5}},
+        'variants': [{'name': 'a', 'grid': {'event_spacing': 3.0}}]
+    }))
+    config = Pipeline.config_from_args(args(config=str(config_path), event_spacing=1.0, no_png=True))
+    variant, = Pipeline.resolve_variants(config)
+    assert variant['grid']['event_spacing'] == 1.0
+    assert variant['grid']['rect_width'] == 0.5
+    assert variant['png'] is False
+
+def test_output_replaces_config_variants(tmp_path):
+    config_path = tmp_path / 'pipeline.json'
+    config_path.write_text(json.dumps({'variants': [{'name': 'a'}, {'name': 'b'}]}))
+    config = Pipeline.config_from_args(args(config=str(config_path), output='Results/test.html'))
+    assert config['variants'] == [{'name': 'test', 'output': 'Results/test.html', 'grid': {}}]
+
+def test_select_events_splits_shared_worlds():
+    events_df = pd.DataFrame({'World': ['Jonas', 'Jonas/Martha', 'Origin', None]})
+    selected = Pipeline.select_events(events_df, {'worlds': ['Martha']})
+    assert selected['World'].tolist() == ['Jonas/Martha']
+    assert Pipeline.select_events(events_df, {}) is events_df
+
+def test_render_batch_in_process(tmp_path):
+    events_path = str(tmp_path / 'events.csv')
+    Benchmark.generate_events(20, seed=1).to_csv(events_path, index=False)
+    output = str(tmp_path / 'out' / 'tiny.html')
+    timings = Pipeline.render_batch([{'name': 'tiny', 'events': events_path, 'output': output,
+                                      'png': False, 'cache': None}], workers=1)
+    assert list(timings) == ['tiny']
+    assert os.path.isfile(output)
+    with open(os.path.join(tmp_path, 'out', 'manifest.json'), encoding="utf-8") as f:
+        assert 'tiny.html' in json.load(f)['artifacts']
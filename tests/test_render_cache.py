@@ -0,0 +1,65 @@
+import json
+import os
+
+import pandas as pd
+
+import RenderCache
+
+def events():
+    return pd.DataFrame({'Type': ['Death', 'Birth'], 'Characters': ['Jonas', 'Martha']})
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding="utf-8") as f:
+        f.write(text)
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def test_key_follows_data_options_and_image(tmp_path):
+    cache = RenderCache.RenderCache(str(tmp_path / 'cache'))
+    image = tmp_path / 'background.png'
+    image.write_bytes(b'one')
+    options = {'png': False, 'background_image': str(image)}
+    key = cache.key(events(), options)
+    assert cache.key(events(), dict(options)) == key
+
+    changed = events()
+    changed.loc[1, 'Characters'] = 'Jonas'
+    assert cache.key(changed, options) != key
+    assert cache.key(events(), dict(options, png=True)) != key
+    # Same file name, new content
+    image.write_bytes(b'two')
+    assert cache.key(events(), options) != key
+
+def test_store_and_restore_chunked_render(tmp_path):
+    output_dir, restore_dir = str(tmp_path / 'out'), str(tmp_path / 'restored')
+    write(os.path.join(output_dir, 'timeline.html'), 'html')
+    write(os.path.join(output_dir, 'timeline.dates.json'), '[]')
+    write(os.path.join(output_dir, 'plotly.min.js'), 'js')
+    write(os.path.join(output_dir, 'chunks', 'w0.abc.json'), 'w0')
+    write(os.path.join(output_dir, 'timeline.chunks.json'),
+          json.dumps({'chunks': {'w0': 'chunks/w0.abc.json'}}))
+    entries = {'timeline.html': {'index': 'timeline.dates.json', 'chunks': 'timeline.chunks.json'}}
+    assert RenderCache.artifact_files(output_dir, entries) == [
+        'timeline.html', 'timeline.dates.json', 'timeline.chunks.json', 'plotly.min.js', 'chunks/w0.abc.json'
+    ]
+
+    cache = RenderCache.RenderCache(str(tmp_path / 'cache'))
+    cache.store('k', output_dir, entries)
+    assert cache.restore('k', restore_dir) == entries
+    for relative in RenderCache.artifact_files(output_dir, entries):
+        assert read(os.path.join(restore_dir, relative)) == read(os.path.join(output_dir, relative))
+
+def test_restore_miss(tmp_path):
+    cache = RenderCache.RenderCache(str(tmp_path / 'cache'))
+    assert cache.restore('missing', str(tmp_path / 'out')) is None
+
+def test_evict_removes_least_recently_used(tmp_path):
+    directory = tmp_path / 'cache'
+    for age, name in enumerate(['newest', 'middle', 'oldest']):
+        write(str(directory / name / 'entries.json'), 'x' * 100)
+        os.utime(directory / name, (1000 - age, 1000 - age))
+    RenderCache.RenderCache(str(directory), max_bytes=150).evict()
+    assert sorted(os.listdir(directory)) == ['newest']
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+import Serializer
+
+def test_format_float():
+    assert Serializer.format_float(0.5499999999999999, 3) == '0.55'
+    assert Serializer.format_float(2.0, 3) == '2'
+    assert Serializer.format_float(-0.0001, 3) == '0'
+    # Plain decimal notation, never an exponent
+    assert Serializer.format_float(1e-7, 9) == '0.0000001'
+    assert Serializer.format_float(1.5e20, 1) == '150000000000000000000'
+
+def test_round_path():
+    path = 'M 0.30000000000000004 -1.25 L 12.0 3 Q 1e-05 2.5E+2 Z'
+    assert Serializer.round_path(path, 2) == 'M 0.3 -1.25 L 12 3 Q 1e-05 250 Z'
+
+def test_round_floats():
+    obj = {'x': [0.12345, 1], 'path': 'M 0.12345 1.0', 'y': np.array([0.12345]), 'name': 'a'}
+    rounded = Serializer.round_floats(obj, 2)
+    assert rounded['x'] == [0.12, 1]
+    assert rounded['path'] == 'M 0.12 1'
+    assert rounded['y'].tolist() == [0.12]
+    assert rounded['name'] == 'a'
+    assert Serializer.round_floats(obj, None) is obj
+
+def test_export_precision():
+    assert Serializer.export_precision(None) == Serializer.FLOAT_PRECISION
+    assert Serializer.export_precision(1) == 1
+    assert Serializer.export_precision(-1) is None
+
+def test_dumps_escapes_script_end(monkeypatch):
+    obj = {'text': '</script><!-- x -->'}
+    expected = '{"text":"<\\/script><\\u0021-- x -->"}'
+    assert Serializer.dumps(obj).replace(' ', '') == expected.replace(' ', '')
+    # plotly's encoder escapes them itself
+    monkeypatch.setattr(Serializer, 'orjson', None)
+    text = Serializer.dumps(obj)
+    assert '</' not in text and '<!--' not in text
+
+def test_json_array_chunks(monkeypatch):
+    monkeypatch.setattr(Serializer, 'BATCH_SIZE', 2)
+    chunks = list(Serializer.json_array_chunks([0.1234, 1, 2, 3, 4], precision=2))
+    assert len(chunks) == 5
+    assert ''.join(chunks) == '[0.12,1,2,3,4]'
+    assert ''.join(Serializer.json_array_chunks([])) == '[]'
+
+def test_events_payload():
+    events_df = pd.DataFrame({
+        'Type': ['Death', None],
+        'Characters': ['Jonas', 'Martha'],
+        'DateISO': ['2019-11-04', ''],
+    }, index=[3, 7])
+    assert Serializer.events_payload(events_df) == [
+        {'event_idx': 3, 'type': 'Death', 'characters': 'Jonas', 'first_main_character': '', 'date': '2019-11-04'},
+        {'event_idx': 7, 'type': None, 'characters': 'Martha', 'first_main_character': '', 'date': ''},
+    ]
+
+def test_events_payload_dates_from_date_column():
+    events_df = pd.DataFrame({'Date': pd.to_datetime(['1986-11-04', None])})
+    assert [event['date'] for event in Serializer.events_payload(events_df)] == ['1986-11-04', '']
@@ -0,0 +1,22 @@
+import TextLayout
+
+def test_wrap_breaks_at_spaces():
+    assert TextLayout.wrap('one two three', 7) == ('one<br>two<br>three', 3, False)
+
+def test_wrap_hyphenates_long_words():
+    assert TextLayout.wrap('abcdefghij', 5) == ('abc-<br>def-<br>ghij', 3, False)
+
+def test_wrap_truncates_at_max_lines():
+    assert TextLayout.wrap('one two three', 7, max_lines=2) == ('one<br>two...', 2, True)
+    # A last line without room for the ellipsis is shortened first
+    assert TextLayout.wrap('abcdefghij', 5, max_lines=1) == ('a...', 1, True)
+    assert TextLayout.wrap('one two', 7, max_lines=1) == ('one two', 1, False)
+
+def test_wrap_non_text():
+    assert TextLayout.wrap(float('nan'), 5) is TextLayout.EMPTY
+
+def test_wrap_is_memoized():
+    TextLayout.wrap('memoized text', 6)
+    hits = TextLayout.cache_info().hits
+    TextLayout.wrap('memoized text', 6)
+    assert TextLayout.cache_info().hits == hits + 1
@@ -0,0 +1,25 @@
+import pytest
+
+import Benchmark
+import Dates
+import Visualization
+
+@pytest.fixture(scope='module')
+def figure():
+    # Dense dates, so several columns share a calendar date
+    events_df = Dates.prepare_events(Benchmark.generate_events(60, events_per_date=4, seed=3))
+    return Visualization.create_dark_timeline_grid(events_df=events_df, **Visualization.DEFAULT_GRID_PARAMS)
+
+def test_every_column_has_a_tick_label(figure):
+    xaxis = figure.layout.xaxis
+    spacing = Visualization.DEFAULT_GRID_PARAMS['event_spacing']
+    columns = round((xaxis.range[1] - 1) / spacing)
+    assert list(xaxis.tickvals) == pytest.approx([column * spacing for column in range(columns)])
+    assert len(xaxis.ticktext) == columns
+
+def test_date_index_keeps_first_column_per_date(figure):
+    date_index = figure.layout.meta['date_index']
+    dates = [date for date, _ in date_index]
+    assert dates == sorted(set(dates))
+    # Repeated dates share one index entry
+    assert len(date_index) < len(figure.layout.xaxis.tickvals)
@@ -0,0 +1,38 @@
+import pytest
+
+import WorldStrip
+
+def test_half_codes():
+    assert WorldStrip.half_codes('Jonas') == (1, 1)
+    assert WorldStrip.half_codes('Jonas/Martha') == (1, 2)
+    assert WorldStrip.half_codes('Martha / Origin') == (2, 3)
+    # Unknown worlds, three-way splits and missing values use code 0
+    assert WorldStrip.half_codes('Adam') == (0, 0)
+    assert WorldStrip.half_codes('Jonas/Martha/Origin') == (0, 0)
+    assert WorldStrip.half_codes(float('nan')) == (0, 0)
+
+def test_cells_leave_gaps_between_slits():
+    strip = WorldStrip.WorldStrip(half_width=0.5, y=10, height=0.2)
+    strip.add(0.0, 'Jonas/Martha')
+    strip.add(1.5, 'Origin')
+    edges, codes = strip.cells()
+    assert edges == pytest.approx([-0.5, 0.0, 0.5, 1.0, 1.5, 2.0])
+    assert codes == [1, 2, None, 3, 3]
+
+def test_cells_overlapping_slits():
+    strip = WorldStrip.WorldStrip(half_width=0.8, y=10, height=0.2)
+    strip.add(0.0, 'Jonas')
+    strip.add(1.0, 'Martha')
+    edges, codes = strip.cells()
+    # The later slit covers the end of the previous one
+    assert edges == pytest.approx([-0.8, 0.0, 0.2, 1.0, 1.8])
+    assert codes == [1, 1, 2, 2]
+
+def test_colorscale_maps_codes_to_colors():
+    scale = WorldStrip.colorscale()
+    count = len(WorldStrip.WORLDS)
+    for code, world in enumerate(WorldStrip.WORLDS):
+        # zmin -0.5, zmax count - 0.5: code k sits in the middle of its band
+        position = (code + 0.5) / count
+        band = [color for (start, color), (end, _) in zip(scale[::2], scale[1::2]) if start <= position < end]
+        assert band == [WorldStrip.WORLD_COLORS[world]]